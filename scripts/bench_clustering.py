@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark GL tools against postings stored in different sort orders.
+
+Loads the fixture postings once per clustering key (plus unclustered, in
+generation order) and times the queries that benefit from min/max pruning:
+``profile_accounts`` with an account filter and a one-period income
+statement. The result cache is off, so every run scans.
+
+Usage:
+    python scripts/bench_clustering.py
+    python scripts/bench_clustering.py --cluster-by fiscal_period,gl_account \
+        --cluster-by gl_account,fiscal_period --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# Ensure src is importable when running as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.loader import load_fixture
+from fta_agent.tools.gl_analysis import _generate_income_statement, _profile_accounts
+
+CASES: dict[str, Callable[[DataEngine], str]] = {
+    "profile_accounts gl_account LIKE '41%'": lambda e: _profile_accounts(
+        e, account_filter="p.gl_account LIKE '41%'"
+    ),
+    "profile_accounts gl_account = '410100'": lambda e: _profile_accounts(
+        e, account_filter="p.gl_account = '410100'"
+    ),
+    "income_statement period 6": lambda e: _generate_income_statement(
+        e, period_from=6, period_to=6
+    ),
+    "income_statement Q4": lambda e: _generate_income_statement(
+        e, period_from=10, period_to=12
+    ),
+}
+
+
+def _time(fn: Callable[[], object], runs: int) -> float:
+    """Median wall time in milliseconds, after one warm-up run."""
+    fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--cluster-by",
+        action="append",
+        help="comma-separated sort key (repeatable; default: two common orders)",
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    orders = args.cluster_by or ["fiscal_period,gl_account", "gl_account,fiscal_period"]
+
+    results: dict[str, dict[str, float]] = {}
+    for order in ["", *orders]:
+        keys = [k.strip() for k in order.split(",") if k.strip()]
+        engine = DataEngine(cluster_keys={"postings": keys})
+        start = time.perf_counter()
+        load_fixture(engine)
+        load_s = time.perf_counter() - start
+        label = order or "(load order)"
+        print(f"{label}: loaded in {load_s:.2f}s")
+        results[label] = {
+            case: _time(lambda fn=fn, engine=engine: fn(engine), args.runs)
+            for case, fn in CASES.items()
+        }
+        engine.close()
+
+    labels = list(results)
+    width = max(len(c) for c in CASES)
+    print()
+    print(f"{'median ms':<{width}}  " + "  ".join(f"{lb:>24}" for lb in labels))
+    for case in CASES:
+        base = results[labels[0]][case]
+        cells = [
+            f"{results[lb][case]:>15.1f} ({base / results[lb][case]:>4.1f}x)"
+            for lb in labels
+        ]
+        print(f"{case:<{width}}  " + "  ".join(f"{c:>24}" for c in cells))
+
+
+if __name__ == "__main__":
+    main()
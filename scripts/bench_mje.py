@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Benchmark detect_mje: fused single statement vs one scan per pattern.
+
+Loads the fixture postings and resizes them to each ``--rows`` target —
+truncating, or replicating the fixture with a copy suffix on
+``document_number`` — then times ``_detect_mje`` against the previous
+implementation, which ran the five pattern queries one after another, each
+scanning ``postings``. Results are checked to agree before timing.
+
+Usage:
+    python scripts/bench_mje.py
+    python scripts/bench_mje.py --rows 1000000 --rows 20000000 \
+        --db /tmp/bench_mje.duckdb --memory-limit 3GB --runs 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Ensure src is importable when running as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.loader import load_fixture
+from fta_agent.tools.gl_analysis import _detect_mje
+
+# The pattern queries as they ran before fusing: one statement each.
+_PER_PATTERN_SQL = {
+    "recurring_identical": """
+        SELECT 'RECURRING_IDENTICAL' as pattern_type, gl_account, amount,
+            COUNT(*) as occurrences,
+            COUNT(DISTINCT fiscal_period) as periods_seen,
+            STRING_AGG(DISTINCT user_id, ', ') as preparers,
+            MIN(posting_date) as first_seen, MAX(posting_date) as last_seen
+        FROM postings
+        WHERE document_category = 'MJE'
+        GROUP BY gl_account, amount
+        HAVING COUNT(*) >= {min_occurrences}
+        ORDER BY occurrences DESC
+        LIMIT 20
+    """,
+    "mje_concentration": """
+        SELECT 'HIGH_MJE_CONCENTRATION' as pattern_type, p.gl_account,
+            am.description,
+            COUNT(*) as total_postings,
+            SUM(CASE WHEN document_category = 'MJE' THEN 1 ELSE 0 END) as mje_count,
+            ROUND(SUM(CASE WHEN document_category = 'MJE' THEN 1 ELSE 0 END)
+                * 100.0 / COUNT(*), 1) as mje_pct,
+            ROUND(SUM(CASE WHEN document_category = 'MJE' THEN ABS(amount)
+                ELSE 0 END), 2) as mje_dollar_volume,
+            COUNT(DISTINCT CASE WHEN document_category = 'MJE' THEN user_id END)
+                as distinct_preparers
+        FROM postings p
+        LEFT JOIN account_master am ON p.gl_account = am.gl_account
+        GROUP BY p.gl_account, am.description
+        HAVING mje_count >= {min_occurrences} AND mje_pct > 5
+        ORDER BY mje_pct DESC
+        LIMIT 20
+    """,
+    "accrual_reversal": """
+        SELECT 'ACCRUAL_REVERSAL' as pattern_type, gl_account, fiscal_period,
+            SUM(CASE WHEN document_category = 'ACC' THEN amount ELSE 0 END)
+                as accrual_amount,
+            SUM(CASE WHEN document_category = 'CLR' THEN amount ELSE 0 END)
+                as reversal_amount,
+            COUNT(CASE WHEN document_category = 'ACC' THEN 1 END) as accrual_count,
+            COUNT(CASE WHEN document_category = 'CLR' THEN 1 END) as reversal_count
+        FROM postings
+        WHERE document_category IN ('ACC', 'CLR')
+        GROUP BY gl_account, fiscal_period
+        HAVING accrual_count > 0 AND reversal_count > 0
+        ORDER BY gl_account, fiscal_period
+        LIMIT 30
+    """,
+    "intercompany": """
+        SELECT 'INTERCOMPANY' as pattern_type, gl_account, trading_partner,
+            COUNT(*) as entry_count,
+            ROUND(SUM(ABS(amount)), 2) as total_volume,
+            COUNT(DISTINCT fiscal_period) as periods_active,
+            COUNT(DISTINCT user_id) as preparers
+        FROM postings
+        WHERE trading_partner IS NOT NULL AND document_category = 'MJE'
+        GROUP BY gl_account, trading_partner
+        ORDER BY total_volume DESC
+        LIMIT 20
+    """,
+}
+
+_PER_PATTERN_SUMMARY_SQL = """
+    SELECT document_category, COUNT(*) as count,
+        ROUND(SUM(ABS(amount)), 2) as dollar_volume,
+        COUNT(DISTINCT gl_account) as distinct_accounts,
+        COUNT(DISTINCT user_id) as distinct_preparers
+    FROM postings
+    GROUP BY document_category
+    ORDER BY count DESC
+"""
+
+
+def detect_mje_per_pattern(engine: DataEngine, min_occurrences: int = 3) -> str:
+    """The pre-fusion ``_detect_mje``: five statements, five scans."""
+    results: dict[str, Any] = {}
+    for name, sql in _PER_PATTERN_SQL.items():
+        df = engine.query_polars(sql.format(min_occurrences=min_occurrences))
+        results[name] = {"count": len(df), "patterns": df.to_dicts()}
+    summary = engine.query_polars(_PER_PATTERN_SUMMARY_SQL)
+    results["overall_summary"] = summary.to_dicts()
+    return json.dumps(results, default=str)
+
+
+def resize_postings(engine: DataEngine, rows: int) -> int:
+    """Truncate or replicate ``postings`` to ``rows`` lines; return the count."""
+    base = engine.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+    copies = -(-rows // base)
+    engine.execute(f"""
+        CREATE OR REPLACE TABLE postings AS
+        SELECT p.* REPLACE (p.document_number || '-' || c.copy AS document_number)
+        FROM postings p, range({copies}) c(copy)
+        LIMIT {rows}
+    """)
+    return engine.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+
+def _summary_key(result: str) -> list[tuple[Any, ...]]:
+    """Section sizes and overall counts, for a quick agreement check."""
+    data = json.loads(result)
+    sizes = [(k, v["count"]) for k, v in data.items() if k != "overall_summary"]
+    totals = [
+        (s["document_category"], int(s["count"])) for s in data["overall_summary"]
+    ]
+    return sorted(sizes) + sorted(totals)
+
+
+def _time(fn: Callable[[], object], runs: int) -> float:
+    """Median wall time in milliseconds, after one warm-up run."""
+    fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        action="append",
+        help="postings row count (repeatable; default: 1,000,000)",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", default=":memory:", help="DuckDB file for large runs")
+    parser.add_argument("--memory-limit", default=None)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}  {'per-pattern ms':>15}  {'fused ms':>10}  {'speedup':>8}")
+    for target in args.rows or [1_000_000]:
+        if args.db != ":memory:":
+            Path(args.db).unlink(missing_ok=True)
+        engine = DataEngine(args.db, memory_limit=args.memory_limit)
+        load_fixture(engine)
+        rows = resize_postings(engine, target)
+        old = detect_mje_per_pattern(engine)
+        assert _summary_key(old) == _summary_key(_detect_mje(engine)), "results differ"
+        before = _time(lambda e=engine: detect_mje_per_pattern(e), args.runs)
+        after = _time(lambda e=engine: _detect_mje(e), args.runs)
+        print(f"{rows:>12,}  {before:>15.1f}  {after:>10.1f}  {before / after:>7.1f}x")
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1049,7 +1049,7 @@ def main() -> None:
     print(f"\nDone. Database written to: {db_path}")
     print("Start the API with:")
     print(
-        f"  FTA_DUCKDB_PATH={db_path!r} "
+        f"  OUTCOMES_DUCKDB_PATH={db_path!r} "
         "uvicorn fta_agent.api.app:create_app --factory"
     )
 
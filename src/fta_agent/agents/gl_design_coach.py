@@ -34,8 +34,9 @@ def _should_continue(state: AgentState) -> Literal["tools", "__end__"]:
 def build_gl_design_coach(engine: DataEngine) -> StateGraph[AgentState]:
     """Build the GL Design Coach graph with tool-calling support."""
     from fta_agent.tools.gl_analysis import create_gl_tools
+    from fta_agent.tools.result_cache import get_tool_cache
 
-    tools = create_gl_tools(engine)
+    tools = create_gl_tools(engine, get_tool_cache())
     llm = get_chat_model().bind_tools(tools)
 
     def gl_coach_node(state: AgentState) -> dict[str, Any]:
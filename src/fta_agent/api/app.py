@@ -2,27 +2,63 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from fta_agent.config import get_settings
 from fta_agent.data.engine import DataEngine
-from fta_agent.data.loader import load_fixture
+from fta_agent.data.jobs import JobRegistry
+from fta_agent.data.loader import FIXTURE_TABLES, aload_fixture
+from fta_agent.data.manager import DEFAULT_ENGAGEMENT_ID, EngineManager
+from fta_agent.data.outcomes import OUTCOMES_DB
+from fta_agent.data.readiness import DataReadiness
 
 logger = logging.getLogger(__name__)
 
 
+def _attach_outcomes(engine: DataEngine, outcomes_path: str, main_path: str) -> None:
+    """ATTACH the outcomes database so outcome tables join with postings."""
+    if not outcomes_path:
+        return
+    same_file = Path(outcomes_path).resolve() == Path(main_path).resolve()
+    if main_path != ":memory:" and same_file:
+        logger.info("Outcomes share the main database at %s", main_path)
+        return
+    engine.attach(outcomes_path, OUTCOMES_DB)
+    logger.info("Attached outcomes database %s as '%s'", outcomes_path, OUTCOMES_DB)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """Startup: create DataEngine, load fixture data."""
-    engine = DataEngine()
-    load_fixture(engine)
+    """Startup: open the engagement database and start loading fixtures.
+
+    Fixture loading runs as a background task so the server accepts requests
+    immediately; ``app.state.readiness`` tracks which tables are available.
+    """
+    settings = get_settings()
+    engine = DataEngine.from_settings(settings, db_path=settings.duckdb_path)
+    _attach_outcomes(engine, settings.outcomes_duckdb_path, settings.duckdb_path)
     app.state.engine = engine
-    logger.info("DataEngine initialized with tables: %s", engine.tables())
+    engines = EngineManager.from_settings(settings)
+    engines.register(DEFAULT_ENGAGEMENT_ID, engine, pinned=True)
+    app.state.engines = engines
+    readiness = DataReadiness(FIXTURE_TABLES)
+    app.state.readiness = readiness
+    loader = asyncio.create_task(
+        aload_fixture(engine, readiness, mode=settings.fixture_load_mode)
+    )
+    logger.info("DataEngine initialized; loading fixtures in the background.")
     yield
+    await app.state.jobs.cancel_all()
+    loader.cancel()
+    await asyncio.gather(loader, return_exceptions=True)
+    engines.close()
     engine.close()
     logger.info("DataEngine closed.")
 
@@ -30,6 +66,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(title="FTA Agent", version="0.1.0", lifespan=lifespan)
+    app.state.jobs = JobRegistry()
 
     app.add_middleware(
         CORSMiddleware,
@@ -40,6 +77,7 @@ def create_app() -> FastAPI:
     )
 
     from fta_agent.api.routes.chat import router as chat_router
+    from fta_agent.api.routes.debug import router as debug_router
     from fta_agent.api.routes.health import router as health_router
     from fta_agent.api.routes.outcomes import router as outcomes_router
     from fta_agent.api.routes.stream import router as stream_router
@@ -50,6 +88,7 @@ def create_app() -> FastAPI:
     app.include_router(outcomes_router)
     app.include_router(upload_router)
     app.include_router(stream_router)
+    app.include_router(debug_router)
     return app
 
 
@@ -0,0 +1,77 @@
+"""Resolve the DataEngine serving a request's engagement.
+
+Also gates data routes on background fixture loading: the default engagement
+is usable only once the tables a route needs have been loaded.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request
+
+from fta_agent.config import get_settings
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.manager import (
+    DEFAULT_ENGAGEMENT_ID,
+    EngineManager,
+    validate_engagement_id,
+)
+from fta_agent.data.readiness import DataReadiness
+
+
+async def wait_for_data(
+    request: Request, tables: Iterable[str], wait_s: float | None = None
+) -> None:
+    """Wait for background-loaded ``tables``; 503 if they are not ready.
+
+    ``wait_s`` defaults to the ``data_ready_wait_s`` setting. Apps without a
+    readiness tracker (no background load) are always ready.
+    """
+    readiness: DataReadiness | None = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return
+    timeout = get_settings().data_ready_wait_s if wait_s is None else wait_s
+    if await readiness.wait_for(tables, timeout):
+        return
+    detail = (
+        f"Fixture loading failed: {readiness.error}"
+        if readiness.state == "failed"
+        else "Engagement data is still loading; retry shortly"
+    )
+    raise HTTPException(
+        status_code=503, detail=detail, headers={"Retry-After": "5"}
+    )
+
+
+@asynccontextmanager
+async def engagement_engine(
+    request: Request,
+    engagement_id: str | None = None,
+    needs: Iterable[str] = (),
+    wait_s: float | None = None,
+) -> AsyncIterator[DataEngine]:
+    """Yield the engine for ``engagement_id``, held open for the block.
+
+    The default engagement is served by ``app.state.engine`` once the fixture
+    tables in ``needs`` are loaded; any other id is opened (or reused) through
+    the app's EngineManager.
+    """
+    if engagement_id is None or engagement_id == DEFAULT_ENGAGEMENT_ID:
+        engine: DataEngine | None = getattr(request.app.state, "engine", None)
+        if engine is None:
+            raise HTTPException(status_code=503, detail="Data engine not initialized")
+        await wait_for_data(request, needs, wait_s)
+        yield engine
+        return
+
+    try:
+        validate_engagement_id(engagement_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    manager: EngineManager | None = getattr(request.app.state, "engines", None)
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Engine manager not initialized")
+    async with manager.alease(engagement_id) as engine:
+        yield engine
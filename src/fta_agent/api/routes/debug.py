@@ -0,0 +1,36 @@
+"""Debug endpoints — DataEngine query instrumentation."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+router = APIRouter(prefix="/api/debug")
+
+
+@router.get("/queries")
+async def get_queries(
+    request: Request, limit: int = Query(default=50, ge=1, le=1000)
+) -> dict[str, Any]:
+    """Return recent and slow queries plus per-tag totals, heaviest tag first."""
+    engine = getattr(request.app.state, "engine", None)
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Data engine not initialized")
+    log = engine.query_log
+    return {
+        "slow_query_ms": log.slow_query_ms,
+        "by_tag": log.summary(),
+        "slow": [r.to_dict() for r in reversed(log.slow(limit))],
+        "recent": [r.to_dict() for r in reversed(log.recent(limit))],
+    }
+
+
+@router.delete("/queries")
+async def clear_queries(request: Request) -> dict[str, str]:
+    """Reset the query log."""
+    engine = getattr(request.app.state, "engine", None)
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Data engine not initialized")
+    engine.query_log.clear()
+    return {"status": "cleared"}
@@ -1,11 +1,52 @@
 """Health check endpoint."""
 
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.manager import EngineManager
+from fta_agent.data.readiness import DataReadiness
+from fta_agent.tools.result_cache import get_tool_cache
 
 router = APIRouter()
 
 
+def _readiness(request: Request) -> dict[str, Any]:
+    readiness: DataReadiness | None = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return {"state": "pending", "tables": {}, "elapsed_s": None, "error": None}
+    return readiness.to_dict()
+
+
 @router.get("/health")
-async def health() -> dict[str, str]:
-    """Return service health status."""
-    return {"status": "ok"}
+async def health(request: Request) -> dict[str, Any]:
+    """Return service health status and fixture-loading progress."""
+    data = _readiness(request)
+    return {"status": "ok", "ready": data["state"] == "ready", "data": data}
+
+
+@router.get("/health/ready")
+async def ready(request: Request) -> dict[str, Any]:
+    """Readiness probe: 503 until all fixture tables are loaded."""
+    data = _readiness(request)
+    if data["state"] != "ready":
+        raise HTTPException(status_code=503, detail=data)
+    return data
+
+
+@router.get("/health/engine")
+async def engine_health(request: Request) -> dict[str, Any]:
+    """Return DataEngine pool and cache counters plus per-engagement memory."""
+    engine: DataEngine | None = getattr(request.app.state, "engine", None)
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Data engine not initialized")
+    cache = engine.cache_stats()
+    engines: EngineManager | None = getattr(request.app.state, "engines", None)
+    tool_cache = get_tool_cache()
+    return {
+        "pool": engine.pool_stats().to_dict(),
+        "cache": cache.to_dict() if cache is not None else None,
+        "tool_cache": tool_cache.stats().to_dict() if tool_cache is not None else None,
+        "engagements": engines.summary() if engines is not None else None,
+    }
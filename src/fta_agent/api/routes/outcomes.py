@@ -1,20 +1,26 @@
 """Outcome API endpoints — GET + PATCH for all 6 outcome types.
 
-Serves outcome data from DuckDB via the DataEngine. GET endpoints return
-lists of Pydantic models serialized as JSON. PATCH endpoints accept partial
-updates for interactive status changes from the dashboard.
+Serves outcome data from DuckDB via the app's DataEngine. GET endpoints
+return lists of Pydantic models serialized as JSON. PATCH endpoints accept
+partial updates for interactive status changes from the dashboard. All DuckDB
+work goes through the engine's async API so it never blocks the event loop.
+
+When a separate outcomes database is configured it is ATTACHed to the main
+engine as ``outcomes``, so outcome tables can be joined with ``postings`` and
+``trial_balance`` in one query (see ``/mapping/impact``).
 """
 
 from __future__ import annotations
 
-import os
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
+from fta_agent.api.engines import wait_for_data
 from fta_agent.data.engine import DataEngine
 from fta_agent.data.outcomes import (
+    OUTCOMES_DB,
     AccountMapping,
     AccountProfile,
     AnalysisFinding,
@@ -26,20 +32,36 @@ from fta_agent.data.outcomes import (
 
 router = APIRouter(prefix="/api/outcomes")
 
-# Module-level engine — lazily initialized on first request.
-_engine: DataEngine | None = None
 
+def _get_engine(request: Request) -> DataEngine:
+    engine: DataEngine | None = getattr(request.app.state, "engine", None)
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Data engine not initialized")
+    return engine
 
-def _get_engine() -> DataEngine:
-    global _engine
-    if _engine is None:
-        db_path = os.environ.get("FTA_DUCKDB_PATH", ":memory:")
-        _engine = DataEngine(db_path=db_path)
-    return _engine
 
+def _catalog(engine: DataEngine) -> str | None:
+    return OUTCOMES_DB if OUTCOMES_DB in engine.attached else None
 
-def _table_exists(engine: DataEngine, table: str) -> bool:
-    return table in engine.tables()
+
+def _table(engine: DataEngine, table: str) -> str:
+    """Qualify an outcome table with the attached outcomes database, if any."""
+    catalog = _catalog(engine)
+    return f"{catalog}.{table}" if catalog else table
+
+
+async def _table_exists(engine: DataEngine, table: str) -> bool:
+    return await engine.arun(engine.has_table, table, _catalog(engine))
+
+
+async def _select_all(request: Request, table: str) -> list[dict[str, Any]]:
+    engine = _get_engine(request)
+    if not await _table_exists(engine, table):
+        return []
+    df = await engine.aquery_polars(
+        f"SELECT * FROM {_table(engine, table)}", tag=f"outcomes.{table}"
+    )
+    return df.to_dicts()
 
 
 # ---------------------------------------------------------------------------
@@ -48,73 +70,78 @@ def _table_exists(engine: DataEngine, table: str) -> bool:
 
 
 @router.get("/analysis/profiles", response_model=list[AccountProfile])
-async def get_profiles() -> list[dict[str, Any]]:
+async def get_profiles(request: Request) -> list[dict[str, Any]]:
     """Return all account profiles."""
-    engine = _get_engine()
-    if not _table_exists(engine, "account_profiles"):
-        return []
-    df = engine.query_polars("SELECT * FROM account_profiles")
-    return df.to_dicts()  # type: ignore[return-value]
+    return await _select_all(request, "account_profiles")
 
 
 @router.get("/analysis/findings", response_model=list[AnalysisFinding])
-async def get_findings() -> list[dict[str, Any]]:
+async def get_findings(request: Request) -> list[dict[str, Any]]:
     """Return all analysis findings."""
-    engine = _get_engine()
-    if not _table_exists(engine, "analysis_findings"):
-        return []
-    df = engine.query_polars("SELECT * FROM analysis_findings")
-    return df.to_dicts()  # type: ignore[return-value]
+    return await _select_all(request, "analysis_findings")
 
 
 @router.get("/design/decisions", response_model=list[DimensionalDecision])
-async def get_decisions() -> list[dict[str, Any]]:
+async def get_decisions(request: Request) -> list[dict[str, Any]]:
     """Return all dimensional decisions."""
-    engine = _get_engine()
-    if not _table_exists(engine, "dimensional_decisions"):
-        return []
-    df = engine.query_polars("SELECT * FROM dimensional_decisions")
-    return df.to_dicts()  # type: ignore[return-value]
+    return await _select_all(request, "dimensional_decisions")
 
 
 @router.get("/target-coa/accounts", response_model=list[TargetAccount])
-async def get_target_accounts() -> list[dict[str, Any]]:
+async def get_target_accounts(request: Request) -> list[dict[str, Any]]:
     """Return all target COA accounts."""
-    engine = _get_engine()
-    if not _table_exists(engine, "target_accounts"):
-        return []
-    df = engine.query_polars("SELECT * FROM target_accounts")
-    return df.to_dicts()  # type: ignore[return-value]
+    return await _select_all(request, "target_accounts")
 
 
 @router.get("/mapping", response_model=list[AccountMapping])
-async def get_mappings() -> list[dict[str, Any]]:
+async def get_mappings(request: Request) -> list[dict[str, Any]]:
     """Return all account mappings."""
-    engine = _get_engine()
-    if not _table_exists(engine, "account_mappings"):
-        return []
-    df = engine.query_polars("SELECT * FROM account_mappings")
-    return df.to_dicts()  # type: ignore[return-value]
+    return await _select_all(request, "account_mappings")
 
 
 @router.get("/mje/patterns", response_model=list[MJEPattern])
-async def get_mje_patterns() -> list[dict[str, Any]]:
+async def get_mje_patterns(request: Request) -> list[dict[str, Any]]:
     """Return all MJE patterns."""
-    engine = _get_engine()
-    if not _table_exists(engine, "mje_patterns"):
-        return []
-    df = engine.query_polars("SELECT * FROM mje_patterns")
-    return df.to_dicts()  # type: ignore[return-value]
+    return await _select_all(request, "mje_patterns")
 
 
 @router.get("/validation", response_model=list[ReconciliationResult])
-async def get_reconciliation() -> list[dict[str, Any]]:
+async def get_reconciliation(request: Request) -> list[dict[str, Any]]:
     """Return all reconciliation results."""
-    engine = _get_engine()
-    if not _table_exists(engine, "reconciliation_results"):
+    return await _select_all(request, "reconciliation_results")
+
+
+@router.get("/mapping/impact")
+async def get_mapping_impact(request: Request) -> list[dict[str, Any]]:
+    """Posting volume and net amount each target account inherits via mappings.
+
+    Joins the outcomes ``account_mappings`` table with ``postings`` in a single
+    query — no data is copied between databases.
+    """
+    engine = _get_engine(request)
+    await wait_for_data(request, ["postings"])
+    if not await _table_exists(engine, "account_mappings") or not await engine.arun(
+        engine.has_table, "postings"
+    ):
         return []
-    df = engine.query_polars("SELECT * FROM reconciliation_results")
-    return df.to_dicts()  # type: ignore[return-value]
+    df = await engine.aquery_polars(
+        f"""
+        SELECT
+            m.target_account,
+            ANY_VALUE(m.target_description) AS target_description,
+            COUNT(DISTINCT m.legacy_account) AS legacy_accounts,
+            COUNT(p.gl_account) AS posting_count,
+            ROUND(SUM(
+                CASE WHEN p.debit_credit = 'D' THEN p.amount ELSE -p.amount END
+            ), 2) AS net_amount
+        FROM {_table(engine, "account_mappings")} m
+        LEFT JOIN postings p ON p.gl_account = m.legacy_account
+        GROUP BY m.target_account
+        ORDER BY posting_count DESC, m.target_account
+        """,
+        tag="outcomes.mapping_impact",
+    )
+    return df.to_dicts()
 
 
 # ---------------------------------------------------------------------------
@@ -138,10 +165,12 @@ class MappingPatch(BaseModel):
 
 
 @router.patch("/analysis/findings/{finding_id}")
-async def patch_finding(finding_id: str, patch: FindingPatch) -> dict[str, str]:
+async def patch_finding(
+    finding_id: str, patch: FindingPatch, request: Request
+) -> dict[str, str]:
     """Update a finding's status or resolution."""
-    engine = _get_engine()
-    if not _table_exists(engine, "analysis_findings"):
+    engine = _get_engine(request)
+    if not await _table_exists(engine, "analysis_findings"):
         raise HTTPException(status_code=404, detail="No findings data loaded")
 
     cols: list[str] = []
@@ -156,8 +185,9 @@ async def patch_finding(finding_id: str, patch: FindingPatch) -> dict[str, str]:
         raise HTTPException(status_code=400, detail="No fields to update")
 
     params.append(finding_id)
-    engine.execute(
-        f"UPDATE analysis_findings SET {', '.join(cols)} WHERE finding_id = ?",
+    await engine.aexecute(
+        f"UPDATE {_table(engine, 'analysis_findings')} "
+        f"SET {', '.join(cols)} WHERE finding_id = ?",
         params,
     )
     return {"status": "updated", "finding_id": finding_id}
@@ -165,11 +195,11 @@ async def patch_finding(finding_id: str, patch: FindingPatch) -> dict[str, str]:
 
 @router.patch("/design/decisions/{decision_id}")
 async def patch_decision(
-    decision_id: str, patch: DecisionPatch
+    decision_id: str, patch: DecisionPatch, request: Request
 ) -> dict[str, str]:
     """Update a decision's status or decided_by."""
-    engine = _get_engine()
-    if not _table_exists(engine, "dimensional_decisions"):
+    engine = _get_engine(request)
+    if not await _table_exists(engine, "dimensional_decisions"):
         raise HTTPException(status_code=404, detail="No decisions data loaded")
 
     cols: list[str] = []
@@ -184,18 +214,21 @@ async def patch_decision(
         raise HTTPException(status_code=400, detail="No fields to update")
 
     params.append(decision_id)
-    engine.execute(
-        f"UPDATE dimensional_decisions SET {', '.join(cols)} WHERE decision_id = ?",
+    await engine.aexecute(
+        f"UPDATE {_table(engine, 'dimensional_decisions')} "
+        f"SET {', '.join(cols)} WHERE decision_id = ?",
         params,
     )
     return {"status": "updated", "decision_id": decision_id}
 
 
 @router.patch("/mapping/{mapping_id}")
-async def patch_mapping(mapping_id: str, patch: MappingPatch) -> dict[str, str]:
+async def patch_mapping(
+    mapping_id: str, patch: MappingPatch, request: Request
+) -> dict[str, str]:
     """Update a mapping's status or validated_by."""
-    engine = _get_engine()
-    if not _table_exists(engine, "account_mappings"):
+    engine = _get_engine(request)
+    if not await _table_exists(engine, "account_mappings"):
         raise HTTPException(status_code=404, detail="No mapping data loaded")
 
     cols: list[str] = []
@@ -210,8 +243,9 @@ async def patch_mapping(mapping_id: str, patch: MappingPatch) -> dict[str, str]:
         raise HTTPException(status_code=400, detail="No fields to update")
 
     params.append(mapping_id)
-    engine.execute(
-        f"UPDATE account_mappings SET {', '.join(cols)} WHERE mapping_id = ?",
+    await engine.aexecute(
+        f"UPDATE {_table(engine, 'account_mappings')} "
+        f"SET {', '.join(cols)} WHERE mapping_id = ?",
         params,
     )
     return {"status": "updated", "mapping_id": mapping_id}
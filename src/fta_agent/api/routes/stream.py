@@ -16,7 +16,7 @@ import uuid
 from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import AIMessage, HumanMessage
 from pydantic import BaseModel, Field
@@ -24,6 +24,10 @@ from pydantic import BaseModel, Field
 from fta_agent.agents.gl_design_coach import get_gl_design_coach_graph
 from fta_agent.agents.functional_consultant import get_functional_consultant_graph
 from fta_agent.agents.state import AgentState
+from fta_agent.api.engines import engagement_engine, wait_for_data
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.loader import FIXTURE_TABLES
+from fta_agent.data.manager import DEFAULT_ENGAGEMENT_ID, validate_engagement_id
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +57,10 @@ class StreamRequest(BaseModel):
         default=None,
         description="Override mock mode per-request. True=mock, False=live, None=use server env.",
     )
+    engagement_id: str = Field(
+        default=DEFAULT_ENGAGEMENT_ID,
+        description="Engagement whose data the agent's tools query.",
+    )
 
 
 def _sse_event(event_type: str, session_id: str, payload: dict) -> str:
@@ -72,9 +80,31 @@ async def _stream_agent(
     agent: str,
     session_id: str,
     history: list[HistoryMessage] | None = None,
+    engagement_id: str = DEFAULT_ENGAGEMENT_ID,
+) -> AsyncIterator[str]:
+    """Run the agent graph against the engagement's engine and yield SSE events."""
+    # Hold the engagement's engine open for the whole stream so the manager
+    # cannot evict it between tool calls, and read from one snapshot so an
+    # ingest that lands mid-turn does not change the data under the agent.
+    async with (
+        engagement_engine(request, engagement_id) as engine,
+        engine.asnapshot(),
+    ):
+        async for event in _stream_agent_events(
+            engine, message, agent, session_id, history, engagement_id
+        ):
+            yield event
+
+
+async def _stream_agent_events(
+    engine: DataEngine,
+    message: str,
+    agent: str,
+    session_id: str,
+    history: list[HistoryMessage] | None,
+    engagement_id: str,
 ) -> AsyncIterator[str]:
     """Run the agent graph and yield SSE events."""
-    engine = request.app.state.engine
 
     # Select graph based on agent
     if agent == "gl_design_coach":
@@ -103,7 +133,7 @@ async def _stream_agent(
             "role": "consultant",
         },
         "engagement": {
-            "engagement_id": "demo-eng-001",
+            "engagement_id": engagement_id,
             "client_name": "Acme Insurance",
             "sub_segment": "P&C",
             "erp_target": "SAP",
@@ -150,6 +180,9 @@ async def _stream_agent(
         elif kind == "on_tool_end":
             tool_name = event.get("name", "unknown")
             output = event.get("data", {}).get("output", "")
+            # GL tools report result-cache use (hit / miss / bypass) as artifact
+            artifact = getattr(output, "artifact", None)
+            cache = artifact.get("cache") if isinstance(artifact, dict) else None
             # LangChain wraps tool returns in ToolMessage — extract raw content
             if hasattr(output, "content"):
                 output_str = str(output.content)
@@ -162,11 +195,14 @@ async def _stream_agent(
             max_len = 20000 if tool_name == "emit_process_flow" else 2000
             if len(output_str) > max_len:
                 output_str = output_str[:max_len] + "... (truncated)"
-            yield _sse_event("tool_call", session_id, {
+            completed = {
                 "tool": tool_name,
                 "status": "completed",
                 "output_preview": output_str,
-            })
+            }
+            if cache is not None:
+                completed["cache"] = cache
+            yield _sse_event("tool_call", session_id, completed)
 
         # Chain/graph step events for trace
         elif kind == "on_chain_start":
@@ -737,7 +773,15 @@ async def stream_agent(req: StreamRequest, request: Request) -> StreamingRespons
         logger.info("MOCK MODE: streaming canned response for session %s", session_id)
         generator = _stream_mock(session_id, message=req.message, agent=req.agent, history=req.history)
     else:
-        generator = _stream_agent(request, req.message, req.agent, session_id, req.history)
+        try:
+            validate_engagement_id(req.engagement_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        if req.engagement_id == DEFAULT_ENGAGEMENT_ID:
+            await wait_for_data(request, FIXTURE_TABLES)
+        generator = _stream_agent(
+            request, req.message, req.agent, session_id, req.history, req.engagement_id
+        )
 
     return StreamingResponse(
         generator,
@@ -1,57 +1,435 @@
-"""Data upload endpoint — CSV/Excel/Parquet file ingestion."""
+"""Data upload endpoint — CSV/Excel/Parquet file ingestion.
+
+The multipart body is parsed as it arrives and each file part is written
+straight to its own temp file while hashing, so a multi-GB extract is never
+held in worker memory or copied twice, and the size limit is enforced as
+bytes arrive. Ingestion then runs as a background job
+(``fta_agent.data.jobs``) with status and SSE progress endpoints, so the
+upload request returns as soon as the bytes are on disk.
+"""
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
+import logging
 import tempfile
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import IO, Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
 
-from fastapi import APIRouter, HTTPException, Request, UploadFile
-from pydantic import BaseModel
+from fta_agent.api.engines import engagement_engine
+from fta_agent.config import get_settings
+from fta_agent.data.excel import ExcelOptions
+from fta_agent.data.jobs import JobRegistry
+from fta_agent.data.loader import (
+    ARCHIVE_SUFFIXES,
+    FIXTURE_TABLES,
+    SUPPORTED_SUFFIXES,
+    TABLE_SCHEMAS,
+    IngestMode,
+    estimate_rows,
+    ingest_files,
+)
+from fta_agent.data.manager import DEFAULT_ENGAGEMENT_ID, validate_engagement_id
+from fta_agent.data.validation import ValidationError
 
-from fta_agent.data.loader import ingest_upload
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/data")
 
+UPLOAD_SUFFIXES = SUPPORTED_SUFFIXES + ARCHIVE_SUFFIXES
+# Background jobs outlast the request, so they wait longer for fixture data.
+JOB_DATA_WAIT_S = 600.0
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit",
+    )
+
+
+class _UploadReceiver:
+    """Writes each ``file`` part of a multipart body to its own temp file.
+
+    python-multipart parses synchronously inside ``feed``; its callbacks only
+    queue part events, which are then written out off the event loop.
+    """
+
+    def __init__(self, boundary: bytes, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.sources: list[tuple[str, Path]] = []
+        self.hashes: list[str] = []
+        self.received = 0
+        self._events: list[tuple[str, bytes]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._file: IO[bytes] | None = None
+        self._digest = hashlib.sha256()
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    async def feed(self, chunk: bytes) -> None:
+        self._parser.write(chunk)
+        await self._drain()
+
+    async def finish(self) -> None:
+        self._parser.finalize()
+        await self._drain()
+        if self._file is not None:
+            raise HTTPException(status_code=400, detail="Incomplete multipart body")
+
+    def discard(self) -> None:
+        """Close and remove every file written so far."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for _, path in self.sources:
+            path.unlink(missing_ok=True)
 
-class UploadResponse(BaseModel):
-    status: str
-    table: str
-    rows: int
-    message: str
+    async def _drain(self) -> None:
+        events, self._events = self._events, []
+        for kind, payload in events:
+            if kind == "part":
+                self._open(payload)
+            elif self._file is None:
+                continue  # a non-file form field
+            elif kind == "data":
+                self.received += len(payload)
+                if self.max_bytes and self.received > self.max_bytes:
+                    raise _too_large(self.max_bytes)
+                self._digest.update(payload)
+                await run_in_threadpool(self._file.write, payload)
+            else:
+                self._file.close()
+                self._file = None
+                self.hashes.append(self._digest.hexdigest())
 
+    def _open(self, disposition: bytes) -> None:
+        _, options = parse_options_header(disposition)
+        if options.get(b"name") != b"file":
+            return
+        name = options.get(b"filename", b"").decode("utf-8", "replace")
+        if not name:
+            raise HTTPException(status_code=400, detail="No filename provided")
+        suffix = Path(name).suffix.lower()
+        if suffix not in UPLOAD_SUFFIXES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format: {suffix}. "
+                "Use CSV, Excel, Parquet, or ZIP.",
+            )
+        # Closed at the part's end, or by ``discard``.
+        self._file = tempfile.NamedTemporaryFile(  # noqa: SIM115
+            suffix=suffix, delete=False
+        )
+        self.sources.append((name, Path(self._file.name)))
+        self._digest = hashlib.sha256()
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        self._events.append(("part", self._disposition))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._events.append(("data", data[start:end]))
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_data(request: Request, file: UploadFile) -> UploadResponse:
-    """Upload a GL data file (CSV, Excel, or Parquet) into the data engine."""
-    engine = getattr(request.app.state, "engine", None)
-    if engine is None:
-        raise HTTPException(status_code=503, detail="Data engine not initialized")
+    def _on_part_end(self) -> None:
+        self._events.append(("end", b""))
 
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided")
 
-    suffix = Path(file.filename).suffix.lower()
-    if suffix not in (".csv", ".xlsx", ".xls", ".parquet"):
+async def _receive_uploads(
+    stream: AsyncIterable[bytes], boundary: bytes, max_bytes: int
+) -> _UploadReceiver:
+    """Write the ``file`` parts of a multipart body to temp files as it arrives.
+
+    Raises 413 (removing every partial file) once more than ``max_bytes`` of
+    file data has arrived; 0 means no limit.
+    """
+    receiver = _UploadReceiver(boundary, max_bytes)
+    try:
+        async for chunk in stream:
+            await receiver.feed(chunk)
+        await receiver.finish()
+    except MultipartParseError as e:
+        receiver.discard()
         raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported format: {suffix}. Use CSV, Excel, or Parquet.",
+            status_code=400, detail=f"Malformed multipart body: {e}"
+        ) from e
+    except BaseException:
+        receiver.discard()
+        raise
+    return receiver
+
+
+def _get_jobs(request: Request) -> JobRegistry:
+    jobs: JobRegistry | None = getattr(request.app.state, "jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="Job registry not initialized")
+    return jobs
+
+
+def _parse_sheet_map(entries: list[str]) -> dict[str, str] | None:
+    """Parse ``sheet=<name>:<table>`` query values into a sheet map."""
+    sheet_map: dict[str, str] = {}
+    for entry in entries:
+        name, sep, table = entry.rpartition(":")
+        if not sep or not name or table not in TABLE_SCHEMAS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sheet mapping {entry!r}: use <sheet>:<table> with "
+                f"table one of {', '.join(TABLE_SCHEMAS)}",
+            )
+        sheet_map[name] = table
+    return sheet_map or None
+
+
+def _job_body(snapshot: dict[str, Any]) -> dict[str, Any]:
+    job_id = snapshot["job_id"]
+    return {
+        **snapshot,
+        "status_url": f"{router.prefix}/jobs/{job_id}",
+        "events_url": f"{router.prefix}/jobs/{job_id}/events",
+    }
+
+
+async def _run_ingest(
+    request: Request,
+    jobs: JobRegistry,
+    job_id: str,
+    sources: list[tuple[str, Path]],
+    sheet_map: dict[str, str] | None = None,
+) -> None:
+    """Worker body: wait for the engagement's data, then ingest and count rows."""
+    job = jobs.get(job_id)
+    assert job is not None
+    settings = get_settings()
+    try:
+        estimates = [await run_in_threadpool(estimate_rows, p) for _, p in sources]
+        known = [e for e in estimates if e is not None]
+        estimate = sum(known) if len(known) == len(estimates) else None
+        jobs.update(job_id, phase="waiting_for_data", rows_estimated=estimate)
+        # The default engagement's fixture load must finish first, or it would
+        # overwrite the uploaded postings.
+        async with engagement_engine(
+            request, job.engagement_id, needs=FIXTURE_TABLES, wait_s=JOB_DATA_WAIT_S
+        ) as engine:
+            try:
+                result = await engine.arun(
+                    ingest_files,
+                    engine,
+                    sources,
+                    table_name=job.table,
+                    report=functools.partial(jobs.update, job_id),
+                    mode=job.mode,
+                    workers=settings.ingest_workers or None,
+                    max_bytes=settings.upload_max_mb * 1024 * 1024,
+                    excel=ExcelOptions(
+                        engine=settings.excel_engine,
+                        cache_dir=(
+                            Path(settings.excel_cache_dir)
+                            if settings.excel_cache_dir
+                            else None
+                        ),
+                        sheet_map=sheet_map,
+                        workers=settings.ingest_workers or None,
+                        cache_max_bytes=(
+                            settings.excel_cache_max_mb * 1024 * 1024 or None
+                        ),
+                    ),
+                    dataset_dir=(
+                        Path(settings.postings_dataset_dir) / job.engagement_id
+                        if settings.postings_dataset_dir
+                        else None
+                    ),
+                )
+            except ValidationError as e:
+                jobs.update(job_id, validation=e.report.to_dict())
+                raise
+        jobs.update(
+            job_id,
+            phase="done",
+            rows_parsed=result.rows,
+            rows_loaded=result.inserted + result.updated,
+            inserted=result.inserted,
+            updated=result.updated,
+            skipped=result.skipped,
+            validation=result.validation.to_dict() if result.validation else None,
+            files=[f.to_dict() for f in result.files],
+        )
+        logger.info(
+            "Ingest job %s (%s) from %s: %d inserted, %d updated, %d skipped",
+            job_id, job.mode, job.filename,
+            result.inserted, result.updated, result.skipped,
         )
+    finally:
+        for _, path in sources:
+            path.unlink(missing_ok=True)
 
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
 
+_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "file": {
+                            "type": "array",
+                            "items": {"type": "string", "format": "binary"},
+                        }
+                    },
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/upload", status_code=202, openapi_extra=_UPLOAD_BODY)
+async def upload_data(
+    request: Request,
+    engagement_id: str = DEFAULT_ENGAGEMENT_ID,
+    mode: IngestMode = "replace",
+    wait: bool = False,
+    sheet: Annotated[list[str] | None, Query()] = None,
+) -> JSONResponse:
+    """Upload GL data files (CSV, Excel, Parquet or ZIP) into an engagement's engine.
+
+    Send one or more ``file`` fields — e.g. twelve monthly extracts, or one
+    ZIP per company code. The files are streamed to disk, then ingested by a
+    background job that parses them in parallel and loads them into
+    ``postings`` in one transaction; the response (202) carries the job id
+    plus status and SSE progress URLs, and the finished job lists per-file
+    row counts and timings. ``wait=true`` blocks until the job finishes and
+    returns its final state.
+
+    ``mode`` is ``replace`` (default), ``append`` or ``upsert``; the latter two
+    merge on the posting key and report inserted / updated / skipped counts.
+
+    Workbooks load each recognised sheet into its table (e.g. a "TB" sheet
+    into ``trial_balance``); ``sheet=<name>:<table>`` (repeatable) maps
+    sheets explicitly instead.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=400, detail="Expected a multipart/form-data body"
+        )
     try:
-        rows = ingest_upload(engine, tmp_path, table_name="postings")
+        validate_engagement_id(engagement_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
-    finally:
-        tmp_path.unlink(missing_ok=True)
+    sheet_map = _parse_sheet_map(sheet or [])
+    jobs = _get_jobs(request)
+
+    max_bytes = get_settings().upload_max_mb * 1024 * 1024
+    declared = request.headers.get("content-length")
+    if max_bytes and declared and declared.isdigit() and int(declared) > max_bytes:
+        raise _too_large(max_bytes)
+    receiver = await _receive_uploads(request.stream(), boundary, max_bytes)
+    sources = receiver.sources
+    if not sources:
+        raise HTTPException(status_code=400, detail="No file provided")
+    received = receiver.received
+    digest = hashlib.sha256()
+    for sha256 in receiver.hashes:
+        digest.update(bytes.fromhex(sha256))
+
+    names = [name for name, _ in sources]
+    job = jobs.create(
+        engagement_id,
+        names[0] if len(names) == 1 else f"{names[0]} (+{len(names) - 1} more)",
+        "postings",
+        mode=mode,
+        bytes_received=received,
+        # One file keeps its own hash; several get a hash of their hashes.
+        sha256=receiver.hashes[0] if len(sources) == 1 else digest.hexdigest(),
+    )
+    jobs.start(
+        job.job_id, _run_ingest(request, jobs, job.job_id, sources, sheet_map)
+    )
+    if not wait:
+        return JSONResponse(status_code=202, content=_job_body(job.to_dict()))
+
+    await jobs.wait(job.job_id)
+    snapshot = jobs.snapshot(job.job_id) or job.to_dict()
+    if snapshot["phase"] == "failed":
+        raise HTTPException(status_code=400, detail=snapshot["error"])
+    return JSONResponse(status_code=200, content=_job_body(snapshot))
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str) -> dict[str, Any]:
+    """Return the current state of an ingest job."""
+    snapshot = _get_jobs(request).snapshot(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return _job_body(snapshot)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job(request: Request, job_id: str) -> StreamingResponse:
+    """Stream ingest progress as Server-Sent Events until the job finishes.
+
+    Emits ``job_progress`` on every change and a final ``job_complete`` or
+    ``job_failed``.
+    """
+    jobs = _get_jobs(request)
+    if jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+    async def events() -> AsyncIterator[str]:
+        async for snapshot in jobs.watch(job_id):
+            phase = snapshot["phase"]
+            event_type = {"done": "job_complete", "failed": "job_failed"}.get(
+                phase, "job_progress"
+            )
+            envelope = {
+                "type": event_type,
+                "job_id": job_id,
+                "timestamp": datetime.now(UTC).isoformat(),
+                "payload": snapshot,
+            }
+            yield f"data: {json.dumps(envelope, default=str)}\n\n"
 
-    return UploadResponse(
-        status="ok",
-        table="postings",
-        rows=rows,
-        message=f"Loaded {rows} rows from {file.filename}",
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
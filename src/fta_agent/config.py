@@ -1,5 +1,8 @@
 """Application configuration via environment variables."""
 
+from typing import Literal
+
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings
 
 
@@ -14,8 +17,68 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
-    # DuckDB
+    # DuckDB engagement database; set a file path to persist it across
+    # restarts (unchanged fixtures are then not reloaded on boot)
     duckdb_path: str = ":memory:"
+    # "replace" materializes fixtures into tables; "view" scans the Parquet
+    # files in place through read_parquet views.
+    fixture_load_mode: Literal["replace", "view"] = "replace"
+    # Fixtures load in the background after startup; data routes wait this
+    # long for the tables they need before answering 503.
+    data_ready_wait_s: float = 5.0
+    # Outcomes database (see scripts/seed_outcomes.py), ATTACHed into the main
+    # engine as "outcomes". Empty keeps outcome tables in the main database.
+    outcomes_duckdb_path: str = Field(
+        default="",
+        validation_alias=AliasChoices("outcomes_duckdb_path", "fta_duckdb_path"),
+    )
+    # Largest accepted upload in MB; 0 disables the limit.
+    upload_max_mb: int = 4096
+    # Worker processes that parse the files of a multi-file or ZIP upload;
+    # 0 uses one per core.
+    ingest_workers: int = 0
+    # Polars engine for Excel uploads ("calamine" needs the `excel` extra) and
+    # where parsed workbooks are cached as Parquet by content hash (empty =
+    # no cache). Past excel_cache_max_mb the least recently used workbooks
+    # are evicted; 0 disables the limit.
+    excel_engine: Literal["calamine", "openpyxl", "xlsx2csv"] = "calamine"
+    excel_cache_dir: str = ".fta_cache/excel"
+    excel_cache_max_mb: int = 2048
+    # Where ingested postings are stored as a Parquet dataset partitioned by
+    # fiscal_year / fiscal_period / company_code (<dir>/<engagement_id>/postings)
+    # and queried through a view, so period filters skip other partitions.
+    # Appends and upserts rewrite files in place, so they wait for running
+    # agent turns to finish and hold new turns back until they are done.
+    # Empty keeps uploaded postings in the DuckDB database only.
+    postings_dataset_dir: str = ""
+    # Per-engagement databases (<dir>/<engagement_id>.duckdb; empty = in-memory).
+    # The default engagement always uses duckdb_path.
+    engagement_data_dir: str = "engagements"
+    # Combined DuckDB memory across engagements before idle ones are closed
+    # LRU-first; 0 disables eviction.
+    engagement_memory_budget_mb: int = 0
+    # Comma-separated columns postings are stored sorted by, so filters on the
+    # leading columns skip row groups by their min/max (e.g.
+    # "gl_account,fiscal_period"). Sorting slows every load, so it is opt-in;
+    # empty keeps load order.
+    postings_cluster_by: str = ""
+    # GL tool results memoized by tool, arguments and the data they read:
+    # the newest entries kept in memory (0 disables the cache), and where they
+    # also persist across restarts, keyed by table content (empty = memory only).
+    tool_cache_entries: int = 256
+    tool_cache_dir: str = ".fta_cache/tools"
+    # Query-result cache budget in MB; 0 disables caching.
+    duckdb_result_cache_mb: int = 0
+    # Resource governance. Empty / 0 leaves the DuckDB default in place.
+    duckdb_memory_limit: str = ""  # e.g. "4GB"
+    duckdb_threads: int = 0
+    duckdb_temp_directory: str = ""  # spill location for out-of-core operators
+    duckdb_query_timeout_s: float = 0.0
+    # Query instrumentation (see GET /api/debug/queries)
+    duckdb_slow_query_ms: float = 500.0
+    # Re-run slow queries under EXPLAIN ANALYZE and keep the plan in the log
+    duckdb_explain_slow_queries: bool = False
+    duckdb_query_log_size: int = 200
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "extra": "ignore"}
 
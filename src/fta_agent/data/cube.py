@@ -0,0 +1,119 @@
+"""Posting aggregate cube for the GL tools.
+
+Most tool questions — how active is an account, what is the P&L for a
+period — need only sums and counts at account-by-period grain, yet answering
+them from ``postings`` rescans every line. ``refresh_cube`` materializes
+``postings_cube`` once per postings load, at the grain ``CUBE_GRAIN``, with
+line counts, amount sums, posting-date bounds and, for the higher-cardinality
+dimensions, the distinct values seen (exact lists; at this grain they stay
+small, and unlike a count they can be merged across cells).
+
+The cube is tied to the postings data it was built from: its data stamp
+(``DataEngine.data_stamp``) is derived from the stamp of ``postings`` at
+build time. Tools ask ``current_cube`` before using it, so a cube left behind
+by a later write to ``postings``, or one newer than an agent turn's snapshot,
+is never read; they fall back to the raw table until the next refresh.
+Stamps are stored in the database, so on a persistent database a warm
+restart keeps using the cube instead of rebuilding it.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from fta_agent.data.engine import DataEngine
+
+logger = logging.getLogger(__name__)
+
+CUBE_TABLE = "postings_cube"
+SOURCE_TABLE = "postings"
+
+# Cube grain: the columns tools filter and group postings by.
+CUBE_GRAIN = (
+    "gl_account", "fiscal_period", "document_category", "debit_credit", "lob",
+)
+# Dimensions kept as distinct-value lists per cell.
+CUBE_DISTINCT = {
+    "profit_center": "profit_centers",
+    "cost_center": "cost_centers",
+    "functional_area": "functional_areas",
+    "state": "states",
+}
+# Measures are named apart from posting columns, so a tool filter on, say,
+# ``amount`` or ``posting_date`` fails to bind against the cube and the tool
+# falls back to the raw table instead of silently filtering an aggregate.
+_REQUIRED = (*CUBE_GRAIN, "amount", "posting_date", *CUBE_DISTINCT)
+
+
+def _cube_sql() -> str:
+    distinct = ",\n            ".join(
+        f"list(DISTINCT {col}) FILTER (WHERE {col} IS NOT NULL) AS {name}"
+        for col, name in CUBE_DISTINCT.items()
+    )
+    return f"""
+        SELECT
+            {", ".join(CUBE_GRAIN)},
+            COUNT(*) AS line_count,
+            SUM(amount) AS amount_total,
+            MIN(posting_date) AS first_posting_date,
+            MAX(posting_date) AS last_posting_date,
+            {distinct}
+        FROM {SOURCE_TABLE}
+        GROUP BY {", ".join(CUBE_GRAIN)}
+    """
+
+
+def refresh_cube(engine: DataEngine) -> bool:
+    """(Re)build the cube from the current postings. Return whether it built.
+
+    Postings without every column the cube needs (a partial upload) get no
+    cube, and any earlier one is dropped.
+    """
+    if SOURCE_TABLE not in engine.tables():
+        return False
+    source = engine.data_stamp(SOURCE_TABLE)
+    empty = engine.execute(f"SELECT * FROM {SOURCE_TABLE} LIMIT 0")
+    columns = {d[0] for d in empty.description}
+    if missing := [c for c in _REQUIRED if c not in columns]:
+        logger.info("No %s: postings lack %s", CUBE_TABLE, ", ".join(missing))
+        engine.execute(f"DROP TABLE IF EXISTS {CUBE_TABLE}")
+        return False
+    # Without a source stamp (postings being written) the cube is built
+    # unstamped, and stays unused until the next refresh.
+    stamp = _cube_stamp(source) if source is not None else None
+    engine.materialize(CUBE_TABLE, _cube_sql(), stamp=stamp)
+    row = engine.execute(f"SELECT COUNT(*) FROM {CUBE_TABLE}").fetchone()
+    logger.info("Built %s: %d cells", CUBE_TABLE, row[0] if row else 0)
+    return True
+
+
+def ensure_cube(engine: DataEngine) -> bool:
+    """Build the cube unless the current one matches postings. Return whether built."""
+    if current_cube(engine) is not None:
+        return False
+    return refresh_cube(engine)
+
+
+def current_cube(engine: DataEngine) -> str | None:
+    """The cube table if it reflects postings as reads here see them, else None.
+
+    Stamps name the current data, so inside a ``snapshot`` they are trusted
+    only while it reads the current versions of both tables; an older
+    snapshot scans postings.
+    """
+    tables = [SOURCE_TABLE, CUBE_TABLE]
+    versions = engine.read_versions(tables)
+    if versions is None:
+        return None
+    source = engine.data_stamp(SOURCE_TABLE)
+    if source is None or engine.data_stamp(CUBE_TABLE) != _cube_stamp(source):
+        return None
+    # Either table may have been written while the stamps were read.
+    if engine.read_versions(tables) != versions:
+        return None
+    return CUBE_TABLE
+
+
+def _cube_stamp(source: str) -> str:
+    return f"{SOURCE_TABLE}:{source}"
+
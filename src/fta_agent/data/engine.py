@@ -2,43 +2,1809 @@
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import (
+    AbstractContextManager,
+    asynccontextmanager,
+    contextmanager,
+    suppress,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal, ParamSpec, TypeVar
+from urllib.parse import unquote
 
 import duckdb
 import polars as pl
+import pyarrow as pa
+
+from fta_agent.config import Settings
+from fta_agent.data.query_cache import (
+    CacheStats,
+    QueryCache,
+    TableVersions,
+    VersionState,
+    mutation_targets,
+    normalize_sql,
+)
+from fta_agent.data.query_log import QueryLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = max(2, min(8, os.cpu_count() or 2))
+# Longest an Arrow view swap waits for in-flight readers before dropping.
+VIEW_SYNC_TIMEOUT_S = 30.0
+# Durable per-table data stamps (see ``DataEngine.data_stamp``).
+STAMP_TABLE = "_fta_data_stamps"
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+LoadMode = Literal["replace", "append", "view"]
+MergeMode = Literal["append", "upsert"]
+
+
+@dataclass
+class _Snapshot:
+    """A private cursor holding the read transaction of ``DataEngine.snapshot``.
+
+    The cursor is opened outside the pool, so a long-lived snapshot (a whole
+    agent turn) never holds a pool slot other readers are waiting for.
+    """
+
+    engine: DataEngine
+    cursor: duckdb.DuckDBPyConnection
+    lock: threading.RLock
+    # Engine data versions the snapshot reads; tables written while it was
+    # being pinned count as in flight. See ``read_versions``.
+    versions: VersionState = field(init=False)
+    # Whether the snapshot counts as open against dataset file rewrites, and
+    # whether it was closed (see ``DataEngine._open_snapshot``).
+    counted: bool = field(default=False, init=False)
+    closed: bool = field(default=False, init=False)
+
+    def pin(self) -> None:
+        """Start a transaction and fix its snapshot with a catalog read.
+
+        DuckDB assigns a transaction's snapshot at its first catalog access,
+        not at BEGIN, so the read is what makes later swaps invisible.
+        """
+        with self.lock:
+            before = self.engine._versions.state()
+            self.cursor.begin()
+            self.cursor.execute("SELECT COUNT(*) FROM duckdb_tables()").fetchall()
+            self.versions = before.until(self.engine._versions.state())
+
+    def recover(self) -> None:
+        """Re-pin after a failed query if the failure aborted the transaction.
+
+        An interrupt (a deadline) or an execution error aborts it; a bind
+        error does not, and then the snapshot is left as it was.
+        """
+        with self.lock:
+            try:
+                self.cursor.execute("SELECT 1").fetchall()
+                return
+            except duckdb.TransactionException:
+                pass
+            self.cursor.rollback()
+            self.pin()
+
+
+_snapshot: contextvars.ContextVar[_Snapshot | None] = contextvars.ContextVar(
+    "fta_engine_snapshot", default=None
+)
+
+
+class QueryTimeoutError(TimeoutError):
+    """A query exceeded its deadline and was interrupted."""
+
+    def __init__(self, sql: str, timeout_s: float) -> None:
+        self.sql = sql
+        self.timeout_s = timeout_s
+        super().__init__(f"Query exceeded {timeout_s:g}s deadline and was interrupted")
+
+
+def sql_literal(value: str) -> str:
+    """Quote a string as a SQL literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def sql_identifier(name: str) -> str:
+    """Quote a column name as a SQL identifier."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _hive_keys(dataset: Path) -> list[str]:
+    """Partition columns of a hive-style dataset, read off its first file."""
+    first = next(dataset.rglob("*.parquet"), None)
+    if first is None:
+        raise ValueError(f"No Parquet files under {dataset}")
+    parts = first.relative_to(dataset).parts[:-1]
+    return [part.split("=", 1)[0] for part in parts if "=" in part]
+
+
+def _hive_partition(file: Path, dataset: Path) -> dict[str, str]:
+    """Partition values of a dataset file, read off its directory names."""
+    parts = file.relative_to(dataset).parts[:-1]
+    pairs = (part.split("=", 1) for part in parts if "=" in part)
+    return {key: unquote(value) for key, value in pairs}
+
+
+@dataclass
+class ExecuteResult:
+    """Rows fetched by ``DataEngine.execute``, read like a DuckDB cursor."""
+
+    description: list[tuple[Any, ...]]
+    rows: list[tuple[Any, ...]]
+    _position: int = field(default=0, repr=False)
+
+    def fetchone(self) -> tuple[Any, ...] | None:
+        if self._position >= len(self.rows):
+            return None
+        self._position += 1
+        return self.rows[self._position - 1]
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        rest = self.rows[self._position :]
+        self._position = len(self.rows)
+        return rest
+
+
+@dataclass
+class MergeResult:
+    """Row counts from ``DataEngine.merge_table``."""
+
+    inserted: int
+    updated: int
+    skipped: int
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+        }
+
+
+@dataclass
+class PoolStats:
+    """Point-in-time counters for a CursorPool."""
+
+    max_size: int
+    created: int
+    in_use: int
+    peak_in_use: int
+    acquisitions: int
+    waits: int
+    total_wait_ms: float
+    max_wait_ms: float
+
+    @property
+    def utilisation(self) -> float:
+        """Fraction of the pool currently checked out (0.0-1.0)."""
+        return self.in_use / self.max_size if self.max_size else 0.0
+
+    @property
+    def avg_wait_ms(self) -> float:
+        """Mean wait per acquisition, including the ones that did not wait."""
+        return self.total_wait_ms / self.acquisitions if self.acquisitions else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "max_size": self.max_size,
+            "created": self.created,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "utilisation": round(self.utilisation, 3),
+            "acquisitions": self.acquisitions,
+            "waits": self.waits,
+            "total_wait_ms": round(self.total_wait_ms, 3),
+            "avg_wait_ms": round(self.avg_wait_ms, 3),
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+class CursorPool:
+    """Bounded pool of DuckDB cursors over a single database instance.
+
+    Each cursor is an independent connection to the same database, so
+    queries checked out on different threads run concurrently inside DuckDB
+    instead of serializing on one connection. Cursors are created lazily up
+    to ``max_size``; callers beyond that block until one is released.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, max_size: int) -> None:
+        if max_size < 1:
+            msg = f"Cursor pool size must be >= 1, got {max_size}"
+            raise ValueError(msg)
+        self._conn = conn
+        self._max_size = max_size
+        self._idle: list[duckdb.DuckDBPyConnection] = []
+        self._all: list[duckdb.DuckDBPyConnection] = []
+        self._cond = threading.Condition()
+        # id(cursor) -> serial of its current checkout, for wait_released
+        self._checkouts: dict[int, int] = {}
+        self._serial = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._acquisitions = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._closed = False
+
+    def acquire(self) -> duckdb.DuckDBPyConnection:
+        """Check out a cursor, blocking while the pool is exhausted."""
+        start = time.perf_counter()
+        waited = False
+        with self._cond:
+            while (cursor := self._take()) is None:
+                waited = True
+                self._cond.wait()
+            self._check_out(cursor, time.perf_counter() - start, waited)
+        return cursor
+
+    def try_acquire(self) -> duckdb.DuckDBPyConnection | None:
+        """Check out a cursor if one is free right now; never blocks."""
+        with self._cond:
+            cursor = self._take()
+            if cursor is not None:
+                self._check_out(cursor, 0.0, waited=False)
+        return cursor
+
+    def _take(self) -> duckdb.DuckDBPyConnection | None:
+        if self._closed:
+            msg = "Cursor pool is closed"
+            raise RuntimeError(msg)
+        if self._idle:
+            return self._idle.pop()
+        if len(self._all) < self._max_size:
+            cursor = self._conn.cursor()
+            self._all.append(cursor)
+            return cursor
+        return None
+
+    def _check_out(
+        self, cursor: duckdb.DuckDBPyConnection, wait: float, waited: bool
+    ) -> None:
+        self._serial += 1
+        self._checkouts[id(cursor)] = self._serial
+        self._in_use += 1
+        self._peak_in_use = max(self._peak_in_use, self._in_use)
+        self._acquisitions += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        if waited:
+            self._waits += 1
+
+    def release(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        """Return a cursor to the pool and wake one waiter."""
+        with self._cond:
+            self._in_use -= 1
+            self._checkouts.pop(id(cursor), None)
+            if self._closed:
+                cursor.close()
+                return
+            self._idle.append(cursor)
+            # Wake acquirers and any wait_released callers alike.
+            self._cond.notify_all()
+
+    def wait_released(self, exclude: set[int], timeout: float) -> bool:
+        """Block until every cursor checked out now has been returned once.
+
+        Cursors whose id is in ``exclude`` are not waited for. Returns False
+        if ``timeout`` seconds pass first.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            pending = {c: n for c, n in self._checkouts.items() if c not in exclude}
+            while any(self._checkouts.get(c) == n for c, n in pending.items()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return PoolStats(
+                max_size=self._max_size,
+                created=len(self._all),
+                in_use=self._in_use,
+                peak_in_use=self._peak_in_use,
+                acquisitions=self._acquisitions,
+                waits=self._waits,
+                total_wait_ms=self._total_wait * 1000,
+                max_wait_ms=self._max_wait * 1000,
+            )
+
+    def close(self) -> None:
+        """Close idle cursors; checked-out cursors close on release."""
+        with self._cond:
+            self._closed = True
+            for cursor in self._idle:
+                cursor.close()
+            self._idle.clear()
+            self._cond.notify_all()
 
 
 class DataEngine:
-    """Lightweight wrapper around DuckDB with Polars DataFrame I/O."""
+    """Lightweight wrapper around DuckDB with Polars DataFrame I/O.
 
-    def __init__(self, db_path: str = ":memory:") -> None:
-        self.conn = duckdb.connect(db_path)
+    Read queries (``query_polars``, ``tables``) run on cursors checked out
+    from a bounded ``CursorPool`` so concurrent sessions do not contend for a
+    single connection. ``execute`` runs on a pooled cursor too and returns
+    its rows already fetched, so the cursor goes straight back to the pool.
 
-    def execute(
-        self, sql: str, params: list[Any] | None = None
-    ) -> duckdb.DuckDBPyConnection:
-        """Execute raw SQL and return the connection for chaining."""
-        if params:
-            return self.conn.execute(sql, params)
-        return self.conn.execute(sql)
-
-    def query_polars(self, sql: str) -> pl.DataFrame:
-        """Execute SQL and return results as a Polars DataFrame."""
-        return self.conn.execute(sql).pl()
-
-    def load_polars(self, df: pl.DataFrame, table_name: str) -> None:
-        """Load a Polars DataFrame into a persistent DuckDB table."""
+    The ``a*`` methods are awaitable counterparts that run on a dedicated
+    executor sized to the pool, so async routes never block the event loop
+    on a DuckDB scan. ``query_batch`` runs a tool's independent queries side
+    by side on pooled cursors.
+
+    Arrow data loaded in ``view`` mode is registered zero-copy. DuckDB scopes
+    such registrations to a single connection, so the engine keeps its own
+    registry and replays it onto each cursor when the cursor is checked out.
+
+    Tables named in ``cluster_keys`` are stored sorted by those columns
+    whenever the engine writes them (replace, append, merge and Parquet
+    export), so DuckDB's per-segment min/max statistics let filters on the
+    leading keys skip most of the table. Arrow ``view`` loads are scanned in
+    place and keep their own order.
+
+    Every write through the engine bumps a per-table data version. When
+    ``result_cache_bytes`` is non-zero, ``query_polars`` results are cached
+    under the normalized SQL plus the versions of the tables it mentions, so
+    repeated aggregates are served from memory until their inputs change.
+    Versions restart with the process; ``data_stamp`` is their durable
+    counterpart, stored in the database.
+    """
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        pool_size: int | None = None,
+        result_cache_bytes: int = 0,
+        memory_limit: str | None = None,
+        threads: int | None = None,
+        temp_directory: str | None = None,
+        query_timeout_s: float | None = None,
+        slow_query_ms: float = 500.0,
+        explain_slow: bool = False,
+        query_log_size: int = 200,
+        cluster_keys: Mapping[str, Sequence[str]] | None = None,
+    ) -> None:
+        size = DEFAULT_POOL_SIZE if pool_size is None else pool_size
+        config: dict[str, str | bool | int | float | list[str]] = {}
+        if memory_limit:
+            config["memory_limit"] = memory_limit
+        if threads:
+            config["threads"] = threads
+        if temp_directory:
+            Path(temp_directory).mkdir(parents=True, exist_ok=True)
+            config["temp_directory"] = temp_directory
+        self.db_path = db_path
+        self.pool_size = size
+        self.conn = duckdb.connect(db_path, config=config)
+        self.query_timeout_s = query_timeout_s
+        self.query_log = QueryLog(
+            size=query_log_size, slow_query_ms=slow_query_ms, explain_slow=explain_slow
+        )
+        self._pool = CursorPool(self.conn, size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="duckdb"
+        )
+        # Separate from ``_executor`` so a batch issued from ``arun`` never
+        # waits on the workers its own caller occupies.
+        self._batch_executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="duckdb-batch"
+        )
+        self._views: dict[str, pa.Table] = {}
+        self._views_version = 0
+        self._views_lock = threading.Lock()
+        self._synced_views: dict[int, tuple[int, frozenset[str]]] = {}
+        self._attached: dict[str, str] = {}
+        self._versions = TableVersions()
+        # Guards the stamp table; memoizes stamps by (table, data version).
+        self._stamps_lock = threading.Lock()
+        self._stamps_ready = False
+        self._stamps: dict[str, tuple[int, str]] = {}
+        # Open snapshots vs. in-place rewrites of dataset files, which a
+        # snapshot's transaction cannot hide (see ``_rewriting_files``).
+        self._files_gate = threading.Condition()
+        self._open_snapshots = 0
+        self._files_rewriting = False
+        self._cache = QueryCache(result_cache_bytes) if result_cache_bytes > 0 else None
+        self.cluster_keys = {t: tuple(k) for t, k in (cluster_keys or {}).items() if k}
+
+    @classmethod
+    def from_settings(cls, settings: Settings, db_path: str = ":memory:") -> DataEngine:
+        """Build an engine with the DuckDB resource limits from ``Settings``."""
+        return cls(
+            db_path=db_path,
+            result_cache_bytes=settings.duckdb_result_cache_mb * 1024 * 1024,
+            memory_limit=settings.duckdb_memory_limit or None,
+            threads=settings.duckdb_threads or None,
+            temp_directory=settings.duckdb_temp_directory or None,
+            query_timeout_s=settings.duckdb_query_timeout_s or None,
+            slow_query_ms=settings.duckdb_slow_query_ms,
+            explain_slow=settings.duckdb_explain_slow_queries,
+            query_log_size=settings.duckdb_query_log_size,
+            cluster_keys={
+                "postings": [
+                    k.strip() for k in settings.postings_cluster_by.split(",")
+                    if k.strip()
+                ]
+            },
+        )
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Check out a pooled cursor for the duration of the block."""
+        cursor = self._pool.acquire()
+        try:
+            self._sync_views(cursor)
+            yield cursor
+        finally:
+            self._pool.release(cursor)
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Serve this context's reads from one consistent snapshot.
+
+        Reads from ``query_polars`` inside the block (including in threads
+        started through ``arun``, which copies context) run in a single read
+        transaction, so a table swapped in by a concurrent ingest stays
+        invisible until the block ends. Writes are unaffected. Nested calls
+        reuse the outer snapshot. Cached results are keyed on the data
+        versions the snapshot pinned, so an older snapshot only shares
+        entries with reads of the same data.
+
+        A query that fails while executing (not merely binding) or hits its
+        deadline aborts the snapshot's transaction. The snapshot is then
+        pinned again, so later reads in the block still run; they see the
+        data current at that point, which ``read_versions`` reports.
+        """
+        current = _snapshot.get()
+        if current is not None and current.engine is self:
+            yield
+            return
+        snap = self._new_snapshot()
+        try:
+            self._open_snapshot(snap)
+            token = _snapshot.set(snap)
+            try:
+                yield
+            finally:
+                _snapshot.reset(token)
+        finally:
+            self._close_snapshot(snap)
+
+    @asynccontextmanager
+    async def asnapshot(self) -> AsyncIterator[None]:
+        """Async ``snapshot`` for a coroutine such as one agent turn.
+
+        The snapshot is pinned and closed on worker threads of the event
+        loop, not the engine executor, so turns waiting to start never occupy
+        the workers that running turns need. The context variable is set in
+        the calling task so every ``arun`` inherits it.
+        """
+        current = _snapshot.get()
+        if current is not None and current.engine is self:
+            yield
+            return
+        snap = self._new_snapshot()
+        try:
+            await asyncio.to_thread(self._open_snapshot, snap)
+            token = _snapshot.set(snap)
+            try:
+                yield
+            finally:
+                with suppress(ValueError):
+                    # An abandoned async generator is finalized in another
+                    # context; the variable dies with the original one.
+                    _snapshot.reset(token)
+        finally:
+            await asyncio.to_thread(self._close_snapshot, snap)
+
+    def _new_snapshot(self) -> _Snapshot:
+        """A snapshot on a fresh cursor outside the pool, not yet pinned."""
+        cursor = self.conn.cursor()
+        self._sync_views(cursor)
+        return _Snapshot(self, cursor, threading.RLock())
+
+    def _open_snapshot(self, snap: _Snapshot) -> None:
+        """Pin ``snap`` once no dataset files are being rewritten.
+
+        Under the snapshot's lock, so a close racing an abandoned pin (a
+        cancelled ``asnapshot``) either waits for it or turns it into a no-op.
+        """
+        with snap.lock:
+            if snap.closed:
+                return
+            with self._files_gate:
+                self._files_gate.wait_for(lambda: not self._files_rewriting)
+                self._open_snapshots += 1
+            snap.counted = True
+            snap.pin()
+
+    def _close_snapshot(self, snap: _Snapshot) -> None:
+        with snap.lock:
+            snap.closed = True
+            try:
+                # Not active if the pin failed or never ran.
+                with suppress(duckdb.TransactionException):
+                    snap.cursor.rollback()
+            finally:
+                snap.cursor.close()
+                self._synced_views.pop(id(snap.cursor), None)
+                if snap.counted:
+                    with self._files_gate:
+                        self._open_snapshots -= 1
+                        self._files_gate.notify_all()
+
+    @contextmanager
+    def _rewriting_files(self) -> Iterator[None]:
+        """Rewrite dataset files in place while no snapshot is open.
+
+        A view over Parquet files reads whatever files exist when it runs, so
+        a snapshot's transaction cannot keep a rewrite invisible. The block
+        waits for open snapshots to close and new ones wait for the block;
+        rewrites run one at a time. Refused inside a snapshot, which would
+        wait for itself.
+        """
+        if self._active_snapshot() is not None:
+            msg = "Dataset files cannot be rewritten inside a snapshot"
+            raise RuntimeError(msg)
+        with self._files_gate:
+            self._files_gate.wait_for(lambda: not self._files_rewriting)
+            self._files_rewriting = True
+            try:
+                self._files_gate.wait_for(lambda: self._open_snapshots == 0)
+            except BaseException:
+                self._files_rewriting = False
+                self._files_gate.notify_all()
+                raise
+        try:
+            yield
+        finally:
+            with self._files_gate:
+                self._files_rewriting = False
+                self._files_gate.notify_all()
+
+    def _active_snapshot(self) -> _Snapshot | None:
+        snap = _snapshot.get()
+        return snap if snap is not None and snap.engine is self else None
+
+    @contextmanager
+    def _read_cursor(self, sql: str) -> Iterator[duckdb.DuckDBPyConnection]:
+        """The active snapshot's cursor for reads, else a pooled cursor."""
+        snap = self._active_snapshot()
+        if snap is None or mutation_targets(sql) != set():
+            with self.cursor() as cursor:
+                yield cursor
+            return
+        with snap.lock:
+            try:
+                yield snap.cursor
+            except Exception:
+                # Raise the query's error even if the snapshot cannot recover.
+                with suppress(duckdb.Error):
+                    snap.recover()
+                raise
+
+    def binds(self, sql: str) -> bool:
+        """Whether ``sql`` binds against the tables and columns reads here see.
+
+        The statement is only described, never run. Bind errors leave a
+        transaction intact, so inside a snapshot the check uses its cursor.
+        """
+        try:
+            with self._read_cursor(sql) as cursor:
+                cursor.execute(f"DESCRIBE {sql}")
+        except duckdb.Error:
+            return False
+        return True
+
+    def _sync_views(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        """Bring a cursor's Arrow registrations in line with the engine registry."""
+        with self._views_lock:
+            version = self._views_version
+            views = dict(self._views)
+        synced_version, synced_names = self._synced_views.get(
+            id(cursor), (0, frozenset())
+        )
+        if synced_version == version:
+            return
+        for name in synced_names - views.keys():
+            cursor.unregister(name)
+        for name, arrow_table in views.items():
+            cursor.register(name, arrow_table)
+        self._synced_views[id(cursor)] = (version, frozenset(views))
+
+    def _set_view(self, name: str, arrow_table: pa.Table | None) -> None:
+        with self._views_lock:
+            if arrow_table is None:
+                if name not in self._views:
+                    return
+                del self._views[name]
+            else:
+                self._views[name] = arrow_table
+            self._views_version += 1
+
+    @staticmethod
+    def _relation_type(cursor: duckdb.DuckDBPyConnection, name: str) -> str | None:
+        """Return 'BASE TABLE', 'VIEW' or None for a relation in the main schema."""
+        row = cursor.execute(
+            "SELECT table_type FROM information_schema.tables "
+            "WHERE table_catalog = current_database() "
+            "AND table_schema = 'main' AND table_name = ?",
+            [name],
+        ).fetchone()
+        return str(row[0]) if row else None
+
+    def _write_relation(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        table_name: str,
+        source: str,
+        mode: LoadMode,
+    ) -> None:
+        """Materialize, append or view ``source`` (a relation or table function).
+
+        Replacements never leave a window where ``table_name`` is missing or
+        half-written: the new table is built under a staging name, then the
+        old relation is dropped and the staging table renamed in one
+        transaction. Readers see either the old or the new table, and readers
+        inside a ``snapshot`` keep the old one until their snapshot ends.
+        """
+        kind = self._relation_type(cursor, table_name)
+        if mode == "view":
+            if kind == "VIEW":
+                cursor.execute(
+                    f"CREATE OR REPLACE VIEW {table_name} AS SELECT * FROM {source}"
+                )
+                return
+            with self._transaction(cursor):
+                self._drop_relation(cursor, table_name)
+                cursor.execute(f"CREATE VIEW {table_name} AS SELECT * FROM {source}")
+            return
+
+        order = self._cluster_order(cursor, table_name, source)
+        if mode == "append" and kind == "BASE TABLE":
+            cursor.execute(
+                f"INSERT INTO {table_name} BY NAME SELECT * FROM {source}{order}"
+            )
+            return
+
+        staging = f"_fta_swap_{uuid.uuid4().hex[:12]}"
+        cursor.execute(f"CREATE TABLE {staging} AS SELECT * FROM {source}{order}")
+        try:
+            with self._transaction(cursor):
+                self._drop_relation(cursor, table_name)
+                cursor.execute(f"ALTER TABLE {staging} RENAME TO {table_name}")
+        except BaseException:
+            cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+            raise
+
+    def _cluster_order(
+        self, cursor: duckdb.DuckDBPyConnection, table_name: str, source: str
+    ) -> str:
+        """`` ORDER BY`` clause clustering ``table_name``, or "" if it has none.
+
+        Only keys ``source`` actually has are used, so a partial upload is
+        still clustered on whatever leading columns it carries.
+        """
+        keys = self.cluster_keys.get(table_name)
+        if not keys:
+            return ""
+        columns = self._source_columns(cursor, source)
+        present = [sql_identifier(k) for k in keys if k in columns]
+        return f" ORDER BY {', '.join(present)}" if present else ""
+
+    @staticmethod
+    @contextmanager
+    def _transaction(cursor: duckdb.DuckDBPyConnection) -> Iterator[None]:
+        cursor.begin()
+        try:
+            yield
+        except BaseException:
+            cursor.rollback()
+            raise
+        cursor.commit()
+
+    def _await_view_sync(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        """Wait for readers that may predate the latest Arrow registration.
+
+        Cursors pick up registrations at checkout, so one checked out earlier
+        could still resolve a name to the main-schema relation about to be
+        dropped. Snapshot cursors are not pooled and need no wait: their
+        transaction keeps the old relation visible regardless.
+        """
+        if not self._pool.wait_released({id(cursor)}, VIEW_SYNC_TIMEOUT_S):
+            logger.warning(
+                "Readers still active %gs after an Arrow view swap; dropping anyway",
+                VIEW_SYNC_TIMEOUT_S,
+            )
+
+    def _drop_arrow_view(self, cursor: duckdb.DuckDBPyConnection, name: str) -> None:
+        """Retire an Arrow registration once its replacement is in place.
+
+        Other cursors drop it at their next checkout; ``cursor`` drops it now
+        so the statements that follow resolve ``name`` to the new relation.
+        """
+        self._set_view(name, None)
+        self._sync_views(cursor)
+
+    def _drop_relation(self, cursor: duckdb.DuckDBPyConnection, name: str) -> None:
+        kind = self._relation_type(cursor, name)
+        if kind == "VIEW":
+            cursor.execute(f"DROP VIEW {name}")
+        elif kind is not None:
+            cursor.execute(f"DROP TABLE {name}")
+
+    def execute(self, sql: str, params: list[Any] | None = None) -> ExecuteResult:
+        """Execute raw SQL on a pooled cursor and return its fetched rows.
+
+        Meant for DDL, writes and small reads; large results belong in
+        ``query_polars``.
+        """
+        start = time.perf_counter()
+        rows: list[tuple[Any, ...]] | None = None
+        error: str | None = None
+        try:
+            with self._writing(sql), self.cursor() as cursor:
+                result = cursor.execute(sql, params or None)
+                description = result.description or []
+                rows = result.fetchall() if description else []
+                return ExecuteResult(description, rows)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.query_log.record(
+                sql,
+                (time.perf_counter() - start) * 1000,
+                rows=len(rows) if rows is not None else None,
+                error=error,
+            )
+
+    def _writing(self, sql: str) -> AbstractContextManager[None]:
+        """Track the tables a statement may modify as written while it runs."""
+        return self._written(mutation_targets(sql))
+
+    @contextmanager
+    def _written(self, tables: Iterable[str] | None) -> Iterator[None]:
+        """Track ``tables`` (None: every table) as written while the block runs.
+
+        Their data stamps are dropped before the write starts, so a stamp
+        never outlives the data it names, even when the process dies
+        mid-write.
+        """
+        keys = None if tables is None else [t.lower() for t in tables]
+        with self._versions.writing(keys):
+            if keys != []:
+                self._drop_stamps(keys)
+            yield
+
+    def _stamp_table(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        if not self._stamps_ready:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {STAMP_TABLE} "
+                "(table_name VARCHAR PRIMARY KEY, stamp VARCHAR NOT NULL)"
+            )
+            self._stamps_ready = True
+
+    def _drop_stamps(self, tables: list[str] | None) -> None:
+        with self.cursor() as cursor, self._stamps_lock:
+            self._stamp_table(cursor)
+            if tables is None:
+                cursor.execute(f"DELETE FROM {STAMP_TABLE}")
+            else:
+                cursor.execute(
+                    f"DELETE FROM {STAMP_TABLE} WHERE list_contains(?, table_name)",
+                    [tables],
+                )
+
+    def _put_stamp(
+        self, cursor: duckdb.DuckDBPyConnection, table_name: str, stamp: str
+    ) -> None:
+        """Name the data of a write in flight (see ``materialize``).
+
+        The stamps lock is always taken after a cursor: here the caller's.
+        """
+        with self._stamps_lock:
+            self._stamp_table(cursor)
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {STAMP_TABLE} VALUES (?, ?)",
+                [table_name.lower(), stamp],
+            )
+
+    @contextmanager
+    def _deadline(
+        self, cursor: duckdb.DuckDBPyConnection, sql: str, timeout_s: float | None
+    ) -> Iterator[None]:
+        """Interrupt the cursor if the block outlives ``timeout_s``."""
+        if not timeout_s:
+            yield
+            return
+        lock = threading.Lock()
+        state = {"done": False, "fired": False}
+
+        def fire() -> None:
+            with lock:
+                if not state["done"]:
+                    state["fired"] = True
+                    cursor.interrupt()
+
+        timer = threading.Timer(timeout_s, fire)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        except duckdb.InterruptException as e:
+            if state["fired"]:
+                raise QueryTimeoutError(sql, timeout_s) from e
+            raise
+        finally:
+            with lock:
+                state["done"] = True
+            timer.cancel()
+
+    @contextmanager
+    def _progress(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        callback: Callable[[float], None] | None,
+        interval_s: float = 0.25,
+    ) -> Iterator[None]:
+        """Feed the cursor's query progress (0..1) to ``callback`` during the block."""
+        if callback is None:
+            yield
+            return
+        cursor.execute("SET enable_progress_bar = true")
+        cursor.execute("SET enable_progress_bar_print = false")
+        stop = threading.Event()
+
+        def poll() -> None:
+            while not stop.wait(interval_s):
+                pct = cursor.query_progress()
+                if pct >= 0:
+                    callback(min(pct, 100.0) / 100)
+
+        poller = threading.Thread(target=poll, name="duckdb-progress", daemon=True)
+        poller.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            poller.join()
+            cursor.execute("RESET enable_progress_bar")
+
+    def _fetch_polars(
+        self, sql: str, timeout_s: float | None, tag: str | None
+    ) -> pl.DataFrame:
+        """Run a query on a pooled cursor and record it in the query log."""
+        start = time.perf_counter()
+        explain: str | None = None
+        try:
+            with self._read_cursor(sql) as cursor:
+                with self._deadline(cursor, sql, timeout_s):
+                    df = cursor.execute(sql).pl()
+                wall_ms = (time.perf_counter() - start) * 1000
+                if (
+                    self.query_log.explain_slow
+                    and self.query_log.is_slow(wall_ms)
+                    and mutation_targets(sql) == set()
+                ):
+                    explain = self._explain_analyze(cursor, sql)
+        except Exception as e:
+            self.query_log.record(
+                sql,
+                (time.perf_counter() - start) * 1000,
+                tag=tag,
+                error=f"{type(e).__name__}: {e}",
+            )
+            raise
+        self.query_log.record(
+            sql,
+            wall_ms,
+            rows=len(df),
+            nbytes=int(df.estimated_size()),
+            tag=tag,
+            explain=explain,
+        )
+        return df
+
+    def _explain_analyze(
+        self, cursor: duckdb.DuckDBPyConnection, sql: str
+    ) -> str | None:
+        """Re-run a slow query under EXPLAIN ANALYZE and return the plan text."""
+        try:
+            rows = cursor.execute(f"EXPLAIN ANALYZE {sql}").fetchall()
+        except duckdb.Error:
+            return None
+        return "\n".join(str(row[-1]) for row in rows)
+
+    def query_polars(
+        self,
+        sql: str,
+        cache: bool = True,
+        timeout: float | None = None,
+        tag: str | None = None,
+    ) -> pl.DataFrame:
+        """Execute SQL and return results as a Polars DataFrame.
+
+        Served from the result cache when one is configured and ``cache`` is
+        true. Callers must treat cached frames as read-only.
+
+        The query is interrupted after ``timeout`` seconds (default: the
+        engine's ``query_timeout_s``) and ``QueryTimeoutError`` is raised.
+        ``tag`` labels the query in the query log (default: the active
+        ``query_tag``).
+        """
+        timeout_s = self.query_timeout_s if timeout is None else timeout
+        if self._cache is None or not cache or mutation_targets(sql) != set():
+            with self._writing(sql):
+                return self._fetch_polars(sql, timeout_s, tag)
+
+        start = time.perf_counter()
+        normalized = normalize_sql(sql)
+        snap = self._active_snapshot()
+        state = snap.versions if snap is not None else self._versions.state()
+        versions = state.key(normalized)
+        if versions is None:
+            return self._fetch_polars(sql, timeout_s, tag)
+        key = (normalized, versions)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.query_log.record(
+                sql,
+                (time.perf_counter() - start) * 1000,
+                rows=len(cached),
+                nbytes=int(cached.estimated_size()),
+                tag=tag,
+                cached=True,
+            )
+            return cached
+        df = self._fetch_polars(sql, timeout_s, tag)
+        # A snapshot reads exactly its pinned versions, unless a failed query
+        # re-pinned it meanwhile; any other read may have raced a write that
+        # started after ``versions`` was taken.
+        if (
+            snap.versions is state
+            if snap is not None
+            else self._versions.state().key(normalized) == versions
+        ):
+            self._cache.put(key, df)
+        return df
+
+    def query_batch(
+        self,
+        queries: Mapping[str, str],
+        cache: bool = True,
+        timeout: float | None = None,
+        tag: str | None = None,
+    ) -> dict[str, pl.DataFrame]:
+        """Run independent read queries concurrently; return frames by name.
+
+        Each query goes through ``query_polars`` on its own pooled cursor, so
+        caching, deadlines and the query log apply per query. Inside a
+        ``snapshot`` the queries are spread over the snapshot cursor and the
+        pooled cursors that are free and read the same data (see ``_lanes``);
+        when none qualify they run one after another on the snapshot cursor.
+        All queries finish before the first failure is raised.
+        """
+        writes = [n for n, sql in queries.items() if mutation_targets(sql) != set()]
+        if writes:
+            msg = f"query_batch runs reads only; got writes: {', '.join(writes)}"
+            raise ValueError(msg)
+        if len(queries) <= 1:
+            return {
+                name: self.query_polars(sql, cache, timeout, tag)
+                for name, sql in queries.items()
+            }
+        snap = self._active_snapshot()
+        if snap is not None:
+            return self._snapshot_batch(snap, queries, cache, timeout, tag)
+        futures = {
+            name: self._batch_executor.submit(
+                contextvars.copy_context().run,
+                self.query_polars, sql, cache, timeout, tag,
+            )
+            for name, sql in queries.items()
+        }
+        wait(futures.values())
+        return {name: future.result() for name, future in futures.items()}
+
+    def _snapshot_batch(
+        self,
+        snap: _Snapshot,
+        queries: Mapping[str, str],
+        cache: bool,
+        timeout: float | None,
+        tag: str | None,
+    ) -> dict[str, pl.DataFrame]:
+        """``query_batch`` inside a snapshot: queries dealt round-robin to lanes."""
+
+        def run(lane: _Snapshot, names: list[str]) -> dict[str, Any]:
+            _snapshot.set(lane)  # in this lane's copied context only
+            done: dict[str, Any] = {}
+            for name in names:
+                try:
+                    done[name] = self.query_polars(queries[name], cache, timeout, tag)
+                except Exception as e:  # raised below, once every lane is done
+                    done[name] = e
+            return done
+
+        names = list(queries)
+        size = min(len(names), self.pool_size + 1)
+        with self._lanes(snap, list(queries.values()), size) as lanes:
+            futures = [
+                self._batch_executor.submit(
+                    contextvars.copy_context().run, run, lane, names[i :: len(lanes)]
+                )
+                for i, lane in enumerate(lanes)
+            ]
+            wait(futures)
+        results: dict[str, Any] = {}
+        for future in futures:
+            results.update(future.result())
+        for name in names:
+            if isinstance(results[name], Exception):
+                raise results[name]
+        return {name: results[name] for name in names}
+
+    @contextmanager
+    def _lanes(
+        self, snap: _Snapshot, sqls: Sequence[str], count: int
+    ) -> Iterator[list[_Snapshot]]:
+        """``snap`` plus up to ``count - 1`` pooled cursors reading the same data.
+
+        DuckDB cannot share a transaction between cursors, so each extra lane
+        is a pooled cursor that is free right now (the batch never waits for
+        one), pinned when taken. It joins only if the engine versions of
+        every table the queries mention match the snapshot's: nothing they
+        read has been written since the snapshot was pinned. The cursors are
+        rolled back and returned when the block ends.
+        """
+        keys = [snap.versions.key(normalize_sql(sql)) for sql in sqls]
+        lanes = [snap]
+        taken: list[duckdb.DuckDBPyConnection] = []
+        try:
+            while None not in keys and len(lanes) < count:
+                cursor = self._pool.try_acquire()
+                if cursor is None:
+                    break
+                taken.append(cursor)
+                self._sync_views(cursor)
+                lane = _Snapshot(self, cursor, threading.RLock())
+                lane.pin()
+                if [lane.versions.key(normalize_sql(sql)) for sql in sqls] != keys:
+                    break
+                lanes.append(lane)
+            yield lanes
+        finally:
+            for cursor in taken:
+                with suppress(duckdb.TransactionException):
+                    cursor.rollback()
+                self._pool.release(cursor)
+
+    def data_version(self, table_name: str) -> int:
+        """Monotonic counter that advances whenever ``table_name`` is rewritten."""
+        return self._versions.version(table_name)
+
+    def data_stamp(self, table_name: str) -> str | None:
+        """Durable identity of the current data in ``table_name``.
+
+        ``data_version`` restarts with the process; a stamp is stored in the
+        database, so on a persistent database it survives a restart. Every
+        write through the engine drops the stamps of the tables it touches
+        before it starts, and the next call draws a fresh random one, unless
+        the write named its data (``materialize``'s ``stamp``). None while a
+        write to the table is in flight. The stamp is that of the current
+        data, not of an active ``snapshot``'s.
+        """
+        key = table_name.lower()
+        with self._stamps_lock:
+            known, stamp = self._known_stamp(key)
+        if known:
+            return stamp
+        # Cursor before lock, as writers stamping on the cursor they hold do.
+        with self.cursor() as cursor, self._stamps_lock:
+            known, stamp = self._known_stamp(key)
+            if known:
+                return stamp
+            version = self._versions.version(key)
+            self._stamp_table(cursor)
+            row = cursor.execute(
+                f"SELECT stamp FROM {STAMP_TABLE} WHERE table_name = ?", [key]
+            ).fetchone()
+            if row is not None:
+                stamp = str(row[0])
+            else:
+                stamp = uuid.uuid4().hex
+                cursor.execute(f"INSERT INTO {STAMP_TABLE} VALUES (?, ?)", [key, stamp])
+            self._stamps[key] = (version, stamp)
+            return stamp
+
+    def _known_stamp(self, key: str) -> tuple[bool, str | None]:
+        """Answer ``data_stamp`` without the database, if possible.
+
+        ``(True, stamp)`` for a memoized stamp, or None while the table is
+        written; ``(False, None)`` otherwise. Call with ``_stamps_lock`` held.
+        """
+        state = self._versions.state()
+        if state.writing_all or key in state.writing:
+            return True, None
+        known = self._stamps.get(key)
+        if known is not None and known[0] == self._versions.version(key):
+            return True, known[1]
+        return False, None
+
+    def read_versions(self, tables: Iterable[str]) -> tuple[int, ...] | None:
+        """Data versions of ``tables`` as reads in this context see them.
+
+        None when that cannot be pinned down: a write to one of them is in
+        flight, or the active ``snapshot`` reads data older than the current
+        versions. Results keyed on versions should not be cached then.
+        """
+        tables = list(tables)
+        current = self._versions.state().of(tables)
+        snap = self._active_snapshot()
+        if snap is not None and snap.versions.of(tables) != current:
+            return None
+        return current
+
+    def load_polars(
+        self, df: pl.DataFrame, table_name: str, mode: LoadMode = "replace"
+    ) -> None:
+        """Load a Polars DataFrame into DuckDB.
+
+        Modes:
+            replace — materialize into a fresh table, dropping any existing one.
+            append — insert by column name into an existing table (created if
+                missing), without DROP/CREATE.
+            view — register the Arrow buffers zero-copy; queries scan the
+                frame in place and nothing is copied into DuckDB storage.
+        """
         arrow_table = df.to_arrow()
-        self.conn.register("_tmp_load", arrow_table)
-        self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-        self.conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM _tmp_load")
-        self.conn.unregister("_tmp_load")
+        with self._written([table_name]), self.cursor() as cursor:
+            if mode == "view":
+                # Register first, then drop: the name never goes missing.
+                self._set_view(table_name, arrow_table)
+                self._await_view_sync(cursor)
+                self._drop_relation(cursor, table_name)
+                return
+            tmp = f"_tmp_load_{uuid.uuid4().hex[:12]}"
+            cursor.register(tmp, arrow_table)
+            try:
+                self._write_relation(cursor, table_name, tmp, mode)
+            finally:
+                cursor.unregister(tmp)
+            self._drop_arrow_view(cursor, table_name)
+
+    def load_parquet(
+        self,
+        path: str | Path | Sequence[str | Path],
+        table_name: str,
+        mode: LoadMode = "replace",
+        types: dict[str, str] | None = None,
+        progress: Callable[[float], None] | None = None,
+        stamp: str | None = None,
+    ) -> None:
+        """Load Parquet file(s) with DuckDB's native reader, skipping Polars.
+
+        ``path`` may be a file, a glob, a list of files or a hive-partitioned
+        dataset directory (see ``export_parquet``); a list is read in one
+        statement with columns unioned by name, so several files land as one
+        atomic write. In ``view`` mode the table is a ``read_parquet`` view,
+        so nothing is materialized until queried — and over a dataset, filters
+        on partition columns skip the directories that cannot match.
+        ``types`` maps column names to DuckDB types; matching columns are cast
+        in the same scan. ``progress`` is called with the completed fraction
+        while the load runs. ``stamp`` names the loaded data for ``data_stamp``
+        (see ``materialize``).
+        """
+        if isinstance(path, str | Path) and Path(path).is_dir():
+            source = self._dataset_source(Path(path), types or {})
+        elif isinstance(path, str | Path):
+            source = f"read_parquet({sql_literal(str(path))})"
+        else:
+            files = ", ".join(sql_literal(str(p)) for p in path)
+            source = f"read_parquet([{files}], union_by_name = true)"
+        with self._written([table_name]), self.cursor() as cursor:
+            if types:
+                source = self._cast_source(cursor, source, types)
+            with self._progress(cursor, progress):
+                self._write_relation(cursor, table_name, source, mode)
+            self._drop_arrow_view(cursor, table_name)
+            if stamp is not None:
+                self._put_stamp(cursor, table_name, stamp)
+
+    def materialize(self, table_name: str, sql: str, stamp: str | None = None) -> None:
+        """Replace ``table_name`` with the result of a query, atomically.
+
+        For derived tables (aggregates, extracts) built from other tables:
+        the swap and clustering behave as for any ``replace`` load.
+        ``stamp`` names the result for ``data_stamp`` when the caller can
+        identify it, e.g. by the stamps of the tables it was derived from.
+        """
+        with self._written([table_name]), self.cursor() as cursor:
+            self._write_relation(cursor, table_name, f"({sql})", "replace")
+            self._drop_arrow_view(cursor, table_name)
+            if stamp is not None:
+                self._put_stamp(cursor, table_name, stamp)
+
+    @staticmethod
+    def _dataset_source(dataset: Path, types: dict[str, str]) -> str:
+        """``read_parquet`` over a hive dataset, partition columns typed.
+
+        Partition values are typed from ``types`` rather than guessed from
+        directory names, so company code ``0100`` stays a string and a filter
+        on a partition column prunes files instead of casting every value.
+        """
+        keys = _hive_keys(dataset)
+        hive_types = ", ".join(
+            f"{sql_literal(k)}: {sql_literal(types[k])}" for k in keys if k in types
+        )
+        pattern = sql_literal(str(dataset.resolve() / "**" / "*.parquet"))
+        options = "hive_partitioning = true, union_by_name = true"
+        if hive_types:
+            options += f", hive_types = {{{hive_types}}}"
+        return f"read_parquet({pattern}, {options})"
+
+    def export_parquet(
+        self,
+        table_name: str,
+        path: str | Path,
+        partition_by: Sequence[str] = (),
+    ) -> Path:
+        """Write a table as Parquet; with ``partition_by``, a hive dataset.
+
+        A dataset is a directory tree ``col=value/.../data_0.parquet`` whose
+        files also keep the partition columns, so they read back with the
+        table's own column order. It is written beside ``path`` and swapped
+        in with renames, so a failed export leaves the previous one intact.
+        Returns the resolved path.
+        """
+        target = Path(path).resolve()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        scratch = target.with_name(f".{target.name}.tmp-{uuid.uuid4().hex[:12]}")
+        retired = target.with_name(f".{target.name}.old-{uuid.uuid4().hex[:12]}")
+        options = "FORMAT parquet"
+        if partition_by:
+            columns = ", ".join(sql_identifier(c) for c in partition_by)
+            options += f", PARTITION_BY ({columns}), WRITE_PARTITION_COLUMNS true"
+        try:
+            with self.cursor() as cursor:
+                order = self._cluster_order(cursor, table_name, table_name)
+                cursor.execute(
+                    f"COPY (SELECT * FROM {table_name}{order}) "
+                    f"TO {sql_literal(str(scratch))} ({options})"
+                )
+            # A view over the old files may be open in a snapshot.
+            with self._rewriting_files():
+                if target.exists():
+                    target.rename(retired)
+                scratch.rename(target)
+        finally:
+            for leftover in (scratch, retired):
+                if leftover.is_dir():
+                    shutil.rmtree(leftover, ignore_errors=True)
+                else:
+                    leftover.unlink(missing_ok=True)
+        logger.info("Exported %s to %s", table_name, target)
+        return target
+
+    def load_csv(
+        self,
+        path: str | Path,
+        table_name: str,
+        mode: LoadMode = "replace",
+        types: dict[str, str] | None = None,
+        progress: Callable[[float], None] | None = None,
+    ) -> None:
+        """Load CSV file(s) with DuckDB's parallel CSV reader, skipping Polars.
+
+        The file is parsed straight into the target table in one pass.
+        ``types`` maps column names to DuckDB types; columns present in the
+        file are parsed as that type instead of being sniffed, so account
+        numbers keep their leading zeros. ``progress`` is called with the
+        completed fraction while the load runs.
+        """
+        reader = f"read_csv({sql_literal(str(path))}, header = true"
+        with self._written([table_name]), self.cursor() as cursor:
+            present = set(self._source_columns(cursor, reader + ")"))
+            known = {c: t for c, t in (types or {}).items() if c in present}
+            if known:
+                pairs = ", ".join(
+                    f"{sql_literal(c)}: {sql_literal(t)}" for c, t in known.items()
+                )
+                reader += f", types = {{{pairs}}}"
+            with self._progress(cursor, progress):
+                self._write_relation(cursor, table_name, reader + ")", mode)
+            self._drop_arrow_view(cursor, table_name)
+
+    @staticmethod
+    def _source_columns(
+        cursor: duckdb.DuckDBPyConnection, source: str
+    ) -> dict[str, str]:
+        """Column names and types a table function would produce."""
+        rows = cursor.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _cast_source(
+        self, cursor: duckdb.DuckDBPyConnection, source: str, types: dict[str, str]
+    ) -> str:
+        """Wrap ``source`` in a projection casting columns whose type differs."""
+        columns = self._source_columns(cursor, source)
+        casts = {
+            c: t for c, t in types.items() if c in columns and columns[c] != t
+        }
+        if not casts:
+            return source
+        select = ", ".join(
+            f"CAST({sql_identifier(c)} AS {casts[c]}) AS {sql_identifier(c)}"
+            if c in casts
+            else sql_identifier(c)
+            for c in columns
+        )
+        return f"(SELECT {select} FROM {source})"
+
+    def merge_table(
+        self,
+        target: str,
+        source: str,
+        keys: tuple[str, ...] | list[str],
+        mode: MergeMode = "upsert",
+    ) -> MergeResult:
+        """Merge the rows of table ``source`` into ``target``, keyed on ``keys``.
+
+        Every source row is classified in one set-based pass: keys absent
+        from ``target`` are inserted; existing keys are skipped in ``append``
+        mode, and in ``upsert`` mode replaced when any shared column differs
+        (identical rows are skipped). Duplicate keys within ``source`` count
+        as skipped. Changes are applied in a single transaction. A view-mode
+        ``target`` is materialized first, since views cannot be updated.
+        """
+        with self._views_lock:
+            arrow_view = self._views.get(target)
+        with self._written([target]), self.cursor() as cursor:
+            if arrow_view is not None:
+                tmp = f"_tmp_load_{uuid.uuid4().hex[:12]}"
+                cursor.register(tmp, arrow_view)
+                try:
+                    self._write_relation(cursor, target, tmp, "replace")
+                finally:
+                    cursor.unregister(tmp)
+                self._drop_arrow_view(cursor, target)
+            elif self._relation_type(cursor, target) == "VIEW":
+                self._write_relation(
+                    cursor, target, f"(SELECT * FROM {target})", "replace"
+                )
+            return self._merge(cursor, target, source, keys, mode)
+
+    def _check_merge_keys(
+        self, cursor: duckdb.DuckDBPyConnection, source: str, keys: Sequence[str]
+    ) -> None:
+        columns = self._source_columns(cursor, source)
+        missing = [k for k in keys if k not in columns]
+        if missing:
+            raise ValueError(f"Merge key column(s) missing from upload: {missing}")
+
+    @staticmethod
+    def _count(cursor: duckdb.DuckDBPyConnection, relation: str) -> int:
+        row = cursor.execute(f"SELECT COUNT(*) FROM {relation}").fetchone()
+        return int(row[0]) if row else 0
+
+    def merge_dataset(
+        self,
+        table_name: str,
+        dataset: str | Path,
+        source: str,
+        keys: Sequence[str],
+        partition_by: Sequence[str],
+        mode: MergeMode = "upsert",
+    ) -> MergeResult:
+        """Merge table ``source`` into a hive dataset ``table_name`` reads from.
+
+        ``dataset`` was written by ``export_parquet`` with ``partition_by``
+        and ``table_name`` is a view over it. Rows are classified as in
+        ``merge_table``, probing only the files whose partition values match
+        the upload's on the key's partition columns. New and changed rows are
+        added as new files in their partitions, and only the files holding
+        the old versions of changed rows are rewritten, so the cost scales
+        with the delta rather than the dataset. Each file is replaced with
+        one rename, and the merge runs while no ``snapshot`` is open (see
+        ``_rewriting_files``), so agent turns never see it half done; a reader
+        outside a snapshot scanning during the merge may see a changed row
+        twice.
+        """
+        root = Path(dataset).resolve()
+        q = sql_identifier
+        with (
+            self._rewriting_files(),
+            self._written([table_name]),
+            self.cursor() as cursor,
+        ):
+            self._check_merge_keys(cursor, source, keys)
+            total = self._count(cursor, source)
+            if not total:
+                return MergeResult(inserted=0, updated=0, skipped=0)
+            probe = self._probe_files(cursor, root, source, keys, partition_by)
+            if not probe:
+                # No file can hold these keys: everything is new.
+                target = f"(SELECT * FROM {table_name} LIMIT 0)"
+            else:
+                files = ", ".join(sql_literal(str(f)) for f in probe)
+                target = (
+                    f"read_parquet([{files}], union_by_name = true, "
+                    "hive_partitioning = false, filename = true)"
+                )
+            delta = "_fta_merge_delta"
+            try:
+                counts, shared = self._classify(
+                    cursor, target, source, keys, mode, delta
+                )
+                order = self._cluster_order(cursor, table_name, delta)
+                if counts.get("insert") or counts.get("update"):
+                    self._add_files(cursor, root, delta, shared, partition_by, order)
+                if counts.get("update"):
+                    on = " AND ".join(f"t.{q(k)} = d.{q(k)}" for k in keys)
+                    changed = (
+                        f"(SELECT * FROM {delta} WHERE _action = 'update') d"
+                    )
+                    stale = cursor.execute(
+                        f"SELECT DISTINCT t.filename FROM {target} t "
+                        f"SEMI JOIN {changed} ON {on}"
+                    ).fetchall()
+                    for (name,) in stale:
+                        self._rewrite_without(cursor, Path(name), changed, on, order)
+            finally:
+                cursor.execute(f"DROP TABLE IF EXISTS {delta}")
+        logger.info("Merged %s into dataset %s", source, root)
+        return self._merge_result(counts, total)
+
+    def _probe_files(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        dataset: Path,
+        source: str,
+        keys: Sequence[str],
+        partition_by: Sequence[str],
+    ) -> list[Path]:
+        """Dataset files that may hold a key of ``source``."""
+        files = sorted(dataset.rglob("*.parquet"))
+        pinned = [c for c in partition_by if c in keys]
+        if not pinned:
+            return files
+        columns = ", ".join(f"CAST({sql_identifier(c)} AS VARCHAR)" for c in pinned)
+        wanted = set(
+            cursor.execute(f"SELECT DISTINCT {columns} FROM {source}").fetchall()
+        )
+        return [
+            f for f in files
+            if tuple(_hive_partition(f, dataset).get(c) for c in pinned) in wanted
+        ]
+
+    @staticmethod
+    def _add_files(
+        cursor: duckdb.DuckDBPyConnection,
+        dataset: Path,
+        delta: str,
+        columns: Sequence[str],
+        partition_by: Sequence[str],
+        order: str,
+    ) -> None:
+        """Write the delta's new and changed rows as new files in their partitions.
+
+        Files are written to a scratch tree beside ``dataset`` and renamed
+        into place, so readers never see a partly written file.
+        """
+        scratch = dataset.with_name(f".{dataset.name}.tmp-{uuid.uuid4().hex[:12]}")
+        select = ", ".join(sql_identifier(c) for c in columns)
+        by = ", ".join(sql_identifier(c) for c in partition_by)
+        try:
+            cursor.execute(
+                f"COPY (SELECT {select} FROM {delta} WHERE _action <> 'skip'{order}) "
+                f"TO {sql_literal(str(scratch))} (FORMAT parquet, PARTITION_BY "
+                f"({by}), WRITE_PARTITION_COLUMNS true, "
+                "FILENAME_PATTERN 'part_{uuid}')"
+            )
+            for file in scratch.rglob("*.parquet"):
+                dest = dataset / file.relative_to(scratch)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(file, dest)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _rewrite_without(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        file: Path,
+        changed: str,
+        on: str,
+        order: str,
+    ) -> None:
+        """Replace a dataset file with a copy lacking the rows in ``changed``."""
+        rest = (
+            f"(SELECT * FROM read_parquet({sql_literal(str(file))}, "
+            f"hive_partitioning = false) t ANTI JOIN {changed} ON {on})"
+        )
+        if not self._count(cursor, rest):
+            file.unlink(missing_ok=True)
+            return
+        tmp = file.with_name(f".{file.name}.tmp-{uuid.uuid4().hex[:12]}")
+        try:
+            cursor.execute(
+                f"COPY (SELECT * FROM {rest}{order}) "
+                f"TO {sql_literal(str(tmp))} (FORMAT parquet)"
+            )
+            os.replace(tmp, file)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _merge(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        target: str,
+        source: str,
+        keys: tuple[str, ...] | list[str],
+        mode: MergeMode,
+    ) -> MergeResult:
+        self._check_merge_keys(cursor, source, keys)
+        total = self._count(cursor, source)
+        order = self._cluster_order(cursor, target, source)
+        if self._relation_type(cursor, target) is None:
+            key_list = ", ".join(sql_identifier(k) for k in keys)
+            cursor.execute(
+                f"CREATE TABLE {target} AS SELECT * FROM {source} "
+                f"QUALIFY row_number() OVER (PARTITION BY {key_list}) = 1{order}"
+            )
+            inserted = self._count(cursor, target)
+            return MergeResult(inserted=inserted, updated=0, skipped=total - inserted)
+
+        delta = "_fta_merge_delta"
+        cursor.begin()
+        try:
+            counts, shared = self._classify(cursor, target, source, keys, mode, delta)
+            if counts.get("update"):
+                q = sql_identifier
+                match = " AND ".join(f"{target}.{q(k)} = d.{q(k)}" for k in keys)
+                cursor.execute(
+                    f"DELETE FROM {target} USING {delta} d "
+                    f"WHERE d._action = 'update' AND {match}"
+                )
+            columns = ", ".join(sql_identifier(c) for c in shared)
+            cursor.execute(
+                f"INSERT INTO {target} BY NAME SELECT {columns} FROM {delta} "
+                f"WHERE _action <> 'skip'{order}"
+            )
+            cursor.commit()
+        except BaseException:
+            cursor.rollback()
+            raise
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS {delta}")
+        return self._merge_result(counts, total)
+
+    def _classify(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        target: str,
+        source: str,
+        keys: Sequence[str],
+        mode: MergeMode,
+        delta: str,
+    ) -> tuple[dict[str, int], list[str]]:
+        """Stage ``source`` rows in temp table ``delta`` tagged by ``_action``.
+
+        ``target`` is any relation. Source rows are cast to its column types
+        and deduplicated on ``keys``; ``_action`` is ``insert``, ``update`` or
+        ``skip`` (see ``merge_table``). Returns the count per action and the
+        columns source and target share.
+        """
+        source_cols = self._source_columns(cursor, source)
+        target_cols = self._source_columns(cursor, target)
+        missing = [k for k in keys if k not in target_cols]
+        if missing:
+            raise ValueError(f"Merge key column(s) missing from {target}: {missing}")
+        q = sql_identifier
+        key_list = ", ".join(q(k) for k in keys)
+        deduped = (
+            f"(SELECT * FROM {source} "
+            f"QUALIFY row_number() OVER (PARTITION BY {key_list}) = 1)"
+        )
+        shared = [c for c in source_cols if c in target_cols]
+        values = [c for c in shared if c not in keys]
+        on = " AND ".join(f"s.{q(k)} = t.{q(k)}" for k in keys)
+        cast = {c: f"CAST(s.{q(c)} AS {target_cols[c]})" for c in shared}
+        if mode == "upsert" and values:
+            s_row = "ROW(" + ", ".join(cast[c] for c in values) + ")"
+            changed = f"WHEN {s_row} IS DISTINCT FROM t._row THEN 'update' "
+            t_row = "ROW(" + ", ".join(f"t.{q(c)}" for c in values) + ")"
+        else:
+            changed, t_row = "", "NULL"
+        # Only target rows whose key appears in the upload are probed, so the
+        # cost tracks the size of the delta rather than the whole table.
+        matches = (
+            f"(SELECT {', '.join(f't.{q(k)}' for k in keys)}, {t_row} AS _row "
+            f"FROM {target} t SEMI JOIN {source} s ON {on} "
+            f"QUALIFY row_number() OVER (PARTITION BY {key_list}) = 1)"
+        )
+        cursor.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {delta} AS
+            SELECT {", ".join(f"{cast[c]} AS {q(c)}" for c in shared)},
+                CASE WHEN t.{q(keys[0])} IS NULL THEN 'insert'
+                     {changed}ELSE 'skip' END AS _action
+            FROM {deduped} s LEFT JOIN {matches} t ON {on}
+        """)
+        counts = dict(
+            cursor.execute(
+                f"SELECT _action, COUNT(*) FROM {delta} GROUP BY _action"
+            ).fetchall()
+        )
+        return counts, shared
+
+    @staticmethod
+    def _merge_result(counts: Mapping[str, int], total: int) -> MergeResult:
+        inserted = counts.get("insert", 0)
+        updated = counts.get("update", 0)
+        return MergeResult(
+            inserted=inserted, updated=updated, skipped=total - inserted - updated
+        )
+
+    def attach(self, path: str | Path, alias: str, read_only: bool = False) -> None:
+        """ATTACH another DuckDB file into this engine's database instance.
+
+        Attached databases are visible to every cursor, so their tables can be
+        joined with the main database (``alias.table``) in a single query.
+        """
+        options = " (READ_ONLY)" if read_only else ""
+        self.execute(f"ATTACH {sql_literal(str(path))} AS {alias}{options}")
+        self._attached[alias] = str(path)
+
+    def detach(self, alias: str) -> None:
+        self.execute(f"DETACH {alias}")
+        self._attached.pop(alias, None)
+
+    @property
+    def attached(self) -> dict[str, str]:
+        """Attached database aliases and their file paths."""
+        return dict(self._attached)
+
+    def has_table(self, name: str, catalog: str | None = None) -> bool:
+        """Whether a table or view exists in the main or an attached database."""
+        with self.cursor() as cursor:
+            row = cursor.execute(
+                "SELECT 1 FROM information_schema.tables "
+                "WHERE table_catalog = COALESCE(?, current_database()) "
+                "AND table_name = ?",
+                [catalog, name],
+            ).fetchone()
+        return row is not None
+
+    def memory_usage(self) -> int:
+        """Bytes currently held by this database's buffer manager."""
+        with self.cursor() as cursor:
+            row = cursor.execute(
+                "SELECT COALESCE(SUM(memory_usage_bytes), 0) FROM duckdb_memory()"
+            ).fetchone()
+        return int(row[0]) if row else 0
 
     def tables(self) -> list[str]:
         """List all tables in the database."""
-        result = self.conn.execute("SHOW TABLES").fetchall()
+        with self.cursor() as cursor:
+            result = cursor.execute("SHOW TABLES").fetchall()
         return [row[0] for row in result]
 
+    # -- async API ---------------------------------------------------------
+
+    async def arun(self, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """Run a blocking callable on the engine executor and await it.
+
+        Context variables are copied into the worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def aexecute(
+        self, sql: str, params: list[Any] | None = None
+    ) -> list[tuple[Any, ...]]:
+        """Execute SQL off the event loop and return all fetched rows.
+
+        Subject to the engine's ``query_timeout_s`` deadline.
+        """
+
+        def _run() -> list[tuple[Any, ...]]:
+            start = time.perf_counter()
+            rows: list[tuple[Any, ...]] | None = None
+            error: str | None = None
+            try:
+                with self._writing(sql), self.cursor() as cursor, self._deadline(
+                    cursor, sql, self.query_timeout_s
+                ):
+                    result = cursor.execute(sql, params or None)
+                    rows = result.fetchall() if result.description else []
+                    return rows
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                self.query_log.record(
+                    sql,
+                    (time.perf_counter() - start) * 1000,
+                    rows=len(rows) if rows is not None else None,
+                    error=error,
+                )
+
+        return await self.arun(_run)
+
+    async def aquery_polars(
+        self,
+        sql: str,
+        cache: bool = True,
+        timeout: float | None = None,
+        tag: str | None = None,
+    ) -> pl.DataFrame:
+        """Awaitable ``query_polars``."""
+        return await self.arun(self.query_polars, sql, cache, timeout, tag)
+
+    async def aquery_batch(
+        self,
+        queries: Mapping[str, str],
+        cache: bool = True,
+        timeout: float | None = None,
+        tag: str | None = None,
+    ) -> dict[str, pl.DataFrame]:
+        """Awaitable ``query_batch``."""
+        return await self.arun(self.query_batch, queries, cache, timeout, tag)
+
+    async def aload_polars(
+        self, df: pl.DataFrame, table_name: str, mode: LoadMode = "replace"
+    ) -> None:
+        """Awaitable ``load_polars``."""
+        await self.arun(self.load_polars, df, table_name, mode)
+
+    async def atables(self) -> list[str]:
+        """Awaitable ``tables``."""
+        return await self.arun(self.tables)
+
+    def cache_stats(self) -> CacheStats | None:
+        """Return result-cache hit/miss counters, or None when caching is off."""
+        return self._cache.stats() if self._cache is not None else None
+
+    def pool_stats(self) -> PoolStats:
+        """Return cursor pool wait-time and utilisation counters."""
+        return self._pool.stats()
+
     def close(self) -> None:
-        """Close the DuckDB connection."""
+        """Shut down the executor, then close cursors and the connection."""
+        self._executor.shutdown(wait=True)
+        self._batch_executor.shutdown(wait=True)
+        self._pool.close()
+        with self._views_lock:
+            self._views.clear()
+        if self._cache is not None:
+            self._cache.clear()
         self.conn.close()
@@ -0,0 +1,281 @@
+"""Excel workbook reading with a Parquet cache.
+
+Trial balances and account masters usually arrive as .xlsx, and parsing
+Excel is the slowest step of any ingest. Sheets are read with a selectable
+Polars engine — ``calamine`` (the ``fastexcel`` package, install the
+``excel`` extra) by default, or ``openpyxl`` / ``xlsx2csv`` — one worker
+process per sheet, and only the sheets that map to a table. Each parsed
+sheet is written as Parquet under the workbook's SHA-256, so re-uploading
+the same file, or re-analysing it, reads Parquet and never parses Excel
+again. The cache is bounded: the least recently used workbooks are evicted
+once it outgrows ``ExcelOptions.cache_max_bytes``.
+
+Sheets map to tables by name (``SHEET_ALIASES``) or by an explicit
+``sheet_map``; see ``map_sheets``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from collections.abc import Callable, Collection, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+from xml.etree import ElementTree
+
+import polars as pl
+
+from fta_agent.data.parallel import process_map
+
+logger = logging.getLogger(__name__)
+
+ExcelEngine = Literal["calamine", "openpyxl", "xlsx2csv"]
+
+DEFAULT_ENGINE: ExcelEngine = "calamine"
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+# Normalized sheet names (lower case, alphanumerics only) recognised per table.
+SHEET_ALIASES: dict[str, tuple[str, ...]] = {
+    "account_master": (
+        "accountmaster", "accounts", "coa", "chartofaccounts", "glaccounts",
+        "ska1", "skb1",
+    ),
+    "trial_balance": ("trialbalance", "tb", "balances", "faglflext"),
+    "postings": (
+        "postings", "journal", "journalentries", "gldetail", "lineitems",
+        "acdoca", "bseg",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ExcelOptions:
+    """How uploads read workbooks."""
+
+    engine: ExcelEngine = DEFAULT_ENGINE
+    cache_dir: Path | None = None
+    # Sheet name -> table; None maps sheets by name (see ``map_sheets``).
+    sheet_map: Mapping[str, str] | None = None
+    workers: int | None = None
+    # Evict least recently used workbooks past this size; None = unbounded.
+    cache_max_bytes: int | None = None
+
+
+@dataclass
+class Sheet:
+    """One parsed sheet, stored as Parquet."""
+
+    name: str
+    path: Path
+    rows: int
+    seconds: float
+
+    def read(self) -> pl.DataFrame:
+        return pl.read_parquet(self.path)
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def sheet_names(path: Path) -> list[str] | None:
+    """Sheet names of an .xlsx from its workbook part, without an engine.
+
+    Legacy .xls files need ``fastexcel``; without it this returns None and
+    only the first sheet is read.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        return [sheet.attrib["name"] for sheet in root.iter(f"{_MAIN_NS}sheet")]
+    try:
+        import fastexcel
+    except ImportError:
+        return None
+    return list(fastexcel.read_excel(str(path)).sheet_names)
+
+
+def map_sheets(
+    names: list[str],
+    sheet_map: Mapping[str, str] | None = None,
+    default_table: str | None = None,
+) -> dict[str, str]:
+    """Decide which table each sheet loads into.
+
+    An explicit ``sheet_map`` (sheet name -> table) wins and is exhaustive.
+    Otherwise sheets are matched against ``SHEET_ALIASES``; if none match,
+    the first sheet loads into ``default_table``.
+    """
+    if sheet_map:
+        missing = set(sheet_map) - set(names)
+        if missing:
+            raise ValueError(
+                f"Sheet(s) not in workbook: {', '.join(sorted(missing))}; "
+                f"found {', '.join(names)}"
+            )
+        return dict(sheet_map)
+    mapped: dict[str, str] = {}
+    for name in names:
+        key = _normalize(name)
+        for table, aliases in SHEET_ALIASES.items():
+            if key in aliases and table not in mapped.values():
+                mapped[name] = table
+                break
+    if not mapped and names and default_table:
+        mapped[names[0]] = default_table
+    return mapped
+
+
+def _read_sheet(
+    path: Path, sheet: str | None, engine: ExcelEngine, out_path: Path
+) -> tuple[str, int, float]:
+    """Parse one sheet and write it as Parquet (runs in a worker process)."""
+    start = time.perf_counter()
+    if sheet is None:
+        df = pl.read_excel(path, engine=engine)
+    else:
+        df = pl.read_excel(path, sheet_name=sheet, engine=engine)
+    df.write_parquet(out_path)
+    return sheet or "Sheet1", len(df), round(time.perf_counter() - start, 3)
+
+
+def _sheet_key(name: str | None) -> str:
+    """File stem of a cached sheet; None is a workbook's unnamed first sheet."""
+    if name is None:
+        return "first"
+    return hashlib.sha256(name.encode()).hexdigest()[:16]
+
+
+def _cached(entry: Path, name: str | None) -> Sheet | None:
+    meta = entry / f"{_sheet_key(name)}.json"
+    if not meta.exists():
+        return None
+    data = json.loads(meta.read_text())
+    return Sheet(data["name"], entry / data["file"], data["rows"], data["seconds"])
+
+
+@contextmanager
+def _scratch(cache_dir: Path | None) -> Iterator[Path]:
+    """A directory to write sheets into: inside the cache, or a temp dir."""
+    if cache_dir is None:
+        with tempfile.TemporaryDirectory(prefix="fta-excel-") as tmp:
+            yield Path(tmp)
+        return
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    scratch = cache_dir / f".tmp-{uuid.uuid4().hex[:12]}"
+    scratch.mkdir()
+    try:
+        yield scratch
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def evict(cache_dir: Path, max_bytes: int, keep: str | None = None) -> list[str]:
+    """Drop least recently used workbooks until the cache fits ``max_bytes``.
+
+    Recency is the mtime of a workbook's directory, which ``open_workbook``
+    touches on every hit. ``keep`` (a workbook hash) is never dropped.
+    Returns the hashes of the dropped workbooks.
+    """
+    entries: list[tuple[float, Path, int]] = []
+    for workbook in cache_dir.iterdir():
+        if not workbook.is_dir() or workbook.name.startswith("."):
+            continue
+        size = sum(f.stat().st_size for f in workbook.rglob("*") if f.is_file())
+        entries.append((workbook.stat().st_mtime, workbook, size))
+    total = sum(size for _, _, size in entries)
+    dropped: list[str] = []
+    for _, workbook, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if workbook.name == keep:
+            continue
+        shutil.rmtree(workbook, ignore_errors=True)
+        total -= size
+        dropped.append(workbook.name)
+    if dropped:
+        logger.info("Evicted %d workbook(s) from the Excel cache", len(dropped))
+    return dropped
+
+
+@contextmanager
+def open_workbook(
+    path: Path,
+    sha256: str,
+    engine: ExcelEngine = DEFAULT_ENGINE,
+    cache_dir: Path | None = None,
+    workers: int | None = None,
+    select: Callable[[list[str]], Collection[str]] | None = None,
+    cache_max_bytes: int | None = None,
+) -> Iterator[list[Sheet]]:
+    """Yield the selected sheets of a workbook as Parquet, parsing cache misses.
+
+    ``select`` picks the sheets to read from the workbook's sheet names
+    (e.g. those ``map_sheets`` maps to a table); None reads all of them, and
+    unmapped sheets are never parsed. ``sha256`` is the workbook's content
+    hash: each sheet is cached under ``<cache_dir>/<sha256>/<engine>`` and
+    published with one rename after its Parquet file, so a concurrent or
+    interrupted parse never leaves a partial sheet. With
+    ``cache_max_bytes`` the least recently used workbooks are evicted once
+    the cache grows past it. With no ``cache_dir`` the Parquet files only
+    live for the block.
+    """
+    names = sheet_names(path)
+    wanted: list[str | None]
+    if names is None:
+        wanted = [None]
+    else:
+        chosen = set(select(names)) if select is not None else set(names)
+        wanted = [name for name in names if name in chosen]
+
+    entry = cache_dir / sha256 / engine if cache_dir is not None else None
+    hits: dict[str | None, Sheet] = {}
+    if entry is not None:
+        hits = {n: sheet for n in wanted if (sheet := _cached(entry, n)) is not None}
+    missing = [name for name in wanted if name not in hits]
+    if entry is not None and hits:
+        entry.parent.touch()
+    if not missing:
+        if hits:
+            logger.info("Excel cache hit for %s (%s)", path.name, sha256[:12])
+        yield [hits[name] for name in wanted]
+        return
+
+    with _scratch(cache_dir) as scratch:
+        jobs = [
+            (path, name, engine, scratch / f"{_sheet_key(name)}.parquet")
+            for name in missing
+        ]
+        parsed = list(process_map(_read_sheet, jobs, workers))
+        for job, (label, rows, seconds) in zip(jobs, parsed, strict=True):
+            out = job[3]
+            meta = {"name": label, "file": out.name, "rows": rows, "seconds": seconds}
+            out.with_suffix(".json").write_text(json.dumps(meta))
+        logger.info(
+            "Parsed %d of %d sheet(s) of %s with %s in %.2fs",
+            len(missing), len(names or wanted), path.name, engine,
+            sum(p[2] for p in parsed),
+        )
+        if entry is None:
+            yield [s for name in wanted if (s := _cached(scratch, name)) is not None]
+            return
+        entry.mkdir(parents=True, exist_ok=True)
+        for job in jobs:
+            # The metadata file marks the sheet as cached, so it moves last.
+            job[3].replace(entry / job[3].name)
+            meta_file = job[3].with_suffix(".json")
+            meta_file.replace(entry / meta_file.name)
+    entry.parent.touch()
+    if cache_max_bytes is not None and cache_dir is not None:
+        evict(cache_dir, cache_max_bytes, keep=sha256)
+    yield [s for name in wanted if (s := _cached(entry, name)) is not None]
@@ -0,0 +1,213 @@
+"""Background ingest jobs.
+
+An upload is streamed to disk inside the request, then handed to an
+``IngestJob`` that runs on the engine executor while the request returns.
+Workers report progress through ``JobRegistry.update``; the status and SSE
+endpoints read snapshots, so a large client extract never holds an HTTP
+request open for the whole parse and load.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Coroutine
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from fta_agent.data.loader import IngestMode
+
+logger = logging.getLogger(__name__)
+
+JobPhase = Literal[
+    "queued",
+    "waiting_for_data",
+    "parsing",
+    "validating",
+    "loading",
+    "merging",
+    "finalizing",
+    "done",
+    "failed",
+]
+TERMINAL_PHASES = frozenset({"done", "failed"})
+
+
+@dataclass
+class IngestJob:
+    """State of one upload ingestion."""
+
+    job_id: str
+    engagement_id: str
+    filename: str
+    table: str
+    mode: IngestMode = "replace"
+    bytes_received: int = 0
+    sha256: str = ""
+    phase: JobPhase = "queued"
+    fraction: float = 0.0
+    rows_estimated: int | None = None
+    rows_parsed: int = 0
+    rows_loaded: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    validation: dict[str, Any] | None = None
+    files: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    created_at: str = field(default_factory=lambda: datetime.now(UTC).isoformat())
+    version: int = 0
+    _started: float | None = field(default=None, repr=False)
+    _finished: float | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.phase in TERMINAL_PHASES
+
+    @property
+    def elapsed_s(self) -> float | None:
+        if self._started is None:
+            return None
+        return round((self._finished or time.monotonic()) - self._started, 3)
+
+    @property
+    def eta_s(self) -> float | None:
+        """Remaining seconds, extrapolated from progress so far."""
+        elapsed = self.elapsed_s
+        if self.finished or elapsed is None or self.fraction <= 0:
+            return None
+        return round(elapsed * (1 - self.fraction) / self.fraction, 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+        data["fraction"] = round(self.fraction, 4)
+        data["elapsed_s"] = self.elapsed_s
+        data["eta_s"] = self.eta_s
+        return data
+
+
+class JobRegistry:
+    """Thread-safe store of recent ingest jobs and their worker tasks."""
+
+    def __init__(self, max_finished: int = 100) -> None:
+        self._jobs: OrderedDict[str, IngestJob] = OrderedDict()
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._max_finished = max_finished
+        self._lock = threading.Lock()
+
+    def create(
+        self,
+        engagement_id: str,
+        filename: str,
+        table: str,
+        mode: IngestMode = "replace",
+        bytes_received: int = 0,
+        sha256: str = "",
+    ) -> IngestJob:
+        job = IngestJob(
+            job_id=uuid.uuid4().hex,
+            engagement_id=engagement_id,
+            filename=filename,
+            table=table,
+            mode=mode,
+            bytes_received=bytes_received,
+            sha256=sha256,
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> IngestJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Apply progress fields reported by a worker (any thread)."""
+        with self._lock:
+            job = self._jobs[job_id]
+            phase = fields.get("phase")
+            if phase in ("parsing", "loading") and job._started is None:
+                job._started = time.monotonic()
+            if phase in TERMINAL_PHASES:
+                job._finished = time.monotonic()
+                if phase == "done":
+                    job.fraction = 1.0
+            if (
+                job.rows_estimated
+                and "fraction" in fields
+                and "rows_parsed" not in fields
+                and "rows_loaded" not in fields
+            ):
+                rows = int(job.rows_estimated * fields["fraction"])
+                job.rows_parsed = max(job.rows_parsed, rows)
+                job.rows_loaded = max(job.rows_loaded, rows)
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.version += 1
+
+    def start(self, job_id: str, work: Coroutine[Any, Any, None]) -> None:
+        """Run ``work`` as the job's worker task, failing the job on error."""
+
+        async def run() -> None:
+            try:
+                await work
+            except asyncio.CancelledError:
+                self.update(job_id, phase="failed", error="cancelled")
+                raise
+            except Exception as e:
+                logger.exception("Ingest job %s failed", job_id)
+                detail = getattr(e, "detail", None) or str(e)
+                self.update(job_id, phase="failed", error=str(detail))
+            finally:
+                with self._lock:
+                    self._tasks.pop(job_id, None)
+
+        task = asyncio.create_task(run(), name=f"ingest-{job_id}")
+        with self._lock:
+            self._tasks[job_id] = task
+
+    async def wait(self, job_id: str) -> None:
+        with self._lock:
+            task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def watch(
+        self, job_id: str, interval: float = 0.25
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield a snapshot whenever the job changes, ending once it finishes."""
+        seen = -1
+        while True:
+            snap = self.snapshot(job_id)
+            if snap is None:
+                return
+            if snap["version"] != seen:
+                seen = snap["version"]
+                yield snap
+            if snap["phase"] in TERMINAL_PHASES:
+                return
+            await asyncio.sleep(interval)
+
+    async def cancel_all(self) -> None:
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        finished = [jid for jid, job in self._jobs.items() if job.finished]
+        for jid in finished[: max(0, len(finished) - self._max_finished)]:
+            del self._jobs[jid]
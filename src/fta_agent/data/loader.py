@@ -2,24 +2,97 @@
 
 from __future__ import annotations
 
+import glob
+import hashlib
+import json
 import logging
-from pathlib import Path
+import tempfile
+import time
+import uuid
+import zipfile
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Literal
 
+import duckdb
 import polars as pl
+import pyarrow.parquet as pq
 
-from fta_agent.data.engine import DataEngine
-from fta_agent.data.synthetic import generate_synthetic_data, save_fixtures
+from fta_agent.data.cube import ensure_cube, refresh_cube
+from fta_agent.data.engine import DataEngine, LoadMode
+from fta_agent.data.excel import ExcelOptions, Sheet, map_sheets, open_workbook
+from fta_agent.data.parallel import process_map
+from fta_agent.data.readiness import DataReadiness
+from fta_agent.data.schemas import (
+    ACCOUNT_MASTER_SCHEMA,
+    PARTITIONED_TABLES,
+    POSTING_KEY,
+    POSTING_SCHEMA,
+    TRIAL_BALANCE_SCHEMA,
+    duckdb_types,
+)
+from fta_agent.data.synthetic import GENERATOR_VERSION, save_fixtures
+from fta_agent.data.validation import (
+    TABLE_RULES,
+    ValidationError,
+    ValidationReport,
+    sap_renames,
+    validate_frame,
+    validate_table,
+)
 
 logger = logging.getLogger(__name__)
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
+# Load order: the small dimension tables first so tools that only need them
+# become usable while the large postings table is still loading.
+FIXTURE_TABLES = ("account_master", "trial_balance", "postings")
+
+# Records what each fixture table was loaded from, so a persistent database
+# can skip reloading when neither the source file nor the generator changed.
+FIXTURE_META_TABLE = "_fta_fixture_meta"
+
+
+def file_checksum(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_checksum(path: Path) -> str:
+    """``file_checksum`` of a file, or a digest over a dataset directory.
+
+    A dataset's digest covers every Parquet file's relative path and
+    checksum, so adding, removing or rewriting any partition changes it.
+    """
+    if not path.is_dir():
+        return file_checksum(path)
+    digest = hashlib.sha256()
+    for file in sorted(path.rglob("*.parquet")):
+        name = file.relative_to(path).as_posix()
+        digest.update(f"{name}\t{file_checksum(file)}\n".encode())
+    return digest.hexdigest()
+
+
+def fixture_source(fixtures_dir: Path, name: str) -> Path:
+    """A fixture's dataset directory if present, else its single Parquet file."""
+    dataset = fixtures_dir / name
+    return dataset if dataset.is_dir() else fixtures_dir / f"{name}.parquet"
 
 
 def ensure_fixture(fixtures_dir: Path | None = None) -> Path:
-    """Generate Parquet fixtures if they don't exist. Return the directory."""
+    """Generate Parquet fixtures if they don't exist. Return the directory.
+
+    Postings are kept as a partitioned dataset (see ``PARTITIONED_TABLES``);
+    a directory holding only the older single ``postings.parquet`` is
+    regenerated.
+    """
     target = fixtures_dir or FIXTURES_DIR
-    postings_path = target / "postings.parquet"
-    if postings_path.exists():
+    if all((target / name).is_dir() for name in PARTITIONED_TABLES):
         logger.info("Fixtures already exist at %s", target)
         return target
 
@@ -29,38 +102,730 @@ def ensure_fixture(fixtures_dir: Path | None = None) -> Path:
     return target
 
 
-def load_fixture(engine: DataEngine, fixtures_dir: Path | None = None) -> None:
-    """Load Parquet fixtures into DuckDB tables."""
+def _ensure_meta_table(engine: DataEngine) -> None:
+    engine.execute(f"""
+        CREATE TABLE IF NOT EXISTS {FIXTURE_META_TABLE} (
+            table_name VARCHAR PRIMARY KEY,
+            source_path VARCHAR,
+            checksum VARCHAR,
+            generator_version VARCHAR,
+            load_mode VARCHAR,
+            row_count BIGINT,
+            loaded_at TIMESTAMP
+        )
+    """)
+
+
+def _fixture_is_current(
+    engine: DataEngine, name: str, checksum: str, mode: LoadMode
+) -> bool:
+    row = engine.execute(
+        f"SELECT checksum, generator_version, load_mode FROM {FIXTURE_META_TABLE} "
+        "WHERE table_name = ?",
+        [name],
+    ).fetchone()
+    return (
+        row == (checksum, GENERATOR_VERSION, mode)
+        and name in engine.tables()
+    )
+
+
+def load_fixture_table(
+    engine: DataEngine,
+    name: str,
+    fixtures_dir: Path,
+    mode: LoadMode = "replace",
+    force: bool = False,
+) -> bool:
+    """Load one fixture table unless it is already current. Return whether it loaded."""
+    parquet_path = fixture_source(fixtures_dir, name)
+    if not parquet_path.exists():
+        logger.warning("Fixture %s not found, skipping.", parquet_path)
+        return False
+    checksum = source_checksum(parquet_path)
+    if not force and _fixture_is_current(engine, name, checksum, mode):
+        logger.info(
+            "Fixture %s unchanged (checksum %s), skipping load.", name, checksum[:12]
+        )
+        return False
+
+    schema = TABLE_SCHEMAS[name] if parquet_path.is_dir() else None
+    types = duckdb_types(schema) if schema else None
+    # Named by its source, so every engine that loads this fixture the same
+    # way shares the stamp, across restarts too.
+    source = json.dumps([name, checksum, GENERATOR_VERSION, mode, types])
+    stamp = hashlib.sha256(source.encode()).hexdigest()
+    engine.load_parquet(parquet_path, name, mode=mode, types=types, stamp=stamp)
+    rows = engine.execute(f"SELECT COUNT(*) FROM {name}").fetchone()
+    row_count = rows[0] if rows else 0
+    engine.execute(
+        f"INSERT OR REPLACE INTO {FIXTURE_META_TABLE} "
+        "VALUES (?, ?, ?, ?, ?, ?, now())",
+        [name, str(parquet_path), checksum, GENERATOR_VERSION, mode, row_count],
+    )
+    logger.info("Loaded %s (%s): %d rows", name, mode, row_count)
+    return True
+
+
+def load_fixture(
+    engine: DataEngine,
+    fixtures_dir: Path | None = None,
+    mode: LoadMode = "replace",
+    force: bool = False,
+) -> list[str]:
+    """Load Parquet fixtures into DuckDB. Return the names of tables (re)loaded.
+
+    Fixtures are read by DuckDB's native Parquet reader. With ``mode="view"``
+    each table is a ``read_parquet`` view over the fixture file, so nothing is
+    materialized in memory until a query scans it; postings is a
+    hive-partitioned dataset, so a query for one period reads one directory.
+
+    The source checksum and generator version of every loaded table are
+    recorded in ``_fta_fixture_meta``. On a persistent database, tables whose
+    checksum, generator version and load mode are unchanged are skipped, so a
+    warm restart does no loading at all. ``force`` reloads regardless.
+
+    The postings cube (``fta_agent.data.cube``) is then built if it does not
+    match the loaded postings; its marker is stored in the database, so a
+    warm restart does not rebuild it either.
+    """
     target = ensure_fixture(fixtures_dir)
+    _ensure_meta_table(engine)
+
+    loaded = [
+        name
+        for name in FIXTURE_TABLES
+        if load_fixture_table(engine, name, target, mode=mode, force=force)
+    ]
+    ensure_cube(engine)
+    logger.info(
+        "Fixtures ready (reloaded: %s). Tables: %s",
+        loaded or "none",
+        engine.tables(),
+    )
+    return loaded
+
+
+async def aload_fixture(
+    engine: DataEngine,
+    readiness: DataReadiness,
+    fixtures_dir: Path | None = None,
+    mode: LoadMode = "replace",
+) -> None:
+    """Background counterpart of ``load_fixture`` that reports readiness.
+
+    Each table is marked ready as soon as it is loaded, in ``FIXTURE_TABLES``
+    order, so routes waiting on the small tables are released before
+    ``postings`` finishes.
+    """
+    readiness.mark_loading()
+    try:
+        target = await engine.arun(ensure_fixture, fixtures_dir)
+        await engine.arun(_ensure_meta_table, engine)
+        for name in FIXTURE_TABLES:
+            await engine.arun(load_fixture_table, engine, name, target, mode=mode)
+            readiness.mark_table_ready(name)
+        # Tools scan postings directly until the cube is in place.
+        await engine.arun(ensure_cube, engine)
+    except Exception as e:
+        logger.exception("Background fixture load failed")
+        readiness.mark_failed(e)
+        return
+    readiness.mark_ready()
+    logger.info("Fixtures ready. Tables: %s", await engine.atables())
+
 
-    for name in ("postings", "account_master", "trial_balance"):
-        parquet_path = target / f"{name}.parquet"
-        if not parquet_path.exists():
-            logger.warning("Fixture %s not found, skipping.", parquet_path)
-            continue
-        df = pl.read_parquet(parquet_path)
-        engine.load_polars(df, name)
-        logger.info("Loaded %s: %d rows", name, len(df))
+# Canonical column types applied when an upload targets a known table.
+TABLE_SCHEMAS = {
+    "postings": POSTING_SCHEMA,
+    "account_master": ACCOUNT_MASTER_SCHEMA,
+    "trial_balance": TRIAL_BALANCE_SCHEMA,
+}
 
-    logger.info("All fixtures loaded. Tables: %s", engine.tables())
+# Keys used by append / upsert ingestion.
+TABLE_KEYS: dict[str, tuple[str, ...]] = {
+    "postings": POSTING_KEY,
+    "account_master": ("gl_account",),
+    "trial_balance": (
+        "company_code", "fiscal_year", "fiscal_period", "gl_account", "currency",
+    ),
+}
 
+IngestMode = Literal["replace", "append", "upsert"]
 
-def ingest_upload(engine: DataEngine, file_path: Path, table_name: str = "postings") -> int:
-    """Ingest an uploaded CSV or Excel file into DuckDB.
 
-    Returns the number of rows loaded.
+@dataclass
+class IngestResult:
+    """Outcome of one upload ingestion."""
+
+    rows: int
+    inserted: int
+    updated: int = 0
+    skipped: int = 0
+    validation: ValidationReport | None = None
+    files: list[FileResult] = field(default_factory=list)
+
+
+@dataclass
+class FileResult:
+    """Rows and parse time of one file (or workbook sheet) in an ingest."""
+
+    name: str
+    rows: int
+    seconds: float
+    validation: ValidationReport | None = None
+    table: str | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        data: dict[str, object] = {
+            "name": self.name, "rows": self.rows, "seconds": self.seconds
+        }
+        if self.table is not None:
+            data["table"] = self.table
+        return data
+
+
+def estimate_rows(file_path: Path, sample_bytes: int = 1 << 20) -> int | None:
+    """Cheap row-count estimate for progress reporting.
+
+    Parquet row counts come from the footer; CSV counts are extrapolated from
+    the average line length of the first ``sample_bytes``.
     """
     suffix = file_path.suffix.lower()
-    if suffix == ".csv":
-        df = pl.read_csv(file_path, infer_schema_length=10000)
-    elif suffix in (".xlsx", ".xls"):
-        df = pl.read_excel(file_path)
-    elif suffix == ".parquet":
-        df = pl.read_parquet(file_path)
-    else:
+    if suffix == ".parquet":
+        return int(pq.ParquetFile(file_path).metadata.num_rows)
+    if suffix != ".csv":
+        return None
+    size = file_path.stat().st_size
+    with file_path.open("rb") as f:
+        sample = f.read(sample_bytes)
+    lines = sample.count(b"\n")
+    if not lines:
+        return None
+    return max(0, round(size / (len(sample) / lines)) - 1)  # minus header
+
+
+def _header(file_path: Path) -> list[str]:
+    """Column names of a CSV or Parquet file, without reading its data."""
+    if file_path.suffix.lower() == ".parquet":
+        return list(pq.ParquetFile(file_path).schema_arrow.names)
+    return pl.scan_csv(file_path, n_rows=1).collect_schema().names()
+
+
+def _check_mode(table_name: str, mode: IngestMode) -> None:
+    if mode != "replace" and table_name not in TABLE_KEYS:
+        raise ValueError(f"No merge key defined for table '{table_name}'")
+
+
+def _load_target(table_name: str, mode: IngestMode) -> str:
+    """Merges load into a private staging table first; replace loads in place."""
+    if mode == "replace":
+        return table_name
+    return f"_fta_stage_{uuid.uuid4().hex[:12]}"
+
+
+def ingest_upload(
+    engine: DataEngine,
+    file_path: Path,
+    table_name: str = "postings",
+    native: bool = True,
+    report: Callable[..., None] | None = None,
+    mode: IngestMode = "replace",
+    excel: ExcelOptions | None = None,
+    dataset_dir: Path | None = None,
+) -> IngestResult:
+    """Ingest an uploaded CSV, Excel or Parquet file into DuckDB.
+
+    With ``native`` (the default) CSV and Parquet are read by DuckDB's own
+    parallel readers straight into the target table, typed with the
+    canonical schema for known tables — one copy, no Polars frame. Excel
+    always goes through Polars, as does everything when ``native`` is False.
+
+    Known tables are validated (``fta_agent.data.validation``): SAP field
+    names are mapped to our columns and values coerced to the canonical
+    schema, and the result carries per-rule violation counts and samples.
+    Files that need field mapping, or whose values DuckDB cannot cast, take
+    the Polars path, which locates unparseable values for the report.
+    Unparseable values raise ``ValidationError`` (a ValueError carrying the
+    report); other violations are reported and the rows loaded as they are.
+
+    ``mode="replace"`` swaps in the file as the whole table. ``append`` and
+    ``upsert`` load the file into a staging table and merge it on the
+    table's key (``TABLE_KEYS``): new keys are inserted, and existing keys
+    are skipped (append) or replaced when changed (upsert), so a monthly
+    refresh only writes its delta.
+
+    Excel files go to ``ingest_workbook`` (configured by ``excel``), which
+    may load several sheets into several tables.
+
+    With ``dataset_dir``, partitioned tables are then stored there as a
+    hive-partitioned Parquet dataset and served from it (``store_dataset``);
+    later appends and upserts rewrite only the files they touch.
+
+    ``report`` receives progress as keyword fields (``phase``, ``fraction``,
+    ``rows_parsed``, ``rows_loaded``); see ``fta_agent.data.jobs``.
+    """
+    suffix = file_path.suffix.lower()
+    if suffix not in (".csv", ".xlsx", ".xls", ".parquet"):
         msg = f"Unsupported file format: {suffix}. Use CSV, Excel, or Parquet."
         raise ValueError(msg)
+    _check_mode(table_name, mode)
+    if suffix in EXCEL_SUFFIXES:
+        return ingest_workbook(
+            engine, file_path, table_name, report=report, mode=mode, excel=excel,
+            dataset_dir=dataset_dir,
+        )
+
+    def _report(**fields: object) -> None:
+        if report is not None:
+            report(**fields)
+
+    load_table = _load_target(table_name, mode)
+
+    rules = TABLE_RULES.get(table_name)
+    if native and suffix in (".csv", ".parquet") and rules and rules.field_map:
+        native = not sap_renames(_header(file_path), rules.field_map)
+
+    validation: ValidationReport | None = None
+    loaded = False
+    if native and suffix in (".csv", ".parquet"):
+        schema = TABLE_SCHEMAS.get(table_name)
+        types = duckdb_types(schema) if schema else None
+        load = engine.load_csv if suffix == ".csv" else engine.load_parquet
+        _report(phase="loading", fraction=0.0)
+        try:
+            load(
+                file_path,
+                load_table,
+                types=types,
+                progress=(lambda f: _report(fraction=f)) if report else None,
+            )
+            loaded = True
+        except duckdb.ConversionException as e:
+            if rules is None:
+                raise ValueError(f"Could not read {file_path.name}: {e}") from e
+            logger.info("%s has values DuckDB cannot cast; using Polars", file_path)
+        except duckdb.Error as e:
+            raise ValueError(f"Could not read {file_path.name}: {e}") from e
+    if loaded:
+        row = engine.execute(f"SELECT COUNT(*) FROM {load_table}").fetchone()
+        rows = row[0] if row else 0
+        _report(rows_parsed=rows)
+        if rules is not None:
+            _report(phase="validating")
+            validation = validate_table(engine, load_table, rules)
+    else:
+        _report(phase="parsing", fraction=0.0)
+        df = _read_frame(file_path, table_name, excel)
+        rows = len(df)
+        if rules is not None:
+            _report(phase="validating", fraction=0.25, rows_parsed=rows)
+            df, validation = validate_frame(df, rules)
+            _raise_on_type_errors(file_path.name, validation)
+        _report(phase="loading", fraction=0.5, rows_parsed=rows)
+        engine.load_polars(df, load_table)
+
+    return _finish(
+        engine, file_path.name, table_name, load_table, mode, rows, validation,
+        _report, dataset_dir,
+    )
+
+
+def _read_frame(
+    file_path: Path, table_name: str, excel: ExcelOptions | None = None
+) -> pl.DataFrame:
+    suffix = file_path.suffix.lower()
+    if suffix == ".csv":
+        return pl.read_csv(file_path, infer_schema_length=10000)
+    if suffix == ".parquet":
+        return pl.read_parquet(file_path)
+    # A workbook among several files contributes the sheet for ``table_name``.
+    options = excel or ExcelOptions()
+
+    def select(names: list[str]) -> list[str]:
+        mapping = map_sheets(names, options.sheet_map, default_table=table_name)
+        return [name for name, table in mapping.items() if table == table_name]
+
+    with open_workbook(
+        file_path, file_checksum(file_path), options.engine, options.cache_dir, 1,
+        select=select, cache_max_bytes=options.cache_max_bytes,
+    ) as sheets:
+        mapping = map_sheets(
+            [sh.name for sh in sheets], options.sheet_map, default_table=table_name
+        )
+        for sheet in sheets:
+            if mapping.get(sheet.name) == table_name:
+                return sheet.read()
+    raise ValueError(f"No sheet of {file_path.name} maps to table '{table_name}'")
+
+
+def ingest_workbook(
+    engine: DataEngine,
+    file_path: Path,
+    table_name: str = "postings",
+    report: Callable[..., None] | None = None,
+    mode: IngestMode = "replace",
+    excel: ExcelOptions | None = None,
+    sha256: str | None = None,
+    dataset_dir: Path | None = None,
+) -> IngestResult:
+    """Load the sheets of an Excel workbook into the tables they map to.
+
+    Sheets are mapped to tables with ``map_sheets``; an unrecognised
+    workbook loads its first sheet into ``table_name``. Only mapped sheets
+    are parsed, in parallel, or read from the Parquet cache keyed by
+    ``sha256`` (computed if not given). Each mapped sheet is validated and
+    loaded like a single upload, so every table is swapped or merged
+    atomically. ``files`` in the result lists each loaded sheet and its table.
+    """
+    excel = excel or ExcelOptions()
+
+    def _report(**fields: object) -> None:
+        if report is not None:
+            report(**fields)
+
+    _report(phase="parsing", fraction=0.0)
+    checksum = sha256 or file_checksum(file_path)
+    sheet_map = excel.sheet_map
+    with open_workbook(
+        file_path, checksum, excel.engine, excel.cache_dir, excel.workers,
+        select=lambda names: map_sheets(names, sheet_map, default_table=table_name),
+        cache_max_bytes=excel.cache_max_bytes,
+    ) as sheets:
+        mapping = map_sheets(
+            [sh.name for sh in sheets], sheet_map, default_table=table_name
+        )
+        unknown = set(mapping.values()) - TABLE_SCHEMAS.keys()
+        if unknown:
+            raise ValueError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+        loaded = [sheet for sheet in sheets if sheet.name in mapping]
+        results: list[tuple[Sheet, IngestResult]] = []
+        for i, sheet in enumerate(loaded):
+            target = mapping[sheet.name]
+            _check_mode(target, mode)
+            df = sheet.read()
+            validation = None
+            rules = TABLE_RULES.get(target)
+            if rules is not None:
+                _report(phase="validating", rows_parsed=len(df))
+                df, validation = validate_frame(df, rules)
+                _raise_on_type_errors(f"{file_path.name}[{sheet.name}]", validation)
+            _report(phase="loading", fraction=0.5 + 0.5 * i / len(loaded))
+            load_table = _load_target(target, mode)
+            engine.load_polars(df, load_table)
+            label = f"{file_path.name}[{sheet.name}]"
+            results.append((
+                sheet,
+                _finish(
+                    engine, label, target, load_table, mode, len(df), validation,
+                    _report, dataset_dir,
+                ),
+            ))
+
+    reports = [(s.name, r.validation) for s, r in results if r.validation]
+    return IngestResult(
+        rows=sum(r.rows for _, r in results),
+        inserted=sum(r.inserted for _, r in results),
+        updated=sum(r.updated for _, r in results),
+        skipped=sum(r.skipped for _, r in results),
+        validation=ValidationReport.combine(reports) if reports else None,
+        files=[
+            FileResult(s.name, r.rows, s.seconds, r.validation, table=mapping[s.name])
+            for s, r in results
+        ],
+    )
+
+
+def _raise_on_type_errors(label: str, validation: ValidationReport) -> None:
+    if bad := validation.type_errors():
+        detail = ", ".join(f"{c}: {n}" for c, n in bad.items())
+        msg = f"Could not read {label}: unparseable values ({detail})"
+        raise ValidationError(msg, validation)
+
+
+def _finish(
+    engine: DataEngine,
+    label: str,
+    table_name: str,
+    load_table: str,
+    mode: IngestMode,
+    rows: int,
+    validation: ValidationReport | None,
+    report: Callable[..., None],
+    dataset_dir: Path | None = None,
+) -> IngestResult:
+    """Merge a staging table into ``table_name`` (unless replacing) and log."""
+    dataset = (
+        dataset_dir / table_name
+        if dataset_dir is not None and table_name in PARTITIONED_TABLES
+        else None
+    )
+    in_place = False
+    if mode == "replace":
+        result = IngestResult(rows=rows, inserted=rows, validation=validation)
+    else:
+        report(phase="merging")
+        keys = TABLE_KEYS[table_name]
+        try:
+            if dataset is not None and _served_from(engine, table_name, dataset):
+                merged = engine.merge_dataset(
+                    table_name, dataset, load_table, keys,
+                    PARTITIONED_TABLES[table_name], mode=mode,
+                )
+                in_place = True
+            else:
+                merged = engine.merge_table(table_name, load_table, keys, mode=mode)
+        except duckdb.Error as e:
+            raise ValueError(f"Could not merge {label}: {e}") from e
+        finally:
+            engine.execute(f"DROP TABLE IF EXISTS {load_table}")
+        result = IngestResult(
+            rows=rows,
+            inserted=merged.inserted,
+            updated=merged.updated,
+            skipped=merged.skipped,
+            validation=validation,
+        )
+    report(phase="finalizing", rows_loaded=result.inserted + result.updated)
+    if dataset is not None and not in_place:
+        store_dataset(engine, table_name, dataset.parent)
+    if table_name == "postings":
+        refresh_cube(engine)
+
+    logger.info(
+        "Ingested %s (%s): %d rows into '%s' (%d inserted, %d updated, %d skipped)",
+        label, mode, rows, table_name,
+        result.inserted, result.updated, result.skipped,
+    )
+    if validation is not None and not validation.ok:
+        logger.warning(
+            "Validation of %s found violations: %s", label, validation.counts()
+        )
+    return result
+
+
+def _served_from(engine: DataEngine, table_name: str, dataset: Path) -> bool:
+    """Whether ``table_name`` is the view ``store_dataset`` made over ``dataset``."""
+    row = engine.execute(
+        "SELECT sql FROM duckdb_views() "
+        "WHERE database_name = current_database() AND schema_name = 'main' "
+        "AND view_name = ?",
+        [table_name],
+    ).fetchone()
+    return row is not None and str(dataset.resolve()) in str(row[0])
+
+
+def store_dataset(
+    engine: DataEngine, table_name: str, dataset_dir: Path
+) -> Path | None:
+    """Persist a table as a partitioned dataset and serve it from there.
+
+    The table is exported to ``<dataset_dir>/<table_name>`` partitioned by
+    ``PARTITIONED_TABLES`` and replaced by a ``read_parquet`` view over the
+    files, so queries filtered on period read only matching partitions and
+    the table no longer occupies database memory. A later append or upsert
+    merges into the dataset in place (``DataEngine.merge_dataset``),
+    rewriting only the files it touches. Tables without any partition column
+    stay in the database (returns None).
+    """
+    empty = engine.execute(f"SELECT * FROM {table_name} LIMIT 0")
+    columns = {d[0] for d in empty.description}
+    partition_by = [c for c in PARTITIONED_TABLES[table_name] if c in columns]
+    if not partition_by:
+        logger.info("%s has no partition columns; not storing a dataset", table_name)
+        return None
+    path = engine.export_parquet(table_name, dataset_dir / table_name, partition_by)
+    schema = TABLE_SCHEMAS.get(table_name)
+    engine.load_parquet(
+        path, table_name, mode="view", types=duckdb_types(schema) if schema else None
+    )
+    logger.info("Stored %s as a partitioned dataset at %s", table_name, path)
+    return path
+
+
+# -- multi-file ingest -----------------------------------------------------
+
+EXCEL_SUFFIXES = (".xlsx", ".xls")
+SUPPORTED_SUFFIXES = (".csv", *EXCEL_SUFFIXES, ".parquet")
+ARCHIVE_SUFFIXES = (".zip",)
+
+Source = str | Path | tuple[str, Path]
+
+
+def extract_archive(
+    archive: Path, dest: Path, max_bytes: int = 0
+) -> list[tuple[str, Path]]:
+    """Extract the data files of a ZIP into ``dest``; return (name, path) pairs.
+
+    Members are written under generated names, so archive paths can never
+    escape ``dest``; directories, hidden files and unsupported formats are
+    skipped. ``max_bytes`` (0 = unlimited) caps the total extracted size,
+    counted while copying rather than trusted from the archive header.
+    """
+    extracted: list[tuple[str, Path]] = []
+    total = 0
+    with zipfile.ZipFile(archive) as zf:
+        for i, info in enumerate(zf.infolist()):
+            name = PurePosixPath(info.filename)
+            if (
+                info.is_dir()
+                or name.name.startswith((".", "~$"))
+                or "__MACOSX" in name.parts
+                or name.suffix.lower() not in SUPPORTED_SUFFIXES
+            ):
+                continue
+            target = dest / f"{archive.stem}-{i:04d}{name.suffix.lower()}"
+            with zf.open(info) as src, target.open("wb") as out:
+                while chunk := src.read(1 << 20):
+                    total += len(chunk)
+                    if max_bytes and total > max_bytes:
+                        raise ValueError(
+                            f"{archive.name} expands beyond the "
+                            f"{max_bytes // (1024 * 1024)} MB upload limit"
+                        )
+                    out.write(chunk)
+            extracted.append((str(name), target))
+    return extracted
+
+
+def expand_sources(
+    sources: Sequence[Source], work_dir: Path, max_bytes: int = 0
+) -> list[tuple[str, Path]]:
+    """Resolve globs and ZIP archives into a flat list of (name, path) files.
+
+    A plain ``str`` or ``Path`` may be a glob; a ``(name, path)`` pair names
+    a file whose path says nothing useful (e.g. a spooled upload).
+    """
+    files: list[tuple[str, Path]] = []
+    for source in sources:
+        if isinstance(source, tuple):
+            pairs = [source]
+        elif glob.has_magic(str(source)):
+            pairs = [(Path(p).name, Path(p)) for p in sorted(glob.glob(str(source)))]
+            if not pairs:
+                raise ValueError(f"No files match {source}")
+        else:
+            pairs = [(Path(source).name, Path(source))]
+        for name, path in pairs:
+            suffix = Path(name).suffix.lower()
+            if suffix in ARCHIVE_SUFFIXES:
+                files.extend(extract_archive(path, work_dir, max_bytes))
+            elif suffix in SUPPORTED_SUFFIXES:
+                files.append((name, path))
+            else:
+                raise ValueError(
+                    f"Unsupported file format: {suffix}. "
+                    "Use CSV, Excel, Parquet or ZIP."
+                )
+    if not files:
+        raise ValueError("No CSV, Excel or Parquet files to ingest")
+    return files
+
+
+def _stage_file(
+    name: str,
+    path: Path,
+    out_path: Path,
+    table_name: str,
+    excel: ExcelOptions | None = None,
+) -> FileResult:
+    """Parse, validate and rewrite one file as Parquet (runs in a worker process)."""
+    start = time.perf_counter()
+    df = _read_frame(path, table_name, excel)
+    validation = None
+    rules = TABLE_RULES.get(table_name)
+    if rules is not None:
+        df, validation = validate_frame(df, rules)
+    if validation is None or not validation.type_errors():
+        df.write_parquet(out_path)
+    return FileResult(name, len(df), round(time.perf_counter() - start, 3), validation)
+
+
+def ingest_files(
+    engine: DataEngine,
+    sources: Sequence[Source],
+    table_name: str = "postings",
+    report: Callable[..., None] | None = None,
+    mode: IngestMode = "replace",
+    workers: int | None = None,
+    max_bytes: int = 0,
+    excel: ExcelOptions | None = None,
+    dataset_dir: Path | None = None,
+) -> IngestResult:
+    """Ingest several files, globs or ZIP archives into one table.
+
+    Each file is parsed and validated in its own worker process (``workers``,
+    default one per core) and rewritten as Parquet; DuckDB then reads all of
+    them in one statement, so the table is replaced (or the staging table
+    merged) in a single transaction and readers never see a partial month.
+    A single plain file takes the ``ingest_upload`` path instead (so a lone
+    workbook may load several sheets; among several files each workbook
+    contributes the sheet mapped to ``table_name``).
+
+    The result lists per-file row counts and parse times; validation reports
+    are combined, with each sample row tagged by file. ``dataset_dir`` is
+    passed on as for ``ingest_upload``.
+    """
+    _check_mode(table_name, mode)
+
+    def _report(**fields: object) -> None:
+        if report is not None:
+            report(**fields)
+
+    with tempfile.TemporaryDirectory(prefix="fta-ingest-") as tmp:
+        work_dir = Path(tmp)
+        files = expand_sources(sources, work_dir, max_bytes)
+        if len(files) == 1:
+            name, path = files[0]
+            start = time.perf_counter()
+            result = ingest_upload(
+                engine, path, table_name=table_name, report=report, mode=mode,
+                excel=excel, dataset_dir=dataset_dir,
+            )
+            if not result.files:
+                seconds = round(time.perf_counter() - start, 3)
+                result.files = [
+                    FileResult(name, result.rows, seconds, result.validation)
+                ]
+            return result
+
+        _report(phase="parsing", fraction=0.0)
+        staged = [work_dir / f"stage-{i:04d}.parquet" for i in range(len(files))]
+        jobs = [
+            (name, path, out, table_name, excel)
+            for (name, path), out in zip(files, staged, strict=True)
+        ]
+        results: list[FileResult] = []
+        for staged_file in process_map(_stage_file, jobs, workers):
+            results.append(staged_file)
+            _report(
+                fraction=0.8 * len(results) / len(files),
+                rows_parsed=sum(r.rows for r in results),
+                files=[r.to_dict() for r in results],
+            )
+        rows = sum(r.rows for r in results)
+
+        validation = None
+        if TABLE_RULES.get(table_name) is not None:
+            validation = ValidationReport.combine(
+                [(r.name, r.validation) for r in results if r.validation]
+            )
+            _raise_on_type_errors(f"{len(files)} files", validation)
+
+        _report(phase="loading", fraction=0.8)
+        load_table = _load_target(table_name, mode)
+        schema = TABLE_SCHEMAS.get(table_name)
+        try:
+            engine.load_parquet(
+                staged, load_table, types=duckdb_types(schema) if schema else None
+            )
+        except duckdb.Error as e:
+            raise ValueError(f"Could not load {len(files)} files: {e}") from e
+        label = f"{len(files)} files"
+        result = _finish(
+            engine, label, table_name, load_table, mode, rows, validation, _report,
+            dataset_dir,
+        )
+    result.files = results
+    return result
 
-    engine.load_polars(df, table_name)
-    logger.info("Ingested %s: %d rows into table '%s'", file_path.name, len(df), table_name)
-    return len(df)
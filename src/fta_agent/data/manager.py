@@ -0,0 +1,258 @@
+"""Per-engagement DataEngine management.
+
+Each engagement gets its own DuckDB database, so one client's upload can never
+overwrite another's ``postings``. Engines are opened lazily on first use and
+tracked in LRU order. Pinned engagements (the default demo engagement, or any
+the caller marks hot) stay open; idle, unpinned, file-backed engagements are
+closed oldest-first whenever the combined DuckDB memory of all open engines
+exceeds the configured budget. Closing a file-backed engine loses nothing —
+it is simply reopened on the next request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from fta_agent.config import Settings
+from fta_agent.data.engine import DataEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENGAGEMENT_ID = "demo-eng-001"
+
+_ENGAGEMENT_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+def validate_engagement_id(engagement_id: str) -> str:
+    """Reject ids that are not safe to use as a database file name."""
+    if not _ENGAGEMENT_ID_RE.match(engagement_id):
+        raise ValueError(
+            f"Invalid engagement id {engagement_id!r}: use 1-64 letters, digits, "
+            "'-' or '_'"
+        )
+    return engagement_id
+
+
+@dataclass
+class EngagementStats:
+    """Snapshot of one open engagement engine."""
+
+    engagement_id: str
+    db_path: str
+    memory_bytes: int
+    pinned: bool
+    leases: int
+    idle_s: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Entry:
+    engine: DataEngine
+    pinned: bool = False
+    owned: bool = True
+    leases: int = 0
+    last_used: float = 0.0
+
+
+class EngineManager:
+    """Lazily open one DataEngine per engagement, evicting LRU under a budget.
+
+    ``factory`` builds the engine for an engagement id. ``memory_budget_bytes``
+    of 0 disables eviction. Engines that are pinned, currently leased, or
+    in-memory (whose data would be lost) are never evicted.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], DataEngine],
+        memory_budget_bytes: int = 0,
+    ) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self._factory = factory
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> EngineManager:
+        """Open engagement databases as ``<engagement_data_dir>/<id>.duckdb``."""
+        data_dir = settings.engagement_data_dir
+
+        def factory(engagement_id: str) -> DataEngine:
+            if not data_dir:
+                return DataEngine.from_settings(settings)
+            Path(data_dir).mkdir(parents=True, exist_ok=True)
+            db_path = str(Path(data_dir) / f"{engagement_id}.duckdb")
+            return DataEngine.from_settings(settings, db_path=db_path)
+
+        return cls(
+            factory,
+            memory_budget_bytes=settings.engagement_memory_budget_mb * 1024 * 1024,
+        )
+
+    def register(
+        self, engagement_id: str, engine: DataEngine, pinned: bool = True
+    ) -> None:
+        """Adopt an engine opened elsewhere. The manager will not close it."""
+        with self._lock:
+            self._entries[engagement_id] = _Entry(
+                engine, pinned=pinned, owned=False, last_used=time.monotonic()
+            )
+
+    def get(self, engagement_id: str) -> DataEngine:
+        """Return the engine for an engagement, opening it if necessary."""
+        with self._lock:
+            entry = self._open(engagement_id)
+            self._enforce_budget()
+            return entry.engine
+
+    @contextmanager
+    def lease(self, engagement_id: str) -> Iterator[DataEngine]:
+        """Hold an engagement's engine open (un-evictable) for the block."""
+        with self._lock:
+            entry = self._open(engagement_id)
+            entry.leases += 1
+            self._enforce_budget()
+        try:
+            yield entry.engine
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                entry.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def alease(self, engagement_id: str) -> AsyncIterator[DataEngine]:
+        """Async ``lease``; opening a database file runs off the event loop."""
+        cm = self.lease(engagement_id)
+        engine = await asyncio.to_thread(cm.__enter__)
+        try:
+            yield engine
+        finally:
+            cm.__exit__(None, None, None)
+
+    def pin(self, engagement_id: str) -> None:
+        with self._lock:
+            self._open(engagement_id).pinned = True
+
+    def unpin(self, engagement_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(engagement_id)
+            if entry is not None:
+                entry.pinned = False
+            self._enforce_budget()
+
+    def evict(self, engagement_id: str) -> bool:
+        """Close an idle, unpinned engagement engine now."""
+        with self._lock:
+            entry = self._entries.get(engagement_id)
+            if entry is None or not self._evictable(entry):
+                return False
+            self._close(engagement_id)
+            return True
+
+    def is_open(self, engagement_id: str) -> bool:
+        with self._lock:
+            return engagement_id in self._entries
+
+    def memory_usage(self) -> dict[str, int]:
+        """DuckDB buffer-manager bytes per open engagement."""
+        with self._lock:
+            engines = {eid: e.engine for eid, e in self._entries.items()}
+        return {eid: engine.memory_usage() for eid, engine in engines.items()}
+
+    def stats(self) -> list[EngagementStats]:
+        """Per-engagement memory and lease state, most recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        return [
+            EngagementStats(
+                engagement_id=eid,
+                db_path=entry.engine.db_path,
+                memory_bytes=entry.engine.memory_usage(),
+                pinned=entry.pinned,
+                leases=entry.leases,
+                idle_s=round(now - entry.last_used, 3),
+            )
+            for eid, entry in reversed(entries)
+        ]
+
+    def summary(self) -> dict[str, Any]:
+        stats = self.stats()
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "memory_bytes": sum(s.memory_bytes for s in stats),
+            "evictions": self._evictions,
+            "engagements": [s.to_dict() for s in stats],
+        }
+
+    def close(self) -> None:
+        """Close every engine the manager opened."""
+        with self._lock:
+            for engagement_id in list(self._entries):
+                self._close(engagement_id)
+
+    # -- internals ---------------------------------------------------------
+
+    def _open(self, engagement_id: str) -> _Entry:
+        entry = self._entries.get(engagement_id)
+        if entry is None:
+            validate_engagement_id(engagement_id)
+            entry = _Entry(self._factory(engagement_id))
+            self._entries[engagement_id] = entry
+            logger.info("Opened engagement database %s", entry.engine.db_path)
+        self._entries.move_to_end(engagement_id)
+        entry.last_used = time.monotonic()
+        return entry
+
+    @staticmethod
+    def _evictable(entry: _Entry) -> bool:
+        return (
+            entry.owned
+            and not entry.pinned
+            and entry.leases == 0
+            and entry.engine.db_path != ":memory:"
+        )
+
+    def _enforce_budget(self) -> None:
+        """Close LRU idle engines until total memory fits the budget."""
+        if self.memory_budget_bytes <= 0:
+            return
+        usage = {eid: e.engine.memory_usage() for eid, e in self._entries.items()}
+        total = sum(usage.values())
+        # The most recently used engine is the one the caller is about to use.
+        candidates = list(self._entries.items())[:-1]
+        for engagement_id, entry in candidates:
+            if total <= self.memory_budget_bytes:
+                break
+            if not self._evictable(entry):
+                continue
+            self._close(engagement_id)
+            self._evictions += 1
+            total -= usage[engagement_id]
+        if total > self.memory_budget_bytes:
+            logger.warning(
+                "Engagement engines use %d bytes, over the %d byte budget, "
+                "with nothing left to evict",
+                total,
+                self.memory_budget_bytes,
+            )
+
+    def _close(self, engagement_id: str) -> None:
+        entry = self._entries.pop(engagement_id)
+        if entry.owned:
+            entry.engine.close()
+            logger.info("Closed engagement database %s", entry.engine.db_path)
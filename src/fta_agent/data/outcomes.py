@@ -21,6 +21,9 @@ from enum import StrEnum
 import polars as pl
 from pydantic import BaseModel
 
+# Alias under which a separate outcomes database is ATTACHed to the engine.
+OUTCOMES_DB = "outcomes"
+
 # ---------------------------------------------------------------------------
 # Enums
 # ---------------------------------------------------------------------------
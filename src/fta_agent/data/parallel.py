@@ -0,0 +1,30 @@
+"""Process-parallel map for CPU-bound parsing during ingest."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+
+def process_map[R](
+    fn: Callable[..., R], jobs: Sequence[tuple[Any, ...]], workers: int | None = None
+) -> Iterator[R]:
+    """Yield ``fn(*job)`` for each job, in input order.
+
+    Jobs run in up to ``workers`` processes (default: one per core). With a
+    single worker or job they run in-process, skipping the pool start-up.
+    Workers are spawned rather than forked, since callers are threaded
+    server processes; ``fn`` and its arguments must be picklable.
+    """
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for job in jobs:
+            yield fn(*job)
+        return
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for future in [pool.submit(fn, *job) for job in jobs]:
+            yield future.result()
@@ -0,0 +1,240 @@
+"""Versioned, byte-budgeted LRU cache for query results.
+
+Entries are keyed by normalized SQL plus the data version of every table the
+statement mentions, so a reload or UPDATE of a table makes every cached result
+that read it unreachable without an explicit invalidation pass. Unreachable
+entries age out through normal LRU eviction.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][\w]*")
+_MUTATION_RE = re.compile(
+    r"^\s*(INSERT|UPDATE|DELETE|CREATE|DROP|ALTER|COPY|TRUNCATE|MERGE|ATTACH|DETACH)\b",
+    re.IGNORECASE,
+)
+_TARGET_RE = re.compile(
+    r"\b(?:INTO|UPDATE|TABLE|VIEW|FROM)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?"
+    r"(?:[A-Za-z_]\w*\.)?([A-Za-z_]\w*)",
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse comments and whitespace so formatting does not split cache keys."""
+    sql = _LINE_COMMENT_RE.sub(" ", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip().rstrip(";").strip()
+
+
+def sql_identifiers(sql: str) -> set[str]:
+    """Lower-cased identifier tokens in a statement (a superset of its tables)."""
+    return {token.lower() for token in _IDENTIFIER_RE.findall(sql)}
+
+
+def mutation_targets(sql: str) -> set[str] | None:
+    """Tables a statement may modify.
+
+    Returns an empty set for read-only statements and ``None`` when the
+    statement mutates something whose target cannot be determined.
+    """
+    if not _MUTATION_RE.match(sql):
+        return set()
+    targets = {name.lower() for name in _TARGET_RE.findall(sql)}
+    return targets or None
+
+
+@dataclass
+class CacheStats:
+    """Counters for a QueryCache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes_used: int
+    max_bytes: int
+
+    def to_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self.entries,
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class QueryCache:
+    """Thread-safe LRU of Polars results bounded by estimated byte size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[pl.DataFrame, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> pl.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, df: pl.DataFrame) -> None:
+        size = int(df.estimated_size())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes_used=self._bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+@dataclass(frozen=True)
+class VersionState:
+    """A point-in-time copy of ``TableVersions``."""
+
+    versions: Mapping[str, int]
+    epoch: int
+    writing: frozenset[str]
+    writing_all: bool
+
+    def of(self, tables: Iterable[str]) -> tuple[int, ...] | None:
+        """Versions of ``tables``, or None while a write to any of them is in flight."""
+        keys = [t.lower() for t in tables]
+        if self.writing_all or any(k in self.writing for k in keys):
+            return None
+        return tuple(self.versions.get(k, 0) + self.epoch for k in keys)
+
+    def key(self, sql: str) -> tuple[int, tuple[tuple[str, int], ...]] | None:
+        """Versions of every known table a statement mentions, plus the epoch.
+
+        None while a write to any of them is in flight.
+        """
+        tokens = sql_identifiers(sql)
+        if self.writing_all or tokens & self.writing:
+            return None
+        mentioned = tuple(
+            sorted((t, v) for t, v in self.versions.items() if t in tokens)
+        )
+        return self.epoch, mentioned
+
+    def until(self, later: VersionState) -> VersionState:
+        """This state with whatever changed by ``later`` marked in flight.
+
+        A read that started between the two copies may or may not see those
+        writes, so their tables are treated as changing.
+        """
+        changed = {
+            t
+            for t in self.versions.keys() | later.versions.keys()
+            if self.versions.get(t) != later.versions.get(t)
+        }
+        return VersionState(
+            versions=self.versions,
+            epoch=self.epoch,
+            writing=self.writing | later.writing | changed,
+            writing_all=(
+                self.writing_all or later.writing_all or self.epoch != later.epoch
+            ),
+        )
+
+
+class TableVersions:
+    """Per-table data-version counters, bumped on every write.
+
+    Writes made inside ``writing`` are also marked in flight until they
+    finish, so a reader can tell "unchanged" from "changing right now".
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self._writing: Counter[str] = Counter()
+        self._writing_all = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def writing(self, tables: Iterable[str] | None) -> Iterator[None]:
+        """Mark ``tables`` (None: every table) in flight, then bump them on exit.
+
+        An empty ``tables`` is a read and changes nothing.
+        """
+        keys = None if tables is None else [t.lower() for t in tables]
+        if keys == []:
+            yield
+            return
+        with self._lock:
+            if keys is None:
+                self._writing_all += 1
+            else:
+                self._writing.update(keys)
+        try:
+            yield
+        finally:
+            with self._lock:
+                if keys is None:
+                    self._writing_all -= 1
+                    self._epoch += 1
+                else:
+                    self._writing.subtract(keys)
+                    self._writing += Counter()  # drop zero counts
+                    for key in keys:
+                        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def state(self) -> VersionState:
+        """Copy the current versions and in-flight writes."""
+        with self._lock:
+            return VersionState(
+                versions=dict(self._versions),
+                epoch=self._epoch,
+                writing=frozenset(self._writing),
+                writing_all=self._writing_all > 0,
+            )
+
+    def version(self, table: str) -> int:
+        with self._lock:
+            return self._versions.get(table.lower(), 0) + self._epoch
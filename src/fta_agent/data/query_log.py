@@ -0,0 +1,146 @@
+"""Query instrumentation: per-query timings and a slow-query log.
+
+DataEngine records every statement it runs into a QueryLog. Records carry the
+caller tag (the GL tool or route that issued the query), so the debug endpoint
+can show which tool dominates agent turn latency.
+
+Tags are taken from an explicit ``tag=`` argument or, failing that, from the
+``query_tag`` context manager, which is how tools label all of their queries
+without threading a parameter through every call.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+_current_tag: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "fta_query_tag", default=None
+)
+
+
+@contextmanager
+def query_tag(tag: str) -> Iterator[None]:
+    """Label every query issued inside the block with ``tag``."""
+    token = _current_tag.set(tag)
+    try:
+        yield
+    finally:
+        _current_tag.reset(token)
+
+
+def current_tag() -> str | None:
+    return _current_tag.get()
+
+
+@dataclass
+class QueryRecord:
+    """Timing and size of a single statement."""
+
+    timestamp: str
+    tag: str | None
+    sql: str
+    wall_ms: float
+    rows: int | None
+    bytes: int | None
+    cached: bool = False
+    error: str | None = None
+    explain: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class QueryLog:
+    """Thread-safe ring buffers of recent and slow queries plus per-tag totals."""
+
+    def __init__(
+        self,
+        size: int = 200,
+        slow_query_ms: float = 500.0,
+        explain_slow: bool = False,
+    ) -> None:
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self._recent: deque[QueryRecord] = deque(maxlen=size)
+        self._slow: deque[QueryRecord] = deque(maxlen=size)
+        self._by_tag: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def is_slow(self, wall_ms: float) -> bool:
+        return wall_ms >= self.slow_query_ms
+
+    def record(
+        self,
+        sql: str,
+        wall_ms: float,
+        rows: int | None = None,
+        nbytes: int | None = None,
+        tag: str | None = None,
+        cached: bool = False,
+        error: str | None = None,
+        explain: str | None = None,
+    ) -> QueryRecord:
+        rec = QueryRecord(
+            timestamp=datetime.now(UTC).isoformat(),
+            tag=tag or current_tag(),
+            sql=sql.strip(),
+            wall_ms=round(wall_ms, 3),
+            rows=rows,
+            bytes=nbytes,
+            cached=cached,
+            error=error,
+            explain=explain,
+        )
+        with self._lock:
+            self._recent.append(rec)
+            if self.is_slow(wall_ms):
+                self._slow.append(rec)
+            totals = self._by_tag.setdefault(
+                rec.tag or "(untagged)",
+                {"queries": 0, "total_ms": 0.0, "max_ms": 0.0, "cache_hits": 0},
+            )
+            totals["queries"] += 1
+            totals["total_ms"] += wall_ms
+            totals["max_ms"] = max(totals["max_ms"], wall_ms)
+            if cached:
+                totals["cache_hits"] += 1
+        return rec
+
+    def recent(self, limit: int | None = None) -> list[QueryRecord]:
+        with self._lock:
+            records = list(self._recent)
+        return records[-limit:] if limit else records
+
+    def slow(self, limit: int | None = None) -> list[QueryRecord]:
+        with self._lock:
+            records = list(self._slow)
+        return records[-limit:] if limit else records
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Per-tag totals, heaviest first."""
+        with self._lock:
+            rows = [
+                {
+                    "tag": tag,
+                    "queries": int(t["queries"]),
+                    "cache_hits": int(t["cache_hits"]),
+                    "total_ms": round(t["total_ms"], 3),
+                    "avg_ms": round(t["total_ms"] / t["queries"], 3),
+                    "max_ms": round(t["max_ms"], 3),
+                }
+                for tag, t in self._by_tag.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._slow.clear()
+            self._by_tag.clear()
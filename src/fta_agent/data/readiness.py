@@ -0,0 +1,96 @@
+"""Readiness tracking for background fixture loading.
+
+The API starts serving before fixture data is loaded. ``DataReadiness``
+records which tables are available so ``/health`` can report progress and
+data routes can wait briefly for the tables they need instead of failing on
+a missing ``postings``.
+
+All mutation happens on the event loop (the background loader awaits each
+table's load on the engine executor, then marks it ready), so plain
+``asyncio.Event`` objects suffice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Iterable
+from typing import Any, Literal
+
+ReadinessState = Literal["pending", "loading", "ready", "failed"]
+
+
+class DataReadiness:
+    """Per-table readiness for a set of tables loaded in the background."""
+
+    def __init__(self, tables: Iterable[str]) -> None:
+        self.state: ReadinessState = "pending"
+        self.error: str | None = None
+        self._events = {name: asyncio.Event() for name in tables}
+        self._changed = asyncio.Event()
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def is_table_ready(self, name: str) -> bool:
+        event = self._events.get(name)
+        return event is None or event.is_set()
+
+    def mark_loading(self) -> None:
+        self.state = "loading"
+        self._started_at = time.monotonic()
+        self._notify()
+
+    def mark_table_ready(self, name: str) -> None:
+        self._events.setdefault(name, asyncio.Event()).set()
+        self._notify()
+
+    def mark_ready(self) -> None:
+        for event in self._events.values():
+            event.set()
+        self.state = "ready"
+        self._finished_at = time.monotonic()
+        self._notify()
+
+    def mark_failed(self, exc: BaseException) -> None:
+        self.state = "failed"
+        self.error = f"{type(exc).__name__}: {exc}"
+        self._finished_at = time.monotonic()
+        self._notify()
+
+    async def wait_for(self, tables: Iterable[str], timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for ``tables``; return whether they are ready.
+
+        Returns early (False) if loading fails.
+        """
+        names = list(tables)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not all(self.is_table_ready(name) for name in names):
+            remaining = deadline - loop.time()
+            if self.state == "failed" or remaining <= 0:
+                return False
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except TimeoutError:
+                return False
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        elapsed = None
+        if self._started_at is not None:
+            end = self._finished_at or time.monotonic()
+            elapsed = round(end - self._started_at, 3)
+        return {
+            "state": self.state,
+            "tables": {name: event.is_set() for name, event in self._events.items()},
+            "elapsed_s": elapsed,
+            "error": self.error,
+        }
+
+    def _notify(self) -> None:
+        self._changed.set()
@@ -204,6 +204,17 @@ POSTING_SCHEMA = {
     "policy_year": pl.Int32,
 }
 
+# Natural key of a posting line (SAP BKPF/BSEG: BUKRS, GJAHR, BELNR, BUZEI).
+POSTING_KEY = ("company_code", "fiscal_year", "document_number", "line_item")
+
+# Hive partition columns of a stored postings dataset, outermost first. Tools
+# filter on one period (or a range of them), so a filtered scan reads only
+# the matching fiscal_year=/fiscal_period=/company_code= directories.
+POSTING_PARTITION_BY = ("fiscal_year", "fiscal_period", "company_code")
+
+# Tables persisted as partitioned Parquet datasets rather than single files.
+PARTITIONED_TABLES: dict[str, tuple[str, ...]] = {"postings": POSTING_PARTITION_BY}
+
 ACCOUNT_MASTER_SCHEMA = {
     "gl_account": pl.Utf8,
     "description": pl.Utf8,
@@ -231,3 +242,65 @@ TRIAL_BALANCE_SCHEMA = {
     "closing_balance": pl.Float64,
     "cumulative_balance": pl.Float64,
 }
+
+# DuckDB column types for the Polars schemas above, used by the native
+# (read_csv / read_parquet) ingest path.
+_DUCKDB_TYPES: dict[type[pl.DataType], str] = {
+    pl.Utf8: "VARCHAR",
+    pl.Int32: "INTEGER",
+    pl.Int64: "BIGINT",
+    pl.Float64: "DOUBLE",
+    pl.Boolean: "BOOLEAN",
+    pl.Date: "DATE",
+}
+
+
+def duckdb_types(schema: dict[str, type[pl.DataType]]) -> dict[str, str]:
+    """Map a Polars schema dict to DuckDB SQL type names."""
+    return {name: _DUCKDB_TYPES[dtype] for name, dtype in schema.items()}
+
+
+# SAP field names (ACDOCA, with BKPF/BSEG equivalents) mapped to posting
+# columns. Where several SAP fields map to one column, the first present in
+# an upload wins: HSL (company-code currency) is preferred over DMBTR.
+# HSL is signed; ``validate_frame`` stores its magnitude and, without an
+# SHKZG/DRCRK indicator, derives debit_credit from the sign.
+SAP_FIELD_MAP: dict[str, str] = {
+    "RBUKRS": "company_code",
+    "BUKRS": "company_code",
+    "GJAHR": "fiscal_year",
+    "RYEAR": "fiscal_year",
+    "POPER": "fiscal_period",
+    "MONAT": "fiscal_period",
+    "BELNR": "document_number",
+    "DOCLN": "line_item",
+    "BUZEI": "line_item",
+    "BLART": "document_type",
+    "BUDAT": "posting_date",
+    "CPUDT": "entry_date",
+    "BSCHL": "posting_key",
+    "DRCRK": "debit_credit",
+    "SHKZG": "debit_credit",
+    "RACCT": "gl_account",
+    "HKONT": "gl_account",
+    "HSL": "amount",
+    "DMBTR": "amount",
+    "RHCUR": "currency",
+    "WAERS": "currency",
+    "PRCTR": "profit_center",
+    "RCNTR": "cost_center",
+    "KOSTL": "cost_center",
+    "RFAREA": "functional_area",
+    "FKBER": "functional_area",
+    "SEGMENT": "segment",
+    "RBUSA": "business_area",
+    "GSBER": "business_area",
+    "RASSC": "trading_partner",
+    "VBUND": "trading_partner",
+    "XBLNR": "reference",
+    "SGTXT": "text",
+    "USNAM": "user_id",
+}
+
+# SAP debit/credit indicators (Soll/Haben) as DebitCredit values.
+SAP_DEBIT_CREDIT = {"S": DebitCredit.DEBIT.value, "H": DebitCredit.CREDIT.value}
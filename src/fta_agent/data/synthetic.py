@@ -16,6 +16,7 @@ Embedded MJE patterns (documented for later detection verification):
 from __future__ import annotations
 
 import hashlib
+import shutil
 from datetime import date, timedelta
 from pathlib import Path
 from typing import Any
@@ -24,6 +25,7 @@ import polars as pl
 
 from fta_agent.data.schemas import (
     ACCOUNT_MASTER_SCHEMA,
+    PARTITIONED_TABLES,
     POSTING_SCHEMA,
 )
 
@@ -32,6 +34,9 @@ from fta_agent.data.schemas import (
 # ---------------------------------------------------------------------------
 
 SEED = 42
+# Bump whenever generation logic changes so persisted engagement databases
+# reload fixtures produced by an older generator.
+GENERATOR_VERSION = "1"
 COMPANY_CODE = "1000"
 IC_COMPANY_CODE = "2000"  # Intercompany partner
 CURRENCY = "USD"
@@ -2082,7 +2087,9 @@ def save_fixtures(
 ) -> dict[str, Path]:
     """Generate and save synthetic data to disk.
 
-    Returns paths to the generated files.
+    Tables in ``PARTITIONED_TABLES`` (postings) are saved in the Parquet
+    format as a hive-partitioned dataset directory, ``postings/``, rather
+    than a single file. Returns paths to the generated files.
     """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -2095,7 +2102,12 @@ def save_fixtures(
             csv_path = output_path / f"{name}.csv"
             df.write_csv(csv_path)
             paths[f"{name}_csv"] = csv_path
-        if "parquet" in formats:
+        if "parquet" in formats and name in PARTITIONED_TABLES:
+            dataset_path = output_path / name
+            shutil.rmtree(dataset_path, ignore_errors=True)
+            df.write_parquet(dataset_path, partition_by=list(PARTITIONED_TABLES[name]))
+            paths[f"{name}_parquet"] = dataset_path
+        elif "parquet" in formats:
             parquet_path = output_path / f"{name}.parquet"
             df.write_parquet(parquet_path)
             paths[f"{name}_parquet"] = parquet_path
@@ -0,0 +1,362 @@
+"""Columnar validation of uploaded GL data.
+
+Running ``PostingRecord`` row by row is far too slow for a multi-million-line
+extract, so uploads are validated with vectorized Polars expressions instead.
+The rules are derived from the Pydantic models in ``schemas`` — required
+fields from the fields without defaults, enum domains from ``StrEnum``
+annotations — so the two cannot drift apart.
+
+``validate_frame`` renames SAP field names (``SAP_FIELD_MAP``), coerces the
+columns to the table's Polars schema and reports, per violated rule, a count
+plus a few sample rows. It never drops rows: callers decide what to do with
+the report.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from typing import Any, Literal
+
+import polars as pl
+from pydantic import BaseModel
+
+from fta_agent.data.engine import DataEngine, sql_identifier, sql_literal
+from fta_agent.data.schemas import (
+    ACCOUNT_MASTER_SCHEMA,
+    POSTING_KEY,
+    POSTING_SCHEMA,
+    SAP_DEBIT_CREDIT,
+    SAP_FIELD_MAP,
+    TRIAL_BALANCE_SCHEMA,
+    AccountMasterRecord,
+    DebitCredit,
+    PostingRecord,
+    TrialBalanceRecord,
+)
+
+Rule = Literal["missing_column", "type", "null", "domain"]
+
+DEFAULT_SAMPLE_SIZE = 5
+
+_TRUE = ("true", "1", "x", "y", "yes")
+_FALSE = ("false", "0", "", "n", "no")
+
+
+@dataclass(frozen=True)
+class TableRules:
+    """What ``validate_frame`` checks for one table."""
+
+    schema: dict[str, type[pl.DataType]]
+    required: tuple[str, ...]
+    domains: dict[str, tuple[str, ...]]
+    key: tuple[str, ...] = ()
+    field_map: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_model(
+        cls,
+        model: type[BaseModel],
+        schema: dict[str, type[pl.DataType]],
+        key: tuple[str, ...] = (),
+        field_map: dict[str, str] | None = None,
+    ) -> TableRules:
+        required = tuple(
+            name for name, info in model.model_fields.items() if info.is_required()
+        )
+        domains = {
+            name: tuple(member.value for member in info.annotation)
+            for name, info in model.model_fields.items()
+            if isinstance(info.annotation, type)
+            and issubclass(info.annotation, StrEnum)
+        }
+        return cls(schema, required, domains, key, field_map or {})
+
+
+TABLE_RULES: dict[str, TableRules] = {
+    "postings": TableRules.from_model(
+        PostingRecord, POSTING_SCHEMA, key=POSTING_KEY, field_map=SAP_FIELD_MAP
+    ),
+    "account_master": TableRules.from_model(
+        AccountMasterRecord, ACCOUNT_MASTER_SCHEMA, key=("gl_account",)
+    ),
+    "trial_balance": TableRules.from_model(TrialBalanceRecord, TRIAL_BALANCE_SCHEMA),
+}
+
+
+@dataclass
+class Violation:
+    """One failed rule: how many rows broke it, and a few of them."""
+
+    column: str
+    rule: Rule
+    count: int
+    samples: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating one frame."""
+
+    rows: int
+    renamed: dict[str, str] = field(default_factory=dict)
+    violations: list[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    @classmethod
+    def combine(
+        cls,
+        reports: Sequence[tuple[str, ValidationReport]],
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+    ) -> ValidationReport:
+        """Merge per-file reports, tagging each sample row with its file."""
+        merged: dict[tuple[str, Rule], Violation] = {}
+        renamed: dict[str, str] = {}
+        for name, report in reports:
+            renamed.update(report.renamed)
+            for v in report.violations:
+                key = (v.column, v.rule)
+                into = merged.setdefault(key, Violation(v.column, v.rule, 0))
+                into.count += v.count
+                room = sample_size - len(into.samples)
+                into.samples.extend({"file": name, **s} for s in v.samples[:room])
+        return cls(
+            rows=sum(r.rows for _, r in reports),
+            renamed=renamed,
+            violations=list(merged.values()),
+        )
+
+    def type_errors(self) -> dict[str, int]:
+        """Columns with values that could not be parsed, and how many."""
+        return {v.column: v.count for v in self.violations if v.rule == "type"}
+
+    def counts(self) -> dict[str, int]:
+        """Violation counts keyed ``column:rule``."""
+        return {f"{v.column}:{v.rule}": v.count for v in self.violations}
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["ok"] = self.ok
+        return data
+
+
+class ValidationError(ValueError):
+    """Values in an upload could not be coerced to the table schema."""
+
+    def __init__(self, message: str, report: ValidationReport) -> None:
+        super().__init__(message)
+        self.report = report
+
+
+def sap_renames(columns: list[str], field_map: dict[str, str]) -> dict[str, str]:
+    """Renames that map SAP field names in ``columns`` to table columns.
+
+    Matching is case-insensitive. A column already present under its
+    canonical name is never overwritten, and when several SAP fields map to
+    one column the first in ``field_map`` order wins.
+    """
+    by_upper = {name.upper(): name for name in columns}
+    taken = set(columns)
+    renames: dict[str, str] = {}
+    for sap_name, target in field_map.items():
+        source = by_upper.get(sap_name)
+        if source is None or target in taken:
+            continue
+        renames[source] = target
+        taken.add(target)
+    return renames
+
+
+def _coerce(col: pl.Expr, source: pl.DataType, target: type[pl.DataType]) -> pl.Expr:
+    """Cast ``col`` to ``target``, turning unparseable values into nulls."""
+    if source == target:
+        return col
+    if target == pl.Date:
+        if source == pl.Datetime:
+            return col.cast(pl.Date)
+        text = col.cast(pl.Utf8).str.strip_chars()
+        # ISO dates, or SAP's YYYYMMDD (also when read as an integer).
+        return pl.coalesce(
+            text.str.to_date("%Y-%m-%d", strict=False),
+            text.str.to_date("%Y%m%d", strict=False),
+        )
+    if source == pl.Utf8:
+        text = col.str.strip_chars()
+        if target == pl.Boolean:
+            lower = text.str.to_lowercase()
+            return (
+                pl.when(lower.is_in(_TRUE))
+                .then(True)
+                .when(lower.is_in(_FALSE))
+                .then(False)
+                .otherwise(None)
+            )
+        if target == pl.Float64:
+            # SAP list exports put the sign last: "1250.00-".
+            text = (
+                pl.when(text.str.ends_with("-"))
+                .then(pl.lit("-") + text.str.strip_chars_end("-"))
+                .otherwise(text)
+            )
+        return text.cast(target, strict=False)
+    return col.cast(target, strict=False)
+
+
+def _samples(
+    frame: pl.DataFrame, mask: str, columns: list[str], sample_size: int
+) -> list[dict[str, Any]]:
+    rows = (
+        frame.filter(pl.col(mask))
+        .select([pl.col("_row").alias("row"), *columns])
+        .head(sample_size)
+    )
+    return [_plain(r) for r in rows.to_dicts()]
+
+
+def _plain(row: dict[str, Any]) -> dict[str, Any]:
+    """JSON-safe sample row: dates and decimals become strings."""
+    return {
+        k: v if isinstance(v, int | float | str | None) else str(v)
+        for k, v in row.items()
+    }
+
+
+def validate_frame(
+    df: pl.DataFrame,
+    table: str | TableRules = "postings",
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    coerce: bool = True,
+) -> tuple[pl.DataFrame, ValidationReport]:
+    """Rename, coerce and check ``df`` against a table's rules.
+
+    Returns the coerced frame (columns outside the schema pass through
+    unchanged; absent optional columns are not added) and the report.
+    Values that fail coercion become null and are reported under ``type``
+    with their original text. With ``coerce=False`` the frame is assumed to
+    be typed already (e.g. loaded by DuckDB) and only null and domain checks
+    run. Every check is a vectorized expression evaluated in one pass.
+    """
+    rules = TABLE_RULES[table] if isinstance(table, str) else table
+    renamed = sap_renames(df.columns, rules.field_map)
+    if renamed:
+        df = df.rename(renamed)
+    if "debit_credit" in rules.domains and df.schema.get("debit_credit") == pl.Utf8:
+        dc = pl.col("debit_credit").str.strip_chars().str.to_uppercase()
+        df = df.with_columns(dc.replace(SAP_DEBIT_CREDIT))
+
+    present = [c for c in rules.schema if c in df.columns]
+    coerced = {
+        c: _coerce(pl.col(c), df.schema[c], rules.schema[c]).alias(c)
+        for c in present
+        if coerce and df.schema[c] != rules.schema[c]
+    }
+    if "amount" in renamed.values() and "debit_credit" in rules.domains:
+        # ACDOCA amounts (HSL) are signed, but postings store the magnitude
+        # with a D/C indicator, as BSEG's DMBTR + SHKZG do. An explicit
+        # indicator wins; otherwise it is derived from the sign.
+        amount = coerced.get("amount", pl.col("amount"))
+        sign: pl.Expr = (
+            pl.when(amount < 0)
+            .then(pl.lit(DebitCredit.CREDIT.value))
+            .when(amount.is_not_null())
+            .then(pl.lit(DebitCredit.DEBIT.value))
+        )
+        if "debit_credit" in df.columns:
+            sign = pl.coalesce(pl.col("debit_credit"), sign)
+        df = df.with_columns(sign.alias("debit_credit"))
+        coerced["amount"] = amount.abs().alias("amount")
+
+    # One pass computes the coerced columns plus a boolean mask per rule.
+    masks: dict[str, tuple[str, Rule, pl.Expr]] = {}
+    for c, expr in coerced.items():
+        masks[f"_type_{c}"] = (c, "type", pl.col(c).is_not_null() & expr.is_null())
+    for c in rules.required:
+        if c in df.columns:
+            masks[f"_null_{c}"] = (c, "null", pl.col(c).is_null())
+    for c, values in rules.domains.items():
+        if c in df.columns:
+            value = coerced.get(c, pl.col(c))
+            masks[f"_domain_{c}"] = (
+                c,
+                "domain",
+                value.is_not_null() & ~value.is_in(values),
+            )
+    checked = df.with_row_index("_row").with_columns(
+        [expr.alias(name) for name, (_, _, expr) in masks.items()]
+    )
+    counts = (
+        checked.select([pl.col(name).sum() for name in masks]).row(0)
+        if masks
+        else ()
+    )
+
+    violations = [
+        Violation(c, "missing_column", len(df))
+        for c in rules.required
+        if c not in df.columns
+    ]
+    key = [c for c in rules.key if c in df.columns]
+    for (name, (column, rule, _)), count in zip(masks.items(), counts, strict=True):
+        if count:
+            shown = [*dict.fromkeys([*key, column])]
+            samples = _samples(checked, name, shown, sample_size)
+            violations.append(Violation(column, rule, int(count), samples))
+
+    if coerced:
+        df = df.with_columns(list(coerced.values()))
+    return df, ValidationReport(rows=len(df), renamed=renamed, violations=violations)
+
+
+def validate_table(
+    engine: DataEngine,
+    table_name: str,
+    rules: str | TableRules = "postings",
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> ValidationReport:
+    """Null and domain checks on a table already typed by DuckDB.
+
+    The counterpart of ``validate_frame(coerce=False)`` for the native ingest
+    path: all counts come from one aggregate scan, and sample rows are only
+    fetched for rules that failed, so nothing is materialized in Polars.
+    """
+    rules = TABLE_RULES[rules] if isinstance(rules, str) else rules
+    empty = engine.execute(f"SELECT * FROM {table_name} LIMIT 0")
+    columns = {d[0] for d in empty.description}
+    checks: list[tuple[str, Rule, str]] = [
+        (c, "null", f"{sql_identifier(c)} IS NULL")
+        for c in rules.required
+        if c in columns
+    ]
+    for c, values in rules.domains.items():
+        if c in columns:
+            domain = ", ".join(sql_literal(v) for v in values)
+            checks.append((c, "domain", f"{sql_identifier(c)} NOT IN ({domain})"))
+
+    row = engine.execute(
+        "SELECT COUNT(*)"
+        + "".join(f", COUNT(*) FILTER (WHERE {cond})" for _, _, cond in checks)
+        + f" FROM {table_name}"
+    ).fetchone()
+    total, *counts = row if row else (0,)
+    violations = [
+        Violation(c, "missing_column", total)
+        for c in rules.required
+        if c not in columns
+    ]
+    key = [c for c in rules.key if c in columns]
+    for (column, rule, cond), count in zip(checks, counts, strict=True):
+        if not count:
+            continue
+        shown = ", ".join(sql_identifier(c) for c in dict.fromkeys([*key, column]))
+        result = engine.execute(
+            f"SELECT rowid AS row, {shown} FROM {table_name} "
+            f"WHERE {cond} LIMIT {int(sample_size)}"
+        )
+        names = [d[0] for d in result.description]
+        samples = [_plain(dict(zip(names, r, strict=True))) for r in result.fetchall()]
+        violations.append(Violation(column, rule, int(count), samples))
+    return ValidationReport(rows=total, violations=violations)
@@ -6,21 +6,42 @@ Five tools for the GL Design Coach:
   3. compute_trial_balance — retrieve/compute trial balance summaries
   4. generate_income_statement — build a GAAP P&L from posting data
   5. assess_dimensions — analyze dimensional usage and quality
+
+profile_accounts and generate_income_statement read the postings aggregate
+cube (``fta_agent.data.cube``) instead of raw postings whenever it is current
+and their filters allow; compute_trial_balance reads the trial_balance table.
+Tools that need several independent queries issue them together through
+``DataEngine.query_batch``; the others ask for everything in one statement.
+Given a ``ToolResultCache``, the bound tools memoize their results (see
+``fta_agent.tools.result_cache``).
 """
 
 from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Callable, Sequence
 from typing import Any
 
+import polars as pl
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
-from fta_agent.data.engine import DataEngine
+from fta_agent.data.cube import current_cube
+from fta_agent.data.engine import DataEngine, QueryTimeoutError
+from fta_agent.data.query_log import query_tag
+from fta_agent.tools.result_cache import (
+    ToolResultCache,
+    canonical_args,
+    code_fingerprint,
+)
 
 logger = logging.getLogger(__name__)
 
+# Tables each tool reads (the postings cube is derived from postings).
+POSTINGS_TABLES = ("postings", "account_master")
+TRIAL_BALANCE_TABLES = ("trial_balance", "account_master")
+
 
 # ---------------------------------------------------------------------------
 # Tool input schemas
@@ -109,12 +130,27 @@ class AssessDimensionsInput(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-def _profile_accounts(engine: DataEngine, account_filter: str | None = None, top_n: int = 25) -> str:
-    """Profile GL accounts by posting activity, balance behavior, and dimensions used."""
-    where = f"WHERE {account_filter}" if account_filter else ""
+def _query_cube_or_postings(
+    engine: DataEngine, cube_sql: str | None, postings_sql: str
+) -> pl.DataFrame:
+    """Answer from the postings cube when possible, else scan postings.
 
-    sql = f"""
-    WITH posting_stats AS (
+    ``cube_sql`` reads ``postings_cube``; it is used only while the cube is
+    current and the query binds against it (a filter on a column the cube
+    does not keep makes it fall back).
+    """
+    if cube_sql is not None and _cube_answers(engine, cube_sql):
+        return engine.query_polars(cube_sql)
+    return engine.query_polars(postings_sql)
+
+
+def _cube_answers(engine: DataEngine, cube_sql: str) -> bool:
+    """Whether ``cube_sql`` can be answered from a current postings cube."""
+    # Binding also fails in a snapshot pinned before the cube was built.
+    return current_cube(engine) is not None and engine.binds(cube_sql)
+
+
+_PROFILE_STATS_FROM_POSTINGS = """
         SELECT
             p.gl_account,
             COUNT(*) as posting_count,
@@ -135,6 +171,43 @@ def _profile_accounts(engine: DataEngine, account_filter: str | None = None, top
                 / COUNT(*), 1
             ) as mje_pct
         FROM postings p
+"""
+
+# The same statistics re-aggregated from postings_cube cells.
+_PROFILE_STATS_FROM_CUBE = """
+        SELECT
+            p.gl_account,
+            SUM(line_count)::BIGINT as posting_count,
+            COUNT(DISTINCT fiscal_period) as period_count,
+            MIN(first_posting_date) as first_posting,
+            MAX(last_posting_date) as last_posting,
+            SUM(CASE WHEN debit_credit = 'D' THEN amount_total ELSE 0 END)
+                as total_debit,
+            SUM(CASE WHEN debit_credit = 'C' THEN amount_total ELSE 0 END)
+                as total_credit,
+            ROUND(SUM(amount_total) / SUM(line_count), 2) as avg_amount,
+            len(list_distinct(flatten(list(profit_centers))))::BIGINT as pc_count,
+            len(list_distinct(flatten(list(cost_centers))))::BIGINT as cc_count,
+            len(list_distinct(flatten(list(functional_areas))))::BIGINT as fa_count,
+            COUNT(DISTINCT lob) as lob_count,
+            len(list_distinct(flatten(list(states))))::BIGINT as state_count,
+            SUM(CASE WHEN document_category = 'MJE' THEN line_count ELSE 0 END)
+                as mje_count,
+            ROUND(
+                SUM(CASE WHEN document_category = 'MJE' THEN line_count ELSE 0 END)
+                * 100.0 / SUM(line_count), 1
+            ) as mje_pct
+        FROM postings_cube p
+"""
+
+
+def _profile_accounts(engine: DataEngine, account_filter: str | None = None, top_n: int = 25) -> str:
+    """Profile GL accounts by posting activity, balance behavior, and dimensions used."""
+    where = f"WHERE {account_filter}" if account_filter else ""
+
+    def profile_sql(posting_stats: str) -> str:
+        return f"""
+    WITH posting_stats AS ({posting_stats}
         {where}
         GROUP BY p.gl_account
     )
@@ -151,7 +224,11 @@ def _profile_accounts(engine: DataEngine, account_filter: str | None = None, top
     LIMIT {top_n}
     """
 
-    df = engine.query_polars(sql)
+    df = _query_cube_or_postings(
+        engine,
+        profile_sql(_PROFILE_STATS_FROM_CUBE),
+        profile_sql(_PROFILE_STATS_FROM_POSTINGS),
+    )
 
     if df.is_empty():
         return json.dumps({"accounts": [], "summary": "No accounts match the filter."})
@@ -173,7 +250,35 @@ def _profile_accounts(engine: DataEngine, account_filter: str | None = None, top
 
 
 def _detect_mje(engine: DataEngine, min_occurrences: int = 3, include_details: bool = False) -> str:
-    """Detect manual journal entry patterns in posting data."""
+    """Detect manual journal entry patterns in posting data.
+
+    All five pattern queries run as one statement. Postings are scanned once
+    into the MJE subset (the lines three patterns need) and once into an
+    activity aggregate at account x period x category x preparer grain; the
+    patterns are independent branches over those two shared, materialized
+    CTEs, which DuckDB schedules in parallel.
+    """
+
+    # Shared inputs: MJE lines, and line counts / amounts for all postings.
+    shared_sql = """
+    mje AS MATERIALIZED (
+        SELECT gl_account, amount, fiscal_period, user_id, posting_date,
+               trading_partner
+        FROM postings
+        WHERE document_category = 'MJE'
+    ),
+    activity AS MATERIALIZED (
+        SELECT
+            gl_account,
+            fiscal_period,
+            document_category,
+            user_id,
+            COUNT(*) as line_count,
+            SUM(amount) as amount,
+            SUM(ABS(amount)) as abs_amount
+        FROM postings
+        GROUP BY gl_account, fiscal_period, document_category, user_id
+    )"""
 
     # Pattern 1: Recurring identical entries (same accounts, same amounts)
     recurring_identical_sql = f"""
@@ -186,8 +291,7 @@ def _detect_mje(engine: DataEngine, min_occurrences: int = 3, include_details: b
         STRING_AGG(DISTINCT user_id, ', ') as preparers,
         MIN(posting_date) as first_seen,
         MAX(posting_date) as last_seen
-    FROM postings
-    WHERE document_category = 'MJE'
+    FROM mje
     GROUP BY gl_account, amount
     HAVING COUNT(*) >= {min_occurrences}
     ORDER BY occurrences DESC
@@ -198,20 +302,24 @@ def _detect_mje(engine: DataEngine, min_occurrences: int = 3, include_details: b
     mje_concentration_sql = f"""
     SELECT
         'HIGH_MJE_CONCENTRATION' as pattern_type,
-        p.gl_account,
+        a.gl_account,
         am.description,
-        COUNT(*) as total_postings,
-        SUM(CASE WHEN document_category = 'MJE' THEN 1 ELSE 0 END) as mje_count,
+        SUM(a.line_count)::BIGINT as total_postings,
+        SUM(CASE WHEN a.document_category = 'MJE' THEN a.line_count ELSE 0 END)
+            as mje_count,
         ROUND(
-            SUM(CASE WHEN document_category = 'MJE' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1
+            SUM(CASE WHEN a.document_category = 'MJE' THEN a.line_count ELSE 0 END)
+            * 100.0 / SUM(a.line_count), 1
         ) as mje_pct,
-        ROUND(SUM(CASE WHEN document_category = 'MJE' THEN ABS(amount) ELSE 0 END), 2) as mje_dollar_volume,
-        COUNT(DISTINCT CASE WHEN document_category = 'MJE' THEN user_id END) as distinct_preparers
-    FROM postings p
-    LEFT JOIN account_master am ON p.gl_account = am.gl_account
-    GROUP BY p.gl_account, am.description
-    HAVING SUM(CASE WHEN p.document_category = 'MJE' THEN 1 ELSE 0 END) >= {min_occurrences}
-       AND ROUND(SUM(CASE WHEN p.document_category = 'MJE' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1) > 5
+        ROUND(
+            SUM(CASE WHEN a.document_category = 'MJE' THEN a.abs_amount ELSE 0 END), 2
+        ) as mje_dollar_volume,
+        COUNT(DISTINCT CASE WHEN a.document_category = 'MJE' THEN a.user_id END)
+            as distinct_preparers
+    FROM activity a
+    LEFT JOIN account_master am ON a.gl_account = am.gl_account
+    GROUP BY a.gl_account, am.description
+    HAVING mje_count >= {min_occurrences} AND mje_pct > 5
     ORDER BY mje_pct DESC
     LIMIT 20
     """
@@ -224,13 +332,14 @@ def _detect_mje(engine: DataEngine, min_occurrences: int = 3, include_details: b
         fiscal_period,
         SUM(CASE WHEN document_category = 'ACC' THEN amount ELSE 0 END) as accrual_amount,
         SUM(CASE WHEN document_category = 'CLR' THEN amount ELSE 0 END) as reversal_amount,
-        COUNT(CASE WHEN document_category = 'ACC' THEN 1 END) as accrual_count,
-        COUNT(CASE WHEN document_category = 'CLR' THEN 1 END) as reversal_count
-    FROM postings
+        SUM(CASE WHEN document_category = 'ACC' THEN line_count ELSE 0 END)::BIGINT
+            as accrual_count,
+        SUM(CASE WHEN document_category = 'CLR' THEN line_count ELSE 0 END)::BIGINT
+            as reversal_count
+    FROM activity
     WHERE document_category IN ('ACC', 'CLR')
     GROUP BY gl_account, fiscal_period
-    HAVING COUNT(CASE WHEN document_category = 'ACC' THEN 1 END) > 0
-       AND COUNT(CASE WHEN document_category = 'CLR' THEN 1 END) > 0
+    HAVING accrual_count > 0 AND reversal_count > 0
     ORDER BY gl_account, fiscal_period
     LIMIT 30
     """
@@ -245,41 +354,50 @@ def _detect_mje(engine: DataEngine, min_occurrences: int = 3, include_details: b
         ROUND(SUM(ABS(amount)), 2) as total_volume,
         COUNT(DISTINCT fiscal_period) as periods_active,
         COUNT(DISTINCT user_id) as preparers
-    FROM postings
+    FROM mje
     WHERE trading_partner IS NOT NULL
-      AND document_category = 'MJE'
     GROUP BY gl_account, trading_partner
     ORDER BY total_volume DESC
     LIMIT 20
     """
 
-    results: dict[str, Any] = {}
+    # Overall MJE summary
+    overall_summary_sql = """
+    SELECT
+        document_category,
+        SUM(line_count)::BIGINT as count,
+        ROUND(SUM(abs_amount), 2) as dollar_volume,
+        COUNT(DISTINCT gl_account) as distinct_accounts,
+        COUNT(DISTINCT user_id) as distinct_preparers
+    FROM activity
+    GROUP BY document_category
+    ORDER BY count DESC
+    """
 
-    for name, sql in [
-        ("recurring_identical", recurring_identical_sql),
-        ("mje_concentration", mje_concentration_sql),
-        ("accrual_reversal", accrual_reversal_sql),
-        ("intercompany", intercompany_sql),
-    ]:
-        df = engine.query_polars(sql)
-        results[name] = {
-            "count": len(df),
-            "patterns": df.to_dicts(),
-        }
+    # Each section becomes one list-of-rows column, kept in its own order.
+    sections = {
+        "recurring_identical": (recurring_identical_sql, "s.occurrences DESC"),
+        "mje_concentration": (mje_concentration_sql, "s.mje_pct DESC"),
+        "accrual_reversal": (accrual_reversal_sql, "s.gl_account, s.fiscal_period"),
+        "intercompany": (intercompany_sql, "s.total_volume DESC"),
+        "overall_summary": (overall_summary_sql, "s.count DESC"),
+    }
+    ctes = "".join(f",\n    {name} AS ({sql})" for name, (sql, _) in sections.items())
+    columns = ",\n    ".join(
+        f"(SELECT list(s ORDER BY {order}) FROM {name} s) AS {name}"
+        for name, (_, order) in sections.items()
+    )
+    row = engine.query_polars(f"WITH {shared_sql}{ctes}\nSELECT\n    {columns}").row(
+        0, named=True
+    )
 
-    # Overall MJE summary
-    summary_df = engine.query_polars("""
-        SELECT
-            document_category,
-            COUNT(*) as count,
-            ROUND(SUM(ABS(amount)), 2) as dollar_volume,
-            COUNT(DISTINCT gl_account) as distinct_accounts,
-            COUNT(DISTINCT user_id) as distinct_preparers
-        FROM postings
-        GROUP BY document_category
-        ORDER BY count DESC
-    """)
-    results["overall_summary"] = summary_df.to_dicts()
+    results: dict[str, Any] = {}
+    for name in sections:
+        patterns = row[name] or []
+        if name == "overall_summary":
+            results[name] = patterns
+        else:
+            results[name] = {"count": len(patterns), "patterns": patterns}
 
     return json.dumps(results, default=str)
 
@@ -316,11 +434,6 @@ def _compute_trial_balance(
     ORDER BY tb.gl_account, tb.fiscal_period
     """
 
-    df = engine.query_polars(sql)
-
-    if df.is_empty():
-        return json.dumps({"rows": [], "summary": "No trial balance data found."})
-
     # Aggregated summary
     summary_sql = f"""
     SELECT
@@ -335,7 +448,11 @@ def _compute_trial_balance(
     GROUP BY am.account_type
     ORDER BY am.account_type
     """
-    summary_df = engine.query_polars(summary_sql)
+    frames = engine.query_batch({"rows": sql, "summary": summary_sql})
+    df, summary_df = frames["rows"], frames["summary"]
+
+    if df.is_empty():
+        return json.dumps({"rows": [], "summary": "No trial balance data found."})
 
     result = {
         "row_count": len(df),
@@ -352,9 +469,17 @@ def _generate_income_statement(
     period_to: int = 12,
     by_lob: bool = False,
 ) -> str:
-    """Generate a GAAP-style income statement from posting data."""
+    """Generate a GAAP-style income statement from posting data.
+
+    Every query groups to account (and LOB) level under a period range, so
+    all of them read the postings cube when it is current.
+    """
     lob_select = ", p.lob" if by_lob else ""
     lob_group = ", p.lob" if by_lob else ""
+    if _cube_answers(engine, "SELECT gl_account, amount_total FROM postings_cube"):
+        postings, amount = "postings_cube", "amount_total"
+    else:
+        postings, amount = "postings", "amount"
 
     sql = f"""
     WITH is_data AS (
@@ -365,13 +490,13 @@ def _generate_income_statement(
             p.gl_account,
             am.description
             {lob_select},
-            SUM(CASE WHEN p.debit_credit = 'D' THEN p.amount ELSE 0 END) as debits,
-            SUM(CASE WHEN p.debit_credit = 'C' THEN p.amount ELSE 0 END) as credits,
+            SUM(CASE WHEN p.debit_credit = 'D' THEN p.{amount} ELSE 0 END) as debits,
+            SUM(CASE WHEN p.debit_credit = 'C' THEN p.{amount} ELSE 0 END) as credits,
             SUM(
-                CASE WHEN p.debit_credit = 'D' THEN p.amount
-                     ELSE -p.amount END
+                CASE WHEN p.debit_credit = 'D' THEN p.{amount}
+                     ELSE -p.{amount} END
             ) as net_amount
-        FROM postings p
+        FROM {postings} p
         JOIN account_master am ON p.gl_account = am.gl_account
         WHERE am.account_type IN ('R', 'X')
           AND p.fiscal_period BETWEEN {period_from} AND {period_to}
@@ -382,11 +507,6 @@ def _generate_income_statement(
     ORDER BY account_type DESC, account_group, gl_account
     """
 
-    df = engine.query_polars(sql)
-
-    if df.is_empty():
-        return json.dumps({"line_items": [], "summary": "No P&L data found for the period."})
-
     # Build category summaries
     category_sql = f"""
     SELECT
@@ -394,31 +514,37 @@ def _generate_income_statement(
         am.account_group,
         COUNT(DISTINCT p.gl_account) as account_count,
         ROUND(SUM(
-            CASE WHEN p.debit_credit = 'D' THEN p.amount ELSE -p.amount END
+            CASE WHEN p.debit_credit = 'D' THEN p.{amount} ELSE -p.{amount} END
         ), 2) as net_amount
-    FROM postings p
+    FROM {postings} p
     JOIN account_master am ON p.gl_account = am.gl_account
     WHERE am.account_type IN ('R', 'X')
       AND p.fiscal_period BETWEEN {period_from} AND {period_to}
     GROUP BY am.account_type, am.account_group
     ORDER BY am.account_type DESC, am.account_group
     """
-    categories_df = engine.query_polars(category_sql)
 
     # Revenue and expense totals
     totals_sql = f"""
     SELECT
         am.account_type,
         ROUND(SUM(
-            CASE WHEN p.debit_credit = 'D' THEN p.amount ELSE -p.amount END
+            CASE WHEN p.debit_credit = 'D' THEN p.{amount} ELSE -p.{amount} END
         ), 2) as net_amount
-    FROM postings p
+    FROM {postings} p
     JOIN account_master am ON p.gl_account = am.gl_account
     WHERE am.account_type IN ('R', 'X')
       AND p.fiscal_period BETWEEN {period_from} AND {period_to}
     GROUP BY am.account_type
     """
-    totals_df = engine.query_polars(totals_sql)
+    frames = engine.query_batch(
+        {"line_items": sql, "categories": category_sql, "totals": totals_sql}
+    )
+    df, categories_df, totals_df = frames.values()
+
+    if df.is_empty():
+        return json.dumps({"line_items": [], "summary": "No P&L data found for the period."})
+
     totals = {row["account_type"]: row["net_amount"] for row in totals_df.to_dicts()}
 
     revenue = totals.get("R", 0)
@@ -442,65 +568,80 @@ def _assess_dimensions(
     engine: DataEngine,
     dimensions: list[str] | None = None,
 ) -> str:
-    """Analyze dimensional usage and quality across posting data."""
-    dims = dimensions or [
+    """Analyze dimensional usage and quality across posting data.
+
+    One scan of postings (joined to the account master) counts lines per
+    account type and value of every requested dimension via GROUPING SETS;
+    fill rates, distinct counts, distributions and the by-account-type
+    breakdown are all derived from that small result, so the cost stays one
+    scan however many dimensions are asked for.
+    """
+    dims = list(dict.fromkeys(dimensions or [
         "profit_center", "cost_center", "functional_area",
         "segment", "lob", "state",
-    ]
+    ]))
 
-    results: dict[str, Any] = {}
-    total_postings = engine.query_polars("SELECT COUNT(*) as cnt FROM postings")["cnt"][0]
+    groupings = (f"GROUPING(p.{dim}) AS _grouping_{i}" for i, dim in enumerate(dims))
+    sql = f"""
+    SELECT
+        am.account_type,
+        {", ".join(f"p.{dim}" for dim in dims)},
+        {", ".join(groupings)},
+        COUNT(*) as posting_count
+    FROM postings p
+    LEFT JOIN account_master am ON p.gl_account = am.gl_account
+    GROUP BY GROUPING SETS (
+        {", ".join(f"(am.account_type, p.{dim})" for dim in dims)}
+    )
+    """
+    counts = engine.query_polars(sql)
 
-    for dim in dims:
-        # Usage stats
-        stats_sql = f"""
-        SELECT
-            COUNT(*) as total,
-            SUM(CASE WHEN {dim} IS NOT NULL THEN 1 ELSE 0 END) as populated,
-            COUNT(DISTINCT {dim}) as distinct_values,
-            ROUND(
-                SUM(CASE WHEN {dim} IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1
-            ) as fill_rate_pct
-        FROM postings
-        """
-        stats = engine.query_polars(stats_sql).to_dicts()[0]
+    def pct(part: pl.Expr, whole: pl.Expr | int) -> pl.Expr:
+        # ROUND in DuckDB rounds half away from zero.
+        return (part * 100.0 / whole).round(1, mode="half_away_from_zero")
 
-        # Value distribution (top 15)
-        dist_sql = f"""
-        SELECT
-            COALESCE({dim}, '(null)') as value,
-            COUNT(*) as posting_count,
-            ROUND(COUNT(*) * 100.0 / {total_postings}, 1) as pct
-        FROM postings
-        GROUP BY {dim}
-        ORDER BY posting_count DESC
-        LIMIT 15
-        """
-        dist = engine.query_polars(dist_sql).to_dicts()
-
-        # Cross-dimension: which account types use this dim
-        cross_sql = f"""
-        SELECT
-            am.account_type,
-            COUNT(*) as total_postings,
-            SUM(CASE WHEN p.{dim} IS NOT NULL THEN 1 ELSE 0 END) as populated,
-            ROUND(
-                SUM(CASE WHEN p.{dim} IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1
-            ) as fill_rate_pct
-        FROM postings p
-        LEFT JOIN account_master am ON p.gl_account = am.gl_account
-        GROUP BY am.account_type
-        ORDER BY am.account_type
-        """
-        cross = engine.query_polars(cross_sql).to_dicts()
+    results: dict[str, Any] = {}
+    for i, dim in enumerate(dims):
+        cells = counts.filter(pl.col(f"_grouping_{i}") == 0).select(
+            "account_type", dim, "posting_count"
+        )
+        is_populated = pl.col(dim).is_not_null()
+        total = int(cells["posting_count"].sum())
+        populated = int(cells.filter(is_populated)["posting_count"].sum())
+        fill_rate = pl.select(pct(pl.lit(populated), total)).item() if total else None
+
+        dist = (
+            cells.group_by(dim)
+            .agg(pl.col("posting_count").sum())
+            .sort(["posting_count", dim], descending=[True, False], nulls_last=True)
+            .head(15)
+            .select(
+                pl.col(dim).cast(pl.Utf8).fill_null("(null)").alias("value"),
+                "posting_count",
+                pct(pl.col("posting_count"), total).alias("pct"),
+            )
+        )
+        cross = (
+            cells.group_by("account_type")
+            .agg(
+                pl.col("posting_count").sum().alias("total_postings"),
+                pl.col("posting_count").filter(is_populated).sum().alias("populated"),
+            )
+            .with_columns(
+                pct(pl.col("populated"), pl.col("total_postings")).alias(
+                    "fill_rate_pct"
+                )
+            )
+            .sort("account_type", nulls_last=True)
+        )
 
         results[dim] = {
-            "fill_rate_pct": stats["fill_rate_pct"],
-            "distinct_values": int(stats["distinct_values"]),
-            "populated": int(stats["populated"]),
-            "total": int(stats["total"]),
-            "value_distribution": dist,
-            "by_account_type": cross,
+            "fill_rate_pct": fill_rate,
+            "distinct_values": cells.filter(is_populated)[dim].n_unique(),
+            "populated": populated,
+            "total": total,
+            "value_distribution": dist.to_dicts(),
+            "by_account_type": cross.to_dicts(),
         }
 
     return json.dumps(results, default=str)
@@ -511,14 +652,81 @@ def _assess_dimensions(
 # ---------------------------------------------------------------------------
 
 
-def create_gl_tools(engine: DataEngine) -> list[StructuredTool]:
+def _bind_tool(
+    engine: DataEngine,
+    impl: Callable[..., str],
+    name: str,
+    description: str,
+    args_schema: type[BaseModel],
+    tables: Sequence[str],
+    cache: ToolResultCache | None = None,
+) -> StructuredTool:
+    """Bind a tool implementation to an engine with sync and async entry points.
+
+    The async entry point runs the implementation on the engine's executor so
+    an agent streaming over SSE never blocks the event loop on a scan. A query
+    that hits the engine deadline is reported back to the agent as a JSON
+    error instead of failing the tool call. Every query the tool issues is
+    tagged with the tool name in the engine's query log.
+
+    With a ``cache``, results are memoized against the data of ``tables`` and
+    the code of the tool and of the cube it may read.
+    The tool returns content and artifact; the artifact's ``cache`` entry
+    (hit, miss or bypass) reaches the ``on_tool_end`` event with the
+    ToolMessage.
+    """
+
+    code = code_fingerprint(impl, current_cube) if cache is not None else ""
+
+    def run(**kwargs: Any) -> str:
+        with query_tag(name):
+            return impl(engine, **kwargs)
+
+    def func(**kwargs: Any) -> tuple[str, dict[str, Any]]:
+        try:
+            if cache is None:
+                return run(**kwargs), {}
+            args = canonical_args(impl, kwargs)
+            result, status = cache.call(
+                engine, name, tables, args, lambda: run(**kwargs), code
+            )
+            return result, {"cache": status}
+        except QueryTimeoutError as e:
+            logger.warning("Tool %s timed out after %ss", name, e.timeout_s)
+            return json.dumps({
+                "error": "query_timeout",
+                "message": (
+                    f"{name} did not finish within {e.timeout_s:g}s and was stopped. "
+                    "Retry with narrower arguments (e.g. a more selective filter, "
+                    "fewer periods or dimensions)."
+                ),
+            }), {}
+
+    async def coroutine(**kwargs: Any) -> tuple[str, dict[str, Any]]:
+        return await engine.arun(func, **kwargs)
+
+    return StructuredTool.from_function(
+        func=func,
+        coroutine=coroutine,
+        name=name,
+        description=description,
+        args_schema=args_schema,
+        response_format="content_and_artifact",
+    )
+
+
+def create_gl_tools(
+    engine: DataEngine, cache: ToolResultCache | None = None
+) -> list[StructuredTool]:
     """Create LangChain tools bound to the given DataEngine instance.
 
-    Returns a list of StructuredTool objects ready for LLM tool-binding.
+    Returns a list of StructuredTool objects ready for LLM tool-binding,
+    memoizing their results in ``cache`` when one is given.
     """
     return [
-        StructuredTool.from_function(
-            func=lambda account_filter=None, top_n=25: _profile_accounts(engine, account_filter, top_n),
+        _bind_tool(
+            engine,
+            _profile_accounts,
             name="profile_accounts",
             description=(
                 "Profile GL accounts by posting activity, balance behavior, and dimensional usage. "
@@ -527,9 +735,12 @@ def create_gl_tools(engine: DataEngine) -> list[StructuredTool]:
                 "Use this first to understand the current chart of accounts."
             ),
             args_schema=ProfileAccountsInput,
+            tables=POSTINGS_TABLES,
+            cache=cache,
         ),
-        StructuredTool.from_function(
-            func=lambda min_occurrences=3, include_details=False: _detect_mje(engine, min_occurrences, include_details),
+        _bind_tool(
+            engine,
+            _detect_mje,
             name="detect_mje",
             description=(
                 "Detect manual journal entry (MJE) patterns in the GL posting data. "
@@ -538,11 +749,12 @@ def create_gl_tools(engine: DataEngine) -> list[StructuredTool]:
                 "Use this to find automation opportunities and COA design improvements."
             ),
             args_schema=DetectMJEInput,
+            tables=POSTINGS_TABLES,
+            cache=cache,
         ),
-        StructuredTool.from_function(
-            func=lambda fiscal_period=None, account_type_filter=None: _compute_trial_balance(
-                engine, fiscal_period, account_type_filter
-            ),
+        _bind_tool(
+            engine,
+            _compute_trial_balance,
             name="compute_trial_balance",
             description=(
                 "Retrieve the trial balance with opening/closing balances, period debits/credits. "
@@ -550,11 +762,12 @@ def create_gl_tools(engine: DataEngine) -> list[StructuredTool]:
                 "Returns both detail rows and summary by account type."
             ),
             args_schema=TrialBalanceInput,
+            tables=TRIAL_BALANCE_TABLES,
+            cache=cache,
         ),
-        StructuredTool.from_function(
-            func=lambda period_from=1, period_to=12, by_lob=False: _generate_income_statement(
-                engine, period_from, period_to, by_lob
-            ),
+        _bind_tool(
+            engine,
+            _generate_income_statement,
             name="generate_income_statement",
             description=(
                 "Generate a GAAP-style income statement from GL posting data. "
@@ -563,9 +776,12 @@ def create_gl_tools(engine: DataEngine) -> list[StructuredTool]:
                 "total expenses, net income, and line-item detail."
             ),
             args_schema=IncomeStatementInput,
+            tables=POSTINGS_TABLES,
+            cache=cache,
         ),
-        StructuredTool.from_function(
-            func=lambda dimensions=None: _assess_dimensions(engine, dimensions),
+        _bind_tool(
+            engine,
+            _assess_dimensions,
             name="assess_dimensions",
             description=(
                 "Analyze the quality and usage of dimensional fields (profit center, "
@@ -575,5 +791,7 @@ def create_gl_tools(engine: DataEngine) -> list[StructuredTool]:
                 "gaps and inform code block design decisions."
             ),
             args_schema=AssessDimensionsInput,
+            tables=POSTINGS_TABLES,
+            cache=cache,
         ),
     ]
@@ -0,0 +1,246 @@
+"""Memoized GL tool results.
+
+The agent often repeats a tool call verbatim, within a conversation and
+across sessions. ``ToolResultCache`` keys each result by tool name, canonical
+arguments (defaults applied, keys sorted) and the data the tool reads:
+
+* in memory, by the engine's data versions of those tables
+  (``DataEngine.read_versions``), in an LRU of ``max_entries`` results;
+* on disk, when a ``directory`` is given, by the durable data stamp of each
+  table (``DataEngine.data_stamp``), since data versions restart with the
+  process, and by a fingerprint of the tool's code (``code_fingerprint``),
+  so a changed tool or query never serves results of its old version.
+
+A call whose data cannot be pinned down — a write in flight, or an agent
+turn whose snapshot predates the current data — runs uncached and reports
+``bypass``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+from fta_agent import __version__
+from fta_agent.config import get_settings
+from fta_agent.data.engine import DataEngine
+
+logger = logging.getLogger(__name__)
+
+CacheStatus = Literal["hit", "miss", "bypass"]
+
+# Bump when the on-disk entry layout changes.
+_FORMAT = 1
+
+
+@dataclass
+class ToolCacheStats:
+    """Counters for a ToolResultCache."""
+
+    hits: int
+    misses: int
+    bypasses: int
+    entries: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def canonical_args(impl: Callable[..., str], kwargs: Mapping[str, Any]) -> str:
+    """Tool arguments as stable JSON: defaults filled in, keys sorted.
+
+    ``impl`` takes the engine first; it is left out of the key.
+    """
+    bound = inspect.signature(impl).bind(None, **kwargs)
+    bound.apply_defaults()
+    args = dict(list(bound.arguments.items())[1:])
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def code_fingerprint(*objects: Any) -> str:
+    """Hash of the source of the modules defining ``objects``.
+
+    Whole modules rather than single functions, so the helpers and SQL a tool
+    shares with its neighbours are covered too.
+    """
+    digest = hashlib.sha256()
+    for name in sorted({obj.__module__ for obj in objects}):
+        digest.update(inspect.getsource(sys.modules[name]).encode())
+    return digest.hexdigest()
+
+
+class ToolResultCache:
+    """Thread-safe LRU of tool results, optionally persisted to ``directory``."""
+
+    def __init__(self, max_entries: int = 256, directory: Path | None = None) -> None:
+        if max_entries < 1:
+            msg = f"Tool cache size must be >= 1, got {max_entries}"
+            raise ValueError(msg)
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: OrderedDict[tuple[Any, ...], str] = OrderedDict()
+        # Per-engine token: versions are per engine and restart at 0.
+        self._tokens: weakref.WeakKeyDictionary[DataEngine, str] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._hits = 0
+        self._misses = 0
+        self._bypasses = 0
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        engine: DataEngine,
+        tool: str,
+        tables: Sequence[str],
+        args: str,
+        compute: Callable[[], str],
+        code: str = "",
+    ) -> tuple[str, CacheStatus]:
+        """Return the cached result of ``tool(args)`` or ``compute()`` it.
+
+        ``tables`` are the tables the tool reads, ``args`` its canonical
+        arguments (see ``canonical_args``) and ``code`` a fingerprint of its
+        implementation (see ``code_fingerprint``). Exceptions from ``compute``
+        propagate and nothing is stored.
+        """
+        versions = engine.read_versions(tables)
+        if versions is None:
+            self._count("bypass")
+            return compute(), "bypass"
+        key = (self._token(engine), tool, code, args, versions)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return result, "hit"
+
+        path = self._path(engine, tool, code, tables, args, versions)
+        if path is not None and (result := self._read(path)) is not None:
+            self._remember(key, result)
+            self._count("hit")
+            return result, "hit"
+
+        result = compute()
+        self._count("miss")
+        if engine.read_versions(tables) == versions:
+            self._remember(key, result)
+            if path is not None:
+                self._write(path, tool, args, result)
+        return result, "miss"
+
+    def stats(self) -> ToolCacheStats:
+        with self._lock:
+            return ToolCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                bypasses=self._bypasses,
+                entries=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """Drop the in-memory entries; files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, status: CacheStatus) -> None:
+        with self._lock:
+            if status == "hit":
+                self._hits += 1
+            elif status == "miss":
+                self._misses += 1
+            else:
+                self._bypasses += 1
+
+    def _token(self, engine: DataEngine) -> str:
+        with self._lock:
+            token = self._tokens.get(engine)
+            if token is None:
+                token = self._tokens[engine] = uuid.uuid4().hex
+            return token
+
+    def _remember(self, key: tuple[Any, ...], result: str) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # -- persistence -------------------------------------------------------
+
+    def _path(
+        self,
+        engine: DataEngine,
+        tool: str,
+        code: str,
+        tables: Sequence[str],
+        args: str,
+        versions: tuple[int, ...],
+    ) -> Path | None:
+        """Where the entry for this call lives on disk, if persisting."""
+        if self.directory is None:
+            return None
+        stamps = []
+        for table in tables:
+            stamp = engine.data_stamp(table)
+            if stamp is None:
+                return None
+            stamps.append(stamp)
+        if engine.read_versions(tables) != versions:
+            return None
+        key = json.dumps([_FORMAT, __version__, tool, code, args, stamps])
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / tool / f"{digest}.json"
+
+    @staticmethod
+    def _read(path: Path) -> str | None:
+        try:
+            return str(json.loads(path.read_text())["result"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def _write(path: Path, tool: str, args: str, result: str) -> None:
+        """Publish an entry with one rename, so readers never see it partial."""
+        tmp = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:12]}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"tool": tool, "args": args, "result": result}))
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning(
+                "Could not persist %s result to %s", tool, path, exc_info=True
+            )
+            tmp.unlink(missing_ok=True)
+
+
+_default: ToolResultCache | None = None
+_default_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolResultCache | None:
+    """The process-wide cache configured by ``Settings``, or None when disabled."""
+    global _default
+    settings = get_settings()
+    if settings.tool_cache_entries <= 0:
+        return None
+    with _default_lock:
+        if _default is None:
+            directory = settings.tool_cache_dir
+            _default = ToolResultCache(
+                settings.tool_cache_entries, Path(directory) if directory else None
+            )
+        return _default
@@ -0,0 +1,181 @@
+"""Tests for the postings aggregate cube and the tools that read it."""
+
+import json
+
+import polars as pl
+import pytest
+
+from fta_agent.data.cube import CUBE_TABLE, current_cube, ensure_cube, refresh_cube
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.loader import ingest_upload, load_fixture
+from fta_agent.tools import gl_analysis
+from fta_agent.tools.gl_analysis import _generate_income_statement, _profile_accounts
+
+
+@pytest.fixture(scope="module")
+def engine():
+    eng = DataEngine()
+    load_fixture(eng)
+    yield eng
+    eng.close()
+
+
+def _without_cube(monkeypatch, fn, *args):
+    with monkeypatch.context() as m:
+        m.setattr(gl_analysis, "current_cube", lambda engine: None)
+        return json.loads(fn(*args))
+
+
+def _assert_same(cube_rows, raw_rows):
+    assert len(cube_rows) == len(raw_rows)
+    for got, want in zip(cube_rows, raw_rows, strict=True):
+        assert got.keys() == want.keys()
+        for key, value in want.items():
+            if isinstance(value, float):
+                assert got[key] == pytest.approx(value, rel=1e-9, abs=0.011)
+            else:
+                assert got[key] == value, key
+
+
+class TestCube:
+    def test_built_with_fixtures(self, engine):
+        assert current_cube(engine) == CUBE_TABLE
+        cells = engine.query_polars(f"SELECT SUM(line_count) AS n FROM {CUBE_TABLE}")
+        lines = engine.query_polars("SELECT COUNT(*) AS n FROM postings")
+        assert cells["n"].item() == lines["n"].item()
+
+    @pytest.mark.parametrize(
+        "account_filter", [None, "p.gl_account LIKE '4%'", "lob = 'AUTO'"]
+    )
+    def test_profile_matches_postings(self, engine, monkeypatch, account_filter):
+        got = json.loads(_profile_accounts(engine, account_filter, top_n=2500))
+        want = _without_cube(
+            monkeypatch, _profile_accounts, engine, account_filter, 2500
+        )
+        key = lambda a: a["gl_account"]  # noqa: E731
+        _assert_same(
+            sorted(got["accounts"], key=key), sorted(want["accounts"], key=key)
+        )
+
+    @pytest.mark.parametrize("by_lob", [False, True])
+    def test_income_statement_matches_postings(self, engine, monkeypatch, by_lob):
+        got = json.loads(_generate_income_statement(engine, 3, 5, by_lob))
+        want = _without_cube(
+            monkeypatch, _generate_income_statement, engine, 3, 5, by_lob
+        )
+        assert got["net_income"] == pytest.approx(want["net_income"], abs=0.011)
+        _assert_same(got["by_category"], want["by_category"])
+        key = lambda r: (r["gl_account"], r.get("lob") or "")  # noqa: E731
+        _assert_same(
+            sorted(got["line_items"], key=key), sorted(want["line_items"], key=key)
+        )
+
+    def test_filter_outside_cube_scans_postings(self, engine, monkeypatch):
+        seen: list[str] = []
+        query = engine.query_polars
+        monkeypatch.setattr(
+            engine, "query_polars", lambda sql, *a, **k: seen.append(sql) or query(sql)
+        )
+        _profile_accounts(engine, "p.gl_account LIKE '4%'")
+        _profile_accounts(engine, "amount > 1000")
+        assert ["postings_cube" in sql for sql in seen] == [True, False]
+
+    def test_stale_cube_is_not_used(self, tmp_path):
+        eng = DataEngine()
+        ingest_upload(eng, _gl_csv(tmp_path / "gl.csv"))
+        assert current_cube(eng) == CUBE_TABLE
+
+        # A write that bypasses ingest leaves the cube behind: tools scan.
+        partial = pl.DataFrame({"gl_account": ["1"], "amount": [1.0]})
+        eng.load_polars(partial, "postings")
+        assert current_cube(eng) is None
+        assert not refresh_cube(eng)
+        assert CUBE_TABLE not in eng.tables()
+        eng.close()
+
+    def test_warm_restart_keeps_the_cube(self, tmp_path):
+        db = str(tmp_path / "gl.duckdb")
+        eng = DataEngine(db)
+        ingest_upload(eng, _gl_csv(tmp_path / "gl.csv"))
+        eng.close()
+
+        # A new process on the same database: the cube still matches.
+        eng = DataEngine(db)
+        assert current_cube(eng) == CUBE_TABLE
+        assert not ensure_cube(eng)
+        eng.execute("DELETE FROM postings WHERE fiscal_period = 2")
+        eng.close()
+
+        eng = DataEngine(db)
+        assert current_cube(eng) is None
+        assert ensure_cube(eng)
+        eng.close()
+
+
+    def test_snapshot_older_than_the_cube_scans_postings(self):
+        eng = DataEngine()
+        eng.load_polars(_accounts(), "account_master")
+        eng.load_polars(_revenue(1), "postings")
+        assert refresh_cube(eng)
+        eng.load_polars(_revenue(5), "postings")
+        with eng.snapshot():
+            # The rebuilt cube is newer than the snapshot; the old one is stale.
+            assert refresh_cube(eng)
+            assert eng.query_polars("SELECT COUNT(*) FROM postings").item() == 5
+            assert current_cube(eng) is None
+            profile = json.loads(_profile_accounts(eng))
+            assert profile["total_postings"] == 5
+            statement = json.loads(_generate_income_statement(eng))
+            assert statement["total_revenue"] == 50.0
+        assert current_cube(eng) == CUBE_TABLE
+        eng.close()
+
+    def test_income_statement_falls_back_when_the_cube_does_not_bind(
+        self, monkeypatch
+    ):
+        eng = DataEngine()
+        eng.load_polars(_accounts(), "account_master")
+        eng.load_polars(_revenue(2), "postings")
+        assert CUBE_TABLE not in eng.tables()
+        monkeypatch.setattr(gl_analysis, "current_cube", lambda engine: CUBE_TABLE)
+        statement = json.loads(_generate_income_statement(eng))
+        assert statement["total_revenue"] == 20.0
+        eng.close()
+
+
+def _accounts():
+    return pl.DataFrame({
+        "gl_account": ["400100"],
+        "description": ["Premium income"],
+        "account_type": ["R"],
+        "account_group": ["REV"],
+        "statutory_category": ["Revenue"],
+        "is_active": [True],
+    })
+
+
+def _revenue(lines):
+    """``lines`` credit postings of 10.0 to one revenue account."""
+    return pl.DataFrame({
+        "gl_account": ["400100"] * lines,
+        "fiscal_period": [1] * lines,
+        "document_category": ["STD"] * lines,
+        "debit_credit": ["C"] * lines,
+        "lob": ["AUTO"] * lines,
+        "amount": [10.0] * lines,
+        "posting_date": ["2025-01-31"] * lines,
+        "profit_center": ["PC1"] * lines,
+        "cost_center": ["CC1"] * lines,
+        "functional_area": ["CLM"] * lines,
+        "state": ["CA"] * lines,
+    })
+
+
+def _gl_csv(path):
+    path.write_text(
+        "gl_account,fiscal_period,document_category,debit_credit,lob,amount,"
+        "posting_date,profit_center,cost_center,functional_area,state\n"
+        "400100,1,MJE,C,AUTO,-5.0,2025-01-31,PC1,CC1,CLM,CA\n"
+        "400100,2,STD,D,AUTO,2.0,2025-02-28,PC2,,CLM,NY\n"
+    )
+    return path
@@ -1,8 +1,16 @@
 """Tests for DuckDB + Polars data engine."""
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
 import polars as pl
+import pytest
 
-from fta_agent.data.engine import DataEngine
+from fta_agent.data.engine import DataEngine, QueryTimeoutError
+from fta_agent.data.query_log import query_tag
 
 
 class TestDataEngine:
@@ -40,3 +48,732 @@ class TestDataEngine:
         assert "isolated" not in engine2.tables()
         engine1.close()
         engine2.close()
+
+
+class TestCursorPool:
+    def test_queries_see_tables_created_via_execute(self):
+        engine = DataEngine(pool_size=2)
+        engine.execute("CREATE TABLE shared (id INTEGER)")
+        engine.execute("INSERT INTO shared VALUES (1), (2), (3)")
+        assert engine.query_polars("SELECT COUNT(*) AS n FROM shared")["n"][0] == 3
+        engine.close()
+
+    def test_execute_supports_chaining(self):
+        engine = DataEngine()
+        row = engine.execute("SELECT 42").fetchone()
+        assert row == (42,)
+        engine.close()
+
+    def test_execute_draws_from_the_pool(self):
+        engine = DataEngine(pool_size=2)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            rows = list(pool.map(
+                lambda i: engine.execute("SELECT ?", [i]).fetchall(), range(12)
+            ))
+        assert rows == [[(i,)] for i in range(12)]
+        stats = engine.pool_stats()
+        assert stats.created <= 2
+        assert stats.in_use == 0
+        engine.close()
+
+    def test_concurrent_queries_respect_pool_bound(self):
+        engine = DataEngine(pool_size=2)
+        engine.execute("CREATE TABLE nums AS SELECT range AS n FROM range(100000)")
+
+        def run(_: int) -> int:
+            return int(engine.query_polars("SELECT SUM(n) AS s FROM nums")["s"][0])
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(run, range(24)))
+
+        assert set(results) == {sum(range(100000))}
+        stats = engine.pool_stats()
+        assert stats.created <= 2
+        assert stats.peak_in_use <= 2
+        assert stats.in_use == 0
+        assert stats.acquisitions >= 24
+        engine.close()
+
+    def test_pool_stats_report_waits(self):
+        engine = DataEngine(pool_size=1)
+        release = threading.Event()
+
+        def hold() -> None:
+            with engine.cursor():
+                release.wait(timeout=5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        while engine.pool_stats().in_use == 0:
+            time.sleep(0.001)
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+        engine.query_polars("SELECT 1")
+        holder.join()
+
+        stats = engine.pool_stats()
+        assert stats.waits == 1
+        assert stats.max_wait_ms > 0
+        assert stats.to_dict()["utilisation"] == 0.0
+        engine.close()
+
+    def test_invalid_pool_size(self):
+        with pytest.raises(ValueError):
+            DataEngine(pool_size=0)
+
+
+class TestAsyncAPI:
+    async def test_aquery_polars(self):
+        engine = DataEngine()
+        await engine.aexecute("CREATE TABLE t AS SELECT range AS n FROM range(10)")
+        df = await engine.aquery_polars("SELECT SUM(n) AS s FROM t")
+        assert df["s"][0] == 45
+        engine.close()
+
+    async def test_aexecute_returns_rows(self):
+        engine = DataEngine()
+        await engine.aexecute("CREATE TABLE t (id INTEGER)")
+        assert await engine.aexecute("INSERT INTO t VALUES (?)", [7]) == [(1,)]
+        assert await engine.aexecute("SELECT id FROM t") == [(7,)]
+        engine.close()
+
+    async def test_aload_polars_and_atables(self):
+        engine = DataEngine()
+        await engine.aload_polars(pl.DataFrame({"x": [1, 2]}), "loaded")
+        assert "loaded" in await engine.atables()
+        engine.close()
+
+    async def test_scan_does_not_block_event_loop(self):
+        engine = DataEngine()
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await engine.aquery_polars(
+            "SELECT COUNT(DISTINCT a.range * b.range) AS n "
+            "FROM range(3000) a, range(1000) b"
+        )
+        task.cancel()
+        assert ticks > 1
+        engine.close()
+
+
+class TestQueryBatch:
+    _SLOW = (
+        "SELECT COUNT(DISTINCT a.range * b.range + {i}) AS n "
+        "FROM range(2000) a, range(1000) b"
+    )
+
+    def test_runs_queries_side_by_side(self):
+        engine = DataEngine(pool_size=3)
+        queries = {f"q{i}": self._SLOW.format(i=i) for i in range(3)}
+        with query_tag("batch"):
+            frames = engine.query_batch(queries)
+        assert list(frames) == ["q0", "q1", "q2"]
+        assert all(df["n"].item() > 0 for df in frames.values())
+        assert engine.pool_stats().peak_in_use >= 2
+        assert [r.tag for r in engine.query_log.recent()] == ["batch"] * 3
+        engine.close()
+
+    def test_reads_inside_snapshot_share_it(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        with engine.snapshot():
+            engine.load_polars(pl.DataFrame({"x": [1, 2, 3]}), "t")
+            frames = engine.query_batch(
+                {"n": "SELECT COUNT(*) FROM t", "s": "SELECT SUM(x) FROM t"}
+            )
+        assert (frames["n"].item(), frames["s"].item()) == (2, 3)
+        engine.close()
+
+    def test_snapshot_batch_spreads_over_matching_cursors(self):
+        engine = DataEngine(pool_size=3)
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        engine.load_polars(pl.DataFrame({"x": [1]}), "u")
+        queries = {f"q{i}": self._SLOW.format(i=i) for i in range(3)}
+        queries["n"] = "SELECT COUNT(*) FROM t"
+        with engine.snapshot():
+            # u is not read by the batch, so pooled cursors still qualify.
+            engine.load_polars(pl.DataFrame({"x": [1, 2]}), "u")
+            frames = engine.query_batch(queries)
+        assert frames["n"].item() == 2
+        assert engine.pool_stats().peak_in_use >= 3
+        assert engine.pool_stats().in_use == 0
+        engine.close()
+
+    def test_failure_raised_after_batch_finishes(self):
+        engine = DataEngine()
+        with pytest.raises(duckdb.CatalogException):
+            engine.query_batch(
+                {"bad": "SELECT * FROM missing", "slow": self._SLOW.format(i=0)}
+            )
+        assert engine.pool_stats().in_use == 0
+        with pytest.raises(ValueError, match="reads only"):
+            engine.query_batch({"w": "CREATE TABLE t (x INTEGER)"})
+        engine.close()
+
+    async def test_aquery_batch_with_single_cursor(self):
+        engine = DataEngine(pool_size=1)
+        frames = await engine.aquery_batch({"a": "SELECT 1 AS v", "b": "SELECT 2 AS v"})
+        assert [df["v"].item() for df in frames.values()] == [1, 2]
+        engine.close()
+
+
+class TestLoadModes:
+    def test_view_mode_is_visible_to_all_cursors(self):
+        engine = DataEngine(pool_size=3)
+        engine.load_polars(pl.DataFrame({"x": [1, 2, 3]}), "frame", mode="view")
+
+        def total(_: int) -> int:
+            return int(engine.query_polars("SELECT SUM(x) AS s FROM frame")["s"][0])
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            assert set(pool.map(total, range(9))) == {6}
+        assert engine.execute("SELECT COUNT(*) FROM frame").fetchone() == (3,)
+        assert "frame" in engine.tables()
+        engine.close()
+
+    def test_view_replaces_table_and_back(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1]}), "t")
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t", mode="view")
+        assert len(engine.query_polars("SELECT * FROM t")) == 2
+        engine.load_polars(pl.DataFrame({"x": [1, 2, 3]}), "t")
+        assert len(engine.query_polars("SELECT * FROM t")) == 3
+        assert engine.tables().count("t") == 1
+        engine.close()
+
+    def test_append_mode_inserts_by_name(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1], "y": ["a"]}), "t", mode="append")
+        engine.load_polars(pl.DataFrame({"y": ["b"], "x": [2]}), "t", mode="append")
+        df = engine.query_polars("SELECT * FROM t ORDER BY x")
+        assert df["y"].to_list() == ["a", "b"]
+        engine.close()
+
+    def test_load_parquet_modes(self, tmp_path):
+        path = tmp_path / "data.parquet"
+        pl.DataFrame({"x": [1, 2]}).write_parquet(path)
+        engine = DataEngine()
+        engine.load_parquet(path, "pq_view", mode="view")
+        engine.load_parquet(path, "pq_table")
+        engine.load_parquet(path, "pq_table", mode="append")
+        assert engine.query_polars("SELECT COUNT(*) AS n FROM pq_view")["n"][0] == 2
+        assert engine.query_polars("SELECT COUNT(*) AS n FROM pq_table")["n"][0] == 4
+        engine.load_parquet(path, "pq_view")
+        assert engine.query_polars("SELECT COUNT(*) AS n FROM pq_view")["n"][0] == 2
+        engine.close()
+
+
+    def test_partitioned_dataset_round_trip(self, tmp_path):
+        df = pl.DataFrame({
+            "company_code": ["0100", "0100", "0200"],
+            "fiscal_period": [1, 2, 2],
+            "amount": [1.0, 2.0, 3.0],
+        })
+        engine = DataEngine()
+        engine.load_polars(df, "t")
+        path = engine.export_parquet(
+            "t", tmp_path / "t", ["fiscal_period", "company_code"]
+        )
+        assert (path / "fiscal_period=2" / "company_code=0200").is_dir()
+
+        types = {"company_code": "VARCHAR", "fiscal_period": "BIGINT"}
+        engine.load_parquet(path, "v", mode="view", types=types)
+        back = engine.query_polars("SELECT * FROM v ORDER BY amount")
+        assert back.columns == df.columns
+        assert back["company_code"].to_list() == ["0100", "0100", "0200"]
+        plan = engine.execute(
+            "EXPLAIN ANALYZE SELECT SUM(amount) FROM v WHERE fiscal_period = 1"
+        ).fetchall()[0][1]
+        assert "Total Files Read: 1" in plan
+
+        # Re-exporting swaps the whole tree: no stale partitions survive.
+        engine.execute("DELETE FROM t WHERE fiscal_period = 2")
+        engine.export_parquet("t", path, ["fiscal_period", "company_code"])
+        assert not (path / "fiscal_period=2").exists()
+        assert engine.query_polars("SELECT COUNT(*) FROM v").item() == 1
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".")]
+        engine.close()
+
+
+    def test_dataset_merge_waits_for_open_snapshots(self, tmp_path):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"k": [1, 2], "p": [1, 1], "v": [1, 2]}), "t")
+        path = engine.export_parquet("t", tmp_path / "t", ["p"])
+        engine.load_parquet(path, "t", mode="view")
+        engine.load_polars(pl.DataFrame({"k": [2], "p": [1], "v": [20]}), "src")
+
+        def merge():
+            return engine.merge_dataset("t", path, "src", ["k"], ["p"])
+
+        with ThreadPoolExecutor(1) as pool:
+            with engine.snapshot():
+                with pytest.raises(RuntimeError, match="inside a snapshot"):
+                    merge()
+                merged = pool.submit(merge)
+                time.sleep(0.3)
+                assert not merged.done()
+                df = engine.query_polars("SELECT k, v FROM t ORDER BY k")
+                assert df.rows() == [(1, 1), (2, 2)]
+            assert merged.result(timeout=30).updated == 1
+        df = engine.query_polars("SELECT k, v FROM t ORDER BY k")
+        assert df.rows() == [(1, 1), (2, 20)]
+        engine.close()
+    def test_cluster_keys_order_every_write(self, tmp_path):
+        engine = DataEngine(cluster_keys={"t": ["acct", "period"]})
+        df = pl.DataFrame(
+            {"period": [2, 1, 1], "acct": ["B", "B", "A"], "k": [1, 2, 3]}
+        )
+        engine.load_polars(df, "t")
+        assert engine.query_polars("SELECT k FROM t")["k"].to_list() == [3, 2, 1]
+
+        # Appends and merges insert their rows in key order too.
+        engine.load_polars(df.with_columns(pl.col("k") + 10), "t", mode="append")
+        assert engine.query_polars("SELECT k FROM t")["k"].to_list()[3:] == [
+            13, 12, 11,
+        ]
+        engine.load_polars(df.with_columns(pl.col("k") + 20), "s")
+        engine.merge_table("t", "s", ["k"], mode="append")
+        assert engine.query_polars("SELECT k FROM t")["k"].to_list()[6:] == [
+            23, 22, 21,
+        ]
+
+        # A source missing a key column is clustered on the keys it has.
+        engine.load_polars(df.drop("acct"), "t")
+        assert engine.query_polars("SELECT period FROM t")["period"].to_list() == [
+            1, 1, 2,
+        ]
+        engine.close()
+
+    def test_load_csv_with_types(self, tmp_path):
+        path = tmp_path / "t.csv"
+        path.write_text("id,code\n1,007\n2,010\n")
+        engine = DataEngine()
+        engine.load_csv(path, "t", types={"code": "VARCHAR", "missing": "INTEGER"})
+        assert engine.query_polars("SELECT code FROM t ORDER BY id")[
+            "code"
+        ].to_list() == ["007", "010"]
+        engine.load_csv(path, "t", mode="append")
+        assert engine.query_polars("SELECT COUNT(*) FROM t").item() == 4
+        engine.close()
+
+
+class TestResultCache:
+    def _engine(self, max_bytes: int = 1 << 20) -> DataEngine:
+        engine = DataEngine(result_cache_bytes=max_bytes)
+        engine.load_polars(pl.DataFrame({"x": [1, 2, 3]}), "t")
+        return engine
+
+    def test_disabled_by_default(self):
+        engine = DataEngine()
+        assert engine.cache_stats() is None
+        engine.close()
+
+    def test_hit_ignores_formatting(self):
+        engine = self._engine()
+        first = engine.query_polars("SELECT SUM(x) AS s FROM t")
+        second = engine.query_polars("SELECT SUM(x) AS s\n    FROM t;")
+        assert first is second
+        stats = engine.cache_stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+        engine.close()
+
+    def test_load_invalidates(self):
+        engine = self._engine()
+        assert engine.query_polars("SELECT SUM(x) AS s FROM t")["s"][0] == 6
+        engine.load_polars(pl.DataFrame({"x": [10]}), "t")
+        assert engine.query_polars("SELECT SUM(x) AS s FROM t")["s"][0] == 10
+        engine.close()
+
+    def test_update_invalidates_only_touched_table(self):
+        engine = self._engine()
+        engine.load_polars(pl.DataFrame({"y": [1]}), "other")
+        engine.query_polars("SELECT SUM(x) AS s FROM t")
+        engine.query_polars("SELECT SUM(y) AS s FROM other")
+        version = engine.data_version("t")
+        engine.execute("UPDATE t SET x = x * 2")
+        assert engine.data_version("t") > version
+        assert engine.query_polars("SELECT SUM(x) AS s FROM t")["s"][0] == 12
+        engine.query_polars("SELECT SUM(y) AS s FROM other")
+        assert engine.cache_stats().hits == 1
+        engine.close()
+
+    async def test_aexecute_invalidates(self):
+        engine = self._engine()
+        engine.query_polars("SELECT COUNT(*) AS n FROM t")
+        await engine.aexecute("INSERT INTO t VALUES (4)")
+        assert engine.query_polars("SELECT COUNT(*) AS n FROM t")["n"][0] == 4
+        engine.close()
+
+    def test_lru_eviction_by_bytes(self):
+        engine = self._engine(max_bytes=64)
+        engine.query_polars("SELECT x FROM t")
+        engine.query_polars("SELECT x + 1 AS x FROM t")
+        engine.query_polars("SELECT x + 2 AS x FROM t")
+        stats = engine.cache_stats()
+        assert stats.bytes_used <= 64
+        assert stats.evictions >= 1
+        engine.close()
+
+    def test_cache_opt_out_per_call(self):
+        engine = self._engine()
+        engine.query_polars("SELECT 1", cache=False)
+        assert engine.cache_stats().misses == 0
+        engine.close()
+
+
+SLOW_SQL = (
+    "SELECT COUNT(DISTINCT a.range * b.range) AS n "
+    "FROM range(30000) a, range(30000) b"
+)
+
+
+class TestResourceGovernance:
+    def test_settings_applied(self, tmp_path):
+        engine = DataEngine(
+            memory_limit="512MB", threads=2, temp_directory=str(tmp_path / "spill")
+        )
+        row = engine.execute(
+            "SELECT current_setting('threads'), current_setting('temp_directory')"
+        ).fetchone()
+        assert row[0] == 2
+        assert row[1].endswith("spill")
+        assert (tmp_path / "spill").is_dir()
+        engine.close()
+
+    def test_from_settings(self):
+        from fta_agent.config import Settings
+
+        settings = Settings(duckdb_threads=3, duckdb_query_timeout_s=5)
+        engine = DataEngine.from_settings(settings)
+        assert engine.execute("SELECT current_setting('threads')").fetchone() == (3,)
+        assert engine.query_timeout_s == 5
+        engine.close()
+
+    def test_query_timeout_interrupts(self):
+        engine = DataEngine()
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeoutError) as exc:
+            engine.query_polars(SLOW_SQL, timeout=0.2)
+        assert time.perf_counter() - start < 5
+        assert exc.value.timeout_s == 0.2
+        # Cursor is reusable after the interrupt
+        assert engine.query_polars("SELECT 1 AS x")["x"][0] == 1
+        engine.close()
+
+    async def test_default_timeout_applies_to_async(self):
+        engine = DataEngine(query_timeout_s=0.2)
+        with pytest.raises(QueryTimeoutError):
+            await engine.aquery_polars(SLOW_SQL)
+        with pytest.raises(QueryTimeoutError):
+            await engine.aexecute(SLOW_SQL)
+        engine.close()
+
+
+class TestQueryLog:
+    def test_records_rows_bytes_and_tag(self):
+        engine = DataEngine()
+        engine.execute("CREATE TABLE t AS SELECT range AS x FROM range(10)")
+        engine.query_polars("SELECT * FROM t", tag="unit")
+        rec = engine.query_log.recent()[-1]
+        assert rec.tag == "unit"
+        assert rec.rows == 10
+        assert rec.bytes and rec.bytes > 0
+        assert rec.wall_ms >= 0
+        engine.close()
+
+    def test_query_tag_context(self):
+        engine = DataEngine()
+        with query_tag("profile_accounts"):
+            engine.query_polars("SELECT 1")
+        engine.query_polars("SELECT 2")
+        tags = [r.tag for r in engine.query_log.recent()]
+        assert tags[-2:] == ["profile_accounts", None]
+        summary = {row["tag"]: row for row in engine.query_log.summary()}
+        assert summary["profile_accounts"]["queries"] == 1
+        engine.close()
+
+    def test_slow_queries_capture_explain(self):
+        engine = DataEngine(slow_query_ms=0, explain_slow=True)
+        engine.query_polars("SELECT SUM(range) FROM range(1000)")
+        slow = engine.query_log.slow()
+        assert slow
+        assert slow[-1].explain and "Total Time" in slow[-1].explain
+        engine.close()
+
+    def test_errors_and_cache_hits_recorded(self):
+        engine = DataEngine(result_cache_bytes=1 << 20)
+        with pytest.raises(duckdb.Error):
+            engine.query_polars("SELECT * FROM missing_table")
+        assert "CatalogException" in engine.query_log.recent()[-1].error
+        engine.query_polars("SELECT 1")
+        engine.query_polars("SELECT 1")
+        assert engine.query_log.recent()[-1].cached
+        engine.close()
+
+    def test_ring_buffer_bounded(self):
+        engine = DataEngine(query_log_size=5)
+        for i in range(20):
+            engine.query_polars(f"SELECT {i}")
+        assert len(engine.query_log.recent()) == 5
+        engine.close()
+
+
+class TestAttach:
+    def test_attached_tables_join_with_main(self, tmp_path):
+        side = duckdb.connect(str(tmp_path / "outcomes.duckdb"))
+        side.execute("CREATE TABLE mappings AS SELECT 1 AS id, 'tgt' AS target")
+        side.close()
+
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"id": [1, 1, 2]}), "postings")
+        engine.attach(tmp_path / "outcomes.duckdb", "outcomes")
+        assert engine.attached == {"outcomes": str(tmp_path / "outcomes.duckdb")}
+        assert engine.has_table("mappings", "outcomes")
+        assert not engine.has_table("mappings")
+        assert engine.has_table("postings")
+
+        df = engine.query_polars(
+            "SELECT m.target, COUNT(*) AS n FROM postings p "
+            "JOIN outcomes.mappings m USING (id) GROUP BY m.target"
+        )
+        assert df.to_dicts() == [{"target": "tgt", "n": 2}]
+
+        engine.detach("outcomes")
+        assert engine.attached == {}
+        assert not engine.has_table("mappings", "outcomes")
+        engine.close()
+
+
+class TestMergeTable:
+    def _engine(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"k": [1, 2, 3], "v": ["a", "b", "c"]}), "t")
+        return engine
+
+    def test_upsert_classifies_rows(self):
+        engine = self._engine()
+        engine.load_polars(
+            pl.DataFrame({"k": [2, 3, 4, 4], "v": ["b", "X", "d", "d"]}), "s"
+        )
+        result = engine.merge_table("t", "s", ["k"])
+        assert result.to_dict() == {"inserted": 1, "updated": 1, "skipped": 2}
+        df = engine.query_polars("SELECT * FROM t ORDER BY k")
+        assert df.rows() == [(1, "a"), (2, "b"), (3, "X"), (4, "d")]
+        engine.close()
+
+    def test_append_never_updates(self):
+        engine = self._engine()
+        engine.load_polars(pl.DataFrame({"k": [3, 5], "v": ["X", "e"]}), "s")
+        result = engine.merge_table("t", "s", ["k"], mode="append")
+        assert result.to_dict() == {"inserted": 1, "updated": 0, "skipped": 1}
+        assert engine.query_polars("SELECT v FROM t WHERE k = 3").item() == "c"
+        engine.close()
+
+    def test_view_target_is_materialized(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"k": [1], "v": ["a"]}), "t", mode="view")
+        engine.load_polars(pl.DataFrame({"k": [1, 2], "v": ["z", "b"]}), "s")
+        result = engine.merge_table("t", "s", ["k"])
+        assert (result.inserted, result.updated) == (1, 1)
+        assert engine.query_polars("SELECT COUNT(*) FROM t").item() == 2
+        engine.close()
+
+    def test_failed_merge_rolls_back(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"k": [1, 2], "n": [10, 20]}), "t")
+        engine.load_polars(pl.DataFrame({"k": [1, 9], "n": ["11", "oops"]}), "s")
+        with pytest.raises(duckdb.Error):
+            engine.merge_table("t", "s", ["k"])
+        assert engine.query_polars("SELECT SUM(n) FROM t").item() == 30
+        engine.close()
+
+
+class TestAtomicSwap:
+    def test_readers_never_see_missing_table(self):
+        engine = DataEngine(pool_size=4)
+        engine.load_polars(pl.DataFrame({"x": range(1000)}), "t")
+        stop = threading.Event()
+        errors: list[Exception] = []
+
+        def read() -> None:
+            while not stop.is_set():
+                try:
+                    engine.query_polars("SELECT COUNT(*) FROM t", cache=False)
+                except Exception as e:  # pragma: no cover - the failure mode
+                    errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(20):
+            mode = "view" if i % 5 == 4 else "replace"
+            engine.load_polars(pl.DataFrame({"x": range(1000 + i)}), "t", mode=mode)
+        stop.set()
+        reader.join()
+        assert errors == []
+        assert not [n for n in engine.tables() if n.startswith("_fta_swap_")]
+        engine.close()
+
+    def test_failed_swap_keeps_old_table(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        with pytest.raises(duckdb.Error):
+            engine.load_parquet("/nonexistent.parquet", "t")
+        assert engine.query_polars("SELECT COUNT(*) FROM t").item() == 2
+        engine.close()
+
+
+class TestSnapshot:
+    def test_snapshot_keeps_old_data_across_swap(self):
+        engine = DataEngine(result_cache_bytes=1 << 20)
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        sql = "SELECT COUNT(*) AS n FROM t"
+        with engine.snapshot():
+            engine.load_polars(pl.DataFrame({"x": [1, 2, 3]}), "t")
+            assert engine.query_polars(sql).item() == 2
+            with engine.snapshot():
+                assert engine.query_polars(sql).item() == 2
+        assert engine.query_polars(sql).item() == 3
+        # The stale count was stored under t's old version only.
+        assert engine.cache_stats().hits == 1
+        engine.close()
+
+    def test_snapshot_reads_share_the_cache(self):
+        engine = DataEngine(result_cache_bytes=1 << 20)
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        sql = "SELECT COUNT(*) AS n FROM t"
+        assert engine.query_polars(sql).item() == 2
+        with engine.snapshot():
+            assert engine.query_polars(sql).item() == 2
+            assert engine.cache_stats().hits == 1
+        # Pinned while a write to t was in flight: t's version is unknown.
+        with engine._versions.writing(["t"]), engine.snapshot():
+            engine.query_polars(sql)
+        assert engine.cache_stats().hits == 1
+        engine.close()
+
+    def test_failed_query_repins_the_snapshot(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": ["1"]}), "t")
+        with engine.snapshot():
+            engine.load_polars(pl.DataFrame({"x": ["1", "a"]}), "t")
+            # A bind error leaves the transaction as it was.
+            with pytest.raises(duckdb.CatalogException):
+                engine.query_polars("SELECT * FROM missing")
+            assert engine.query_polars("SELECT COUNT(*) FROM t").item() == 1
+            assert not engine.binds("SELECT y FROM t")
+            assert engine.binds("SELECT x FROM t")
+            assert engine.read_versions(["t"]) is None
+            with pytest.raises(duckdb.ConversionException):
+                engine.query_polars("SELECT CAST('a' AS INTEGER)")
+            # An execution error aborts it; the snapshot is pinned again.
+            assert engine.query_polars("SELECT COUNT(*) FROM t").item() == 2
+            assert engine.read_versions(["t"]) == (engine.data_version("t"),)
+        engine.close()
+
+    def test_timeout_leaves_the_snapshot_usable(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        with engine.snapshot():
+            with pytest.raises(QueryTimeoutError):
+                engine.query_polars(SLOW_SQL, timeout=0.2)
+            assert engine.query_polars("SELECT COUNT(*) FROM t").item() == 2
+            frames = engine.query_batch(
+                {"a": "SELECT SUM(x) FROM t", "b": "SELECT MAX(x) FROM t"}
+            )
+            assert [f.item() for f in frames.values()] == [3, 2]
+        engine.close()
+
+    async def test_open_turns_do_not_hold_pool_cursors(self):
+        engine = DataEngine(pool_size=2)
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        started = asyncio.Event()
+        open_turns = 0
+
+        async def turn() -> int:
+            nonlocal open_turns
+            async with engine.asnapshot():
+                open_turns += 1
+                if open_turns == 4:
+                    started.set()
+                await started.wait()
+                df = await engine.aquery_polars("SELECT SUM(x) FROM t")
+                return int(df.item())
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(turn() for _ in range(4))), timeout=10
+        )
+        assert results == [3] * 4
+        assert engine.pool_stats().in_use == 0
+        engine.close()
+
+    def test_read_versions(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1]}), "t")
+        engine.load_polars(pl.DataFrame({"x": [1]}), "u")
+        before = engine.read_versions(["t", "u"])
+        with engine._versions.writing(["t"]):
+            # A write in flight: its outcome is not known yet.
+            assert engine.read_versions(["t"]) is None
+            assert engine.read_versions(["u"]) == before[1:]
+        with engine.snapshot():
+            assert engine.read_versions(["t", "u"]) == engine.read_versions(["t", "u"])
+            engine.execute("INSERT INTO t VALUES (2)")
+            # The snapshot still reads the old t; u is unaffected.
+            assert engine.read_versions(["t"]) is None
+            assert engine.read_versions(["u"]) == before[1:]
+        assert engine.read_versions(["t"]) > before[:1]
+        engine.close()
+
+    def test_data_stamps_survive_restart(self, tmp_path):
+        db = str(tmp_path / "stamps.duckdb")
+        engine = DataEngine(db)
+        engine.load_polars(pl.DataFrame({"x": [1]}), "t")
+        engine.load_polars(pl.DataFrame({"x": [1]}), "u")
+        stamp = engine.data_stamp("t")
+        assert stamp is not None
+        assert engine.data_stamp("T") == stamp
+        assert engine.data_stamp("u") != stamp
+        engine.execute("INSERT INTO u VALUES (2)")
+        with engine._written(["t"]):
+            assert engine.data_stamp("t") is None
+        changed = engine.data_stamp("t")
+        assert changed not in (None, stamp)
+        engine.materialize("m", "SELECT 1 AS x", stamp="named")
+        assert engine.data_stamp("m") == "named"
+        engine.close()
+
+        engine = DataEngine(db)
+        assert engine.data_stamp("t") == changed
+        assert engine.data_stamp("m") == "named"
+        engine.close()
+
+    def test_stamp_read_waiting_for_a_cursor_lets_writers_stamp(self):
+        engine = DataEngine(pool_size=1)
+        engine.load_polars(pl.DataFrame({"x": [1]}), "t")
+        with ThreadPoolExecutor(2) as pool:
+            # A stamped write holds the only cursor; a stamp read waits for it.
+            with engine.cursor() as cursor:
+                read = pool.submit(engine.data_stamp, "t")
+                time.sleep(0.2)
+                put = pool.submit(engine._put_stamp, cursor, "m", "named")
+                put.result(timeout=10)
+            assert read.result(timeout=10) is not None
+        engine.close()
+
+    @pytest.mark.asyncio
+    async def test_asnapshot_spans_executor_calls(self):
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"x": [1, 2]}), "t")
+        async with engine.asnapshot():
+            await engine.aload_polars(pl.DataFrame({"x": [1]}), "t")
+            df = await engine.aquery_polars("SELECT COUNT(*) AS n FROM t")
+            assert df.item() == 2
+        assert (await engine.aquery_polars("SELECT COUNT(*) FROM t")).item() == 1
+        engine.close()
@@ -0,0 +1,31 @@
+"""Tests for the query instrumentation debug endpoint."""
+
+import pytest
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.query_log import query_tag
+
+
+@pytest.mark.asyncio
+async def test_debug_queries_requires_engine(client):
+    resp = await client.get("/api/debug/queries")
+    assert resp.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_debug_queries_reports_tags(app, client):
+    engine = DataEngine(slow_query_ms=0)
+    app.state.engine = engine
+    with query_tag("detect_mje"):
+        engine.query_polars("SELECT SUM(range) AS s FROM range(100)")
+    resp = await client.get("/api/debug/queries", params={"limit": 10})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["by_tag"][0]["tag"] == "detect_mje"
+    assert body["recent"][0]["rows"] == 1
+    assert body["slow"]
+
+    resp = await client.delete("/api/debug/queries")
+    assert resp.status_code == 200
+    assert engine.query_log.recent() == []
+    engine.close()
@@ -0,0 +1,108 @@
+"""Tests for per-engagement engine management."""
+
+import io
+
+import polars as pl
+import pytest
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.manager import DEFAULT_ENGAGEMENT_ID, EngineManager
+
+
+def _file_factory(tmp_path):
+    def factory(engagement_id: str) -> DataEngine:
+        return DataEngine(db_path=str(tmp_path / f"{engagement_id}.duckdb"))
+
+    return factory
+
+
+def _fill(engine: DataEngine, rows: int = 200_000) -> None:
+    engine.load_polars(pl.DataFrame({"x": range(rows)}), "postings")
+
+
+class TestEngineManager:
+    def test_engagements_are_isolated(self, tmp_path):
+        manager = EngineManager(_file_factory(tmp_path))
+        manager.get("client-a").load_polars(pl.DataFrame({"x": [1]}), "postings")
+        manager.get("client-b").load_polars(pl.DataFrame({"x": [2, 3]}), "postings")
+        a = manager.get("client-a").query_polars("SELECT COUNT(*) AS n FROM postings")
+        b = manager.get("client-b").query_polars("SELECT COUNT(*) AS n FROM postings")
+        assert (a.item(), b.item()) == (1, 2)
+        manager.close()
+
+    def test_invalid_engagement_id(self, tmp_path):
+        manager = EngineManager(_file_factory(tmp_path))
+        with pytest.raises(ValueError, match="Invalid engagement id"):
+            manager.get("../etc")
+        manager.close()
+
+    def test_lru_eviction_under_budget(self, tmp_path):
+        manager = EngineManager(_file_factory(tmp_path), memory_budget_bytes=1)
+        _fill(manager.get("old"))
+        _fill(manager.get("new"))
+        assert not manager.is_open("old")
+        assert manager.is_open("new")
+        assert manager.summary()["evictions"] == 1
+
+        # Evicted file-backed engagements reopen with their data intact.
+        df = manager.get("old").query_polars("SELECT COUNT(*) AS n FROM postings")
+        assert df.item() == 200_000
+        manager.close()
+
+    def test_pinned_and_leased_engines_survive(self, tmp_path):
+        manager = EngineManager(_file_factory(tmp_path), memory_budget_bytes=1)
+        manager.pin("hot")
+        _fill(manager.get("hot"))
+        with manager.lease("busy") as busy:
+            _fill(busy)
+            _fill(manager.get("other"))
+            assert manager.is_open("hot")
+            assert manager.is_open("busy")
+        manager.close()
+
+    def test_registered_engine_is_not_closed(self, tmp_path):
+        default = DataEngine()
+        manager = EngineManager(_file_factory(tmp_path))
+        manager.register(DEFAULT_ENGAGEMENT_ID, default)
+        assert manager.get(DEFAULT_ENGAGEMENT_ID) is default
+        manager.close()
+        assert default.query_polars("SELECT 1 AS one").item() == 1
+        default.close()
+
+    def test_stats_report_memory(self, tmp_path):
+        manager = EngineManager(_file_factory(tmp_path))
+        _fill(manager.get("client-a"))
+        stats = {s.engagement_id: s for s in manager.stats()}
+        assert stats["client-a"].memory_bytes > 0
+        assert stats["client-a"].db_path.endswith("client-a.duckdb")
+        assert manager.memory_usage()["client-a"] == stats["client-a"].memory_bytes
+        manager.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_targets_engagement(app, client, tmp_path):
+    default = DataEngine()
+    manager = EngineManager(_file_factory(tmp_path))
+    manager.register(DEFAULT_ENGAGEMENT_ID, default)
+    app.state.engine = default
+    app.state.engines = manager
+
+    csv = io.BytesIO(b"gl_account,amount\n100100,1.5\n")
+    resp = await client.post(
+        "/api/data/upload",
+        params={"engagement_id": "client-a", "wait": True},
+        files={"file": ("gl.csv", csv, "text/csv")},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["engagement_id"] == "client-a"
+    assert "postings" in manager.get("client-a").tables()
+    assert "postings" not in default.tables()
+
+    resp = await client.post(
+        "/api/data/upload",
+        params={"engagement_id": "bad/id"},
+        files={"file": ("gl.csv", io.BytesIO(b"a\n1\n"), "text/csv")},
+    )
+    assert resp.status_code == 400
+    manager.close()
+    default.close()
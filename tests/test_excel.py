@@ -0,0 +1,251 @@
+"""Tests for workbook reading, sheet mapping and the Parquet cache."""
+
+import io
+import zipfile
+
+import polars as pl
+import pytest
+
+from fta_agent.data import excel
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.excel import ExcelOptions, map_sheets, sheet_names
+from fta_agent.data.loader import file_checksum, ingest_upload
+
+SHEETS = {
+    "TB": pl.DataFrame({
+        "company_code": ["1000"],
+        "fiscal_year": [2024],
+        "fiscal_period": [1],
+        "gl_account": ["400100"],
+        "currency": ["USD"],
+        "closing_balance": [12.5],
+    }),
+    "Chart of Accounts": pl.DataFrame({
+        "gl_account": ["400100", "100100"],
+        "account_type": ["R", "A"],
+    }),
+    "Notes": pl.DataFrame({"note": ["ignored"]}),
+}
+
+
+def _workbook(path, names):
+    sheets = "".join(
+        f'<sheet name="{name}" sheetId="{i}"/>' for i, name in enumerate(names, 1)
+    )
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(
+            "xl/workbook.xml",
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+            f'2006/main"><sheets>{sheets}</sheets></workbook>',
+        )
+    return path
+
+
+@pytest.fixture
+def fake_reader(monkeypatch):
+    """Stand in for the Excel engine, recording which sheets were parsed."""
+    calls = []
+
+    def read_sheet(path, sheet, engine, out_path):
+        calls.append((sheet, engine))
+        SHEETS[sheet].write_parquet(out_path)
+        return sheet, len(SHEETS[sheet]), 0.01
+
+    monkeypatch.setattr(excel, "_read_sheet", read_sheet)
+    return calls
+
+
+class TestSheetMapping:
+    def test_sheet_names_without_engine(self, tmp_path):
+        path = _workbook(tmp_path / "tb.xlsx", list(SHEETS))
+        assert sheet_names(path) == list(SHEETS)
+
+    def test_aliases_and_fallback(self):
+        assert map_sheets(list(SHEETS)) == {
+            "TB": "trial_balance",
+            "Chart of Accounts": "account_master",
+        }
+        assert map_sheets(["Sheet1", "Sheet2"], default_table="postings") == {
+            "Sheet1": "postings"
+        }
+
+    def test_explicit_map(self):
+        assert map_sheets(["A", "B"], {"B": "trial_balance"}) == {
+            "B": "trial_balance"
+        }
+        with pytest.raises(ValueError, match="not in workbook: C"):
+            map_sheets(["A"], {"C": "postings"})
+
+
+class TestWorkbookIngest:
+    def test_sheets_load_into_tables_and_cache(self, tmp_path, fake_reader):
+        path = _workbook(tmp_path / "close.xlsx", list(SHEETS))
+        options = ExcelOptions(cache_dir=tmp_path / "cache", workers=1)
+        engine = DataEngine()
+        result = ingest_upload(engine, path, excel=options)
+        # "Notes" maps to no table, so it is never parsed.
+        assert sorted(sheet for sheet, _ in fake_reader) == [
+            "Chart of Accounts",
+            "TB",
+        ]
+        assert {f.name: f.table for f in result.files} == {
+            "TB": "trial_balance",
+            "Chart of Accounts": "account_master",
+        }
+        assert result.rows == 3
+        tb = engine.query_polars("SELECT closing_balance FROM trial_balance")
+        assert tb.item() == 12.5
+
+        # The same bytes again: served from Parquet, Excel is not parsed.
+        fake_reader.clear()
+        copy = tmp_path / "close-again.xlsx"
+        copy.write_bytes(path.read_bytes())
+        ingest_upload(engine, copy, excel=options)
+        assert fake_reader == []
+        engine.close()
+
+    def test_cache_is_per_sheet(self, tmp_path, fake_reader):
+        path = _workbook(tmp_path / "close.xlsx", list(SHEETS))
+        cache = tmp_path / "cache"
+        engine = DataEngine()
+        sheet_map = {"TB": "trial_balance"}
+        options = ExcelOptions(cache_dir=cache, sheet_map=sheet_map)
+        ingest_upload(engine, path, excel=options)
+        assert fake_reader == [("TB", "calamine")]
+
+        # A second mapping only parses the sheet the cache does not hold.
+        fake_reader.clear()
+        sheet_map = {**sheet_map, "Chart of Accounts": "account_master"}
+        options = ExcelOptions(cache_dir=cache, sheet_map=sheet_map)
+        ingest_upload(engine, path, excel=options)
+        assert fake_reader == [("Chart of Accounts", "calamine")]
+        engine.close()
+
+    def test_cache_evicts_least_recently_used(self, tmp_path, fake_reader):
+        cache = tmp_path / "cache"
+        options = ExcelOptions(cache_dir=cache, workers=1)
+        engine = DataEngine()
+        first = _workbook(tmp_path / "first.xlsx", ["TB"])
+        ingest_upload(engine, first, excel=options)
+        [entry] = cache.iterdir()
+        size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+
+        # Room for one workbook: loading a second evicts the first.
+        second = _workbook(tmp_path / "second.xlsx", ["TB", "Notes"])
+        bounded = ExcelOptions(cache_dir=cache, workers=1, cache_max_bytes=size)
+        ingest_upload(engine, second, excel=bounded)
+        assert [p.name for p in cache.iterdir()] == [file_checksum(second)]
+
+        fake_reader.clear()
+        ingest_upload(engine, first, excel=bounded)
+        assert fake_reader == [("TB", "calamine")]
+        engine.close()
+
+    def test_without_cache_dir_nothing_is_kept(self, tmp_path, fake_reader):
+        path = _workbook(tmp_path / "coa.xlsx", ["Chart of Accounts"])
+        engine = DataEngine()
+        ingest_upload(engine, path, excel=ExcelOptions(workers=1))
+        ingest_upload(engine, path, excel=ExcelOptions(workers=1))
+        assert len(fake_reader) == 2
+        assert engine.query_polars("SELECT COUNT(*) FROM account_master").item() == 2
+        engine.close()
+
+
+def _xlsx(path, sheets):
+    """A minimal real .xlsx (inline strings and numbers), without a writer."""
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    kind = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    mime = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+
+    def cell(value):
+        if isinstance(value, str):
+            return f'<c t="inlineStr"><is><t>{value}</t></is></c>'
+        return f"<c><v>{value}</v></c>"
+
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+            'content-types"><Default Extension="rels" ContentType="application/'
+            'vnd.openxmlformats-package.relationships+xml"/><Default '
+            f'Extension="xml" ContentType="application/xml"/><Override '
+            f'PartName="/xl/workbook.xml" ContentType="{mime}.sheet.main+xml"/>'
+            + "".join(
+                f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                f'ContentType="{mime}.worksheet+xml"/>'
+                for i in range(1, len(sheets) + 1)
+            )
+            + "</Types>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+            f'2006/relationships"><Relationship Id="rId1" Type="{kind}/'
+            'officeDocument" Target="xl/workbook.xml"/></Relationships>',
+        )
+        zf.writestr(
+            "xl/workbook.xml",
+            f'<workbook xmlns="{ns}" xmlns:r="{rel}"><sheets>'
+            + "".join(
+                f'<sheet name="{name}" sheetId="{i}" r:id="rId{i}"/>'
+                for i, name in enumerate(sheets, 1)
+            )
+            + "</sheets></workbook>",
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+            '2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{i}" Type="{kind}/worksheet" '
+                f'Target="worksheets/sheet{i}.xml"/>'
+                for i in range(1, len(sheets) + 1)
+            )
+            + "</Relationships>",
+        )
+        for i, rows in enumerate(sheets.values(), 1):
+            data = "".join(
+                "<row>" + "".join(cell(v) for v in row) + "</row>" for row in rows
+            )
+            zf.writestr(
+                f"xl/worksheets/sheet{i}.xml",
+                f'<worksheet xmlns="{ns}"><sheetData>{data}</sheetData></worksheet>',
+            )
+    return path
+
+
+def test_calamine_reads_mapped_sheets(tmp_path):
+    pytest.importorskip("fastexcel")
+    path = _xlsx(tmp_path / "close.xlsx", {
+        "Notes": [["note"], ["ignored"]],
+        "Chart of Accounts": [
+            ["gl_account", "account_type"],
+            ["400100", "R"],
+            ["100100", "A"],
+        ],
+    })
+    engine = DataEngine()
+    options = ExcelOptions(engine="calamine", cache_dir=tmp_path / "cache", workers=1)
+    result = ingest_upload(engine, path, excel=options)
+    assert {f.name: f.table for f in result.files} == {
+        "Chart of Accounts": "account_master"
+    }
+    df = engine.query_polars(
+        "SELECT gl_account, account_type FROM account_master ORDER BY gl_account"
+    )
+    assert df.rows() == [("100100", "A"), ("400100", "R")]
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_bad_sheet_mapping(app, client):
+    app.state.engine = DataEngine()
+    resp = await client.post(
+        "/api/data/upload",
+        params={"sheet": "TB:ledger"},
+        files={"file": ("tb.xlsx", io.BytesIO(b"x"), "application/octet-stream")},
+    )
+    assert resp.status_code == 400
+    assert "Invalid sheet mapping" in resp.json()["detail"]
+    app.state.engine.close()
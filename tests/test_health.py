@@ -7,4 +7,53 @@ import pytest
 async def test_health_returns_ok(client):
     resp = await client.get("/health")
     assert resp.status_code == 200
-    assert resp.json() == {"status": "ok"}
+    body = resp.json()
+    assert body["status"] == "ok"
+    assert body["ready"] is False
+
+
+@pytest.mark.asyncio
+async def test_readiness_reported_and_gates_data_routes(app, client, monkeypatch):
+    from fta_agent.data.engine import DataEngine
+    from fta_agent.data.readiness import DataReadiness
+
+    monkeypatch.setenv("DATA_READY_WAIT_S", "0.05")
+    app.state.engine = DataEngine()
+    readiness = DataReadiness(["account_master", "postings"])
+    app.state.readiness = readiness
+    readiness.mark_loading()
+    readiness.mark_table_ready("account_master")
+
+    body = (await client.get("/health")).json()
+    assert body["ready"] is False
+    assert body["data"]["tables"] == {"account_master": True, "postings": False}
+    assert (await client.get("/health/ready")).status_code == 503
+
+    resp = await client.get("/api/outcomes/mapping/impact")
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "5"
+
+    readiness.mark_ready()
+    assert (await client.get("/health/ready")).status_code == 200
+    assert (await client.get("/api/outcomes/mapping/impact")).json() == []
+    app.state.engine.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_health_requires_engine(client):
+    resp = await client.get("/health/engine")
+    assert resp.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_engine_health_reports_pool(app, client):
+    from fta_agent.data.engine import DataEngine
+
+    app.state.engine = DataEngine(pool_size=3)
+    app.state.engine.query_polars("SELECT 1")
+    resp = await client.get("/health/engine")
+    assert resp.status_code == 200
+    pool = resp.json()["pool"]
+    assert pool["max_size"] == 3
+    assert pool["acquisitions"] >= 1
+    app.state.engine.close()
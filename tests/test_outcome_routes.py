@@ -0,0 +1,77 @@
+"""Tests for the outcome API routes against an attached outcomes database."""
+
+import duckdb
+import polars as pl
+import pytest
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.outcomes import OUTCOMES_DB
+
+
+@pytest.fixture
+def outcomes_engine(app, tmp_path):
+    path = tmp_path / "outcomes.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute(
+        """
+        CREATE TABLE account_mappings AS SELECT * FROM (VALUES
+            ('M1', '100100', '1000', 'Cash', 'approved'),
+            ('M2', '100200', '1000', 'Cash', 'proposed'),
+            ('M3', '400000', '4000', 'Revenue', 'proposed')
+        ) AS t(mapping_id, legacy_account, target_account,
+               target_description, status)
+        """
+    )
+    con.close()
+
+    engine = DataEngine()
+    engine.load_polars(
+        pl.DataFrame(
+            {
+                "gl_account": ["100100", "100100", "100200", "400000"],
+                "amount": [10.0, 5.0, 2.5, 7.0],
+                "debit_credit": ["D", "C", "D", "C"],
+            }
+        ),
+        "postings",
+    )
+    engine.attach(path, OUTCOMES_DB)
+    app.state.engine = engine
+    yield engine
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_outcomes_require_engine(client):
+    resp = await client.get("/api/outcomes/mapping")
+    assert resp.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_missing_table_returns_empty(outcomes_engine, client):
+    resp = await client.get("/api/outcomes/analysis/findings")
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+@pytest.mark.asyncio
+async def test_patch_updates_attached_table(outcomes_engine, client):
+    resp = await client.patch(
+        "/api/outcomes/mapping/M2", json={"status": "approved"}
+    )
+    assert resp.status_code == 200
+    status = outcomes_engine.query_polars(
+        "SELECT status FROM outcomes.account_mappings WHERE mapping_id = 'M2'"
+    ).item()
+    assert status == "approved"
+
+
+@pytest.mark.asyncio
+async def test_mapping_impact_joins_postings(outcomes_engine, client):
+    resp = await client.get("/api/outcomes/mapping/impact")
+    assert resp.status_code == 200
+    rows = {r["target_account"]: r for r in resp.json()}
+    assert rows["1000"]["legacy_accounts"] == 2
+    assert rows["1000"]["posting_count"] == 3
+    assert rows["1000"]["net_amount"] == 7.5
+    assert rows["4000"]["net_amount"] == -7.0
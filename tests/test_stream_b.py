@@ -14,7 +14,9 @@ No LLM calls — all agent invocations are mocked.
 
 from __future__ import annotations
 
+import asyncio
 import json
+import shutil
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
@@ -25,9 +27,16 @@ from langchain_core.messages import AIMessage, HumanMessage
 
 from fta_agent.api.app import create_app
 from fta_agent.data.engine import DataEngine
-from fta_agent.data.loader import FIXTURES_DIR, ensure_fixture, load_fixture
+from fta_agent.data.loader import (
+    FIXTURE_TABLES,
+    FIXTURES_DIR,
+    aload_fixture,
+    ensure_fixture,
+    load_fixture,
+)
+from fta_agent.data.readiness import DataReadiness
 from fta_agent.data.schemas import ACCOUNT_MASTER_SCHEMA, POSTING_SCHEMA, TRIAL_BALANCE_SCHEMA
-from fta_agent.data.synthetic import generate_synthetic_data
+from fta_agent.data.synthetic import GENERATOR_VERSION, generate_synthetic_data
 from fta_agent.tools.gl_analysis import (
     _assess_dimensions,
     _compute_trial_balance,
@@ -140,17 +149,89 @@ class TestB1DuckDBLoading:
         assert result["lob_count"][0] > 0
         assert result["state_count"][0] > 0
 
+    def test_view_mode_matches_materialized(self, engine: DataEngine) -> None:
+        """read_parquet views expose the same data as materialized tables."""
+        view_engine = DataEngine()
+        load_fixture(view_engine, mode="view")
+        sql = "SELECT COUNT(*) AS n, ROUND(SUM(amount), 2) AS total FROM postings"
+        assert view_engine.query_polars(sql).equals(engine.query_polars(sql))
+        sql += " WHERE fiscal_period = 6"
+        assert view_engine.query_polars(sql).equals(engine.query_polars(sql))
+        assert view_engine.query_polars("SELECT * FROM postings LIMIT 0").schema == (
+            engine.query_polars("SELECT * FROM postings LIMIT 0").schema
+        )
+        tables = {"postings", "account_master", "trial_balance"}
+        assert set(view_engine.tables()) >= tables
+        view_engine.close()
+
+    def test_persistent_load_skips_unchanged_fixtures(self, tmp_path: Path) -> None:
+        """A warm restart on a persistent database does no loading."""
+        fixtures = tmp_path / "fixtures"
+        fixtures.mkdir()
+        for name in ("account_master", "trial_balance"):
+            shutil.copy(FIXTURES_DIR / f"{name}.parquet", fixtures / f"{name}.parquet")
+        shutil.copytree(FIXTURES_DIR / "postings", fixtures / "postings")
+        db_path = str(tmp_path / "engagement.duckdb")
+
+        eng = DataEngine(db_path)
+        assert load_fixture(eng, fixtures) == list(FIXTURE_TABLES)
+        count = eng.query_polars("SELECT COUNT(*) AS n FROM postings")["n"][0]
+        eng.close()
+
+        eng = DataEngine(db_path)
+        assert load_fixture(eng, fixtures) == []
+        assert eng.query_polars("SELECT COUNT(*) AS n FROM postings")["n"][0] == count
+        meta = eng.query_polars("SELECT * FROM _fta_fixture_meta ORDER BY table_name")
+        assert meta["generator_version"].to_list() == [GENERATOR_VERSION] * 3
+        eng.close()
+
+        # Changing one source file reloads only that table
+        pl.read_parquet(fixtures / "account_master.parquet").head(10).write_parquet(
+            fixtures / "account_master.parquet"
+        )
+        eng = DataEngine(db_path)
+        assert load_fixture(eng, fixtures) == ["account_master"]
+        assert load_fixture(eng, fixtures, mode="view") == list(FIXTURE_TABLES)
+        assert load_fixture(eng, fixtures, force=True, mode="view") == list(
+            FIXTURE_TABLES
+        )
+        eng.close()
+
+    @pytest.mark.asyncio
+    async def test_background_load_marks_tables_in_priority_order(self) -> None:
+        """Small tables become ready before postings; readiness ends ready."""
+        eng = DataEngine()
+        readiness = DataReadiness(FIXTURE_TABLES)
+        order: list[str] = []
+        mark = readiness.mark_table_ready
+
+        def record(name: str) -> None:
+            order.append(name)
+            mark(name)
+
+        readiness.mark_table_ready = record  # type: ignore[method-assign]
+        task = asyncio.create_task(aload_fixture(eng, readiness))
+        assert await readiness.wait_for(["account_master"], timeout=60)
+        await task
+        assert order == ["account_master", "trial_balance", "postings"]
+        assert readiness.ready
+        assert readiness.to_dict()["tables"] == dict.fromkeys(FIXTURE_TABLES, True)
+        eng.close()
+
     def test_ensure_fixture_idempotent(self, tmp_path: Path) -> None:
         """ensure_fixture should not regenerate if files exist."""
         # First call generates
         path = ensure_fixture(tmp_path)
-        assert (path / "postings.parquet").exists()
-        mtime = (path / "postings.parquet").stat().st_mtime
+        partitions = sorted((path / "postings").rglob("*.parquet"))
+        assert partitions[0].relative_to(path / "postings").parts[:3] == (
+            "fiscal_year=2025", "fiscal_period=1", "company_code=1000",
+        )
+        mtime = partitions[0].stat().st_mtime
 
         # Second call skips
         path2 = ensure_fixture(tmp_path)
         assert path2 == path
-        assert (path2 / "postings.parquet").stat().st_mtime == mtime
+        assert partitions[0].stat().st_mtime == mtime
 
 
 # ===========================================================================
@@ -225,6 +306,27 @@ class TestB2DetectMJE:
         # Strict should have equal or fewer patterns
         assert strict["recurring_identical"]["count"] <= loose["recurring_identical"]["count"]
 
+    def test_single_query_for_all_patterns(
+        self, engine: DataEngine, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        seen: list[str] = []
+        query = engine.query_polars
+        monkeypatch.setattr(
+            engine, "query_polars", lambda sql, *a, **k: seen.append(sql) or query(sql)
+        )
+        result = json.loads(_detect_mje(engine))
+        assert len(seen) == 1
+        # Counts come from the shared aggregate but must match the raw lines.
+        raw = engine.query_polars(
+            "SELECT document_category, COUNT(*) AS n FROM postings GROUP BY ALL"
+        )
+        summary = result["overall_summary"]
+        counts = {s["document_category"]: s["count"] for s in summary}
+        assert counts == dict(raw.iter_rows())
+        patterns = result["recurring_identical"]["patterns"]
+        occurrences = [p["occurrences"] for p in patterns]
+        assert occurrences == sorted(occurrences, reverse=True)
+
 
 class TestB2ComputeTrialBalance:
     """Test the compute_trial_balance tool."""
@@ -321,6 +423,25 @@ class TestB2AssessDimensions:
         pct = result["profit_center"]["fill_rate_pct"]
         assert 0 <= pct <= 100
 
+    def test_single_query_for_all_dimensions(
+        self, engine: DataEngine, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        seen: list[str] = []
+        query = engine.query_polars
+        monkeypatch.setattr(
+            engine, "query_polars", lambda sql, *a, **k: seen.append(sql) or query(sql)
+        )
+        result = json.loads(_assess_dimensions(engine))
+        assert len(seen) == 1
+        total = engine.query_polars("SELECT COUNT(*) AS n FROM postings")["n"][0]
+        for dim in result.values():
+            assert dim["total"] == total
+            assert sum(r["total_postings"] for r in dim["by_account_type"]) == total
+            populated = sum(r["populated"] for r in dim["by_account_type"])
+            assert populated == dim["populated"]
+            counts = [r["posting_count"] for r in dim["value_distribution"]]
+            assert counts == sorted(counts, reverse=True)
+
 
 class TestB2ToolFactory:
     """Test create_gl_tools factory."""
@@ -354,6 +475,13 @@ class TestB2ToolFactory:
             parsed = json.loads(result)
             assert isinstance(parsed, dict)
 
+    async def test_tools_are_async_invocable(self, engine: DataEngine) -> None:
+        """ainvoke runs on the engine executor and matches the sync result."""
+        tools = {t.name: t for t in create_gl_tools(engine)}
+        args = {"dimensions": ["lob"]}
+        result = await tools["assess_dimensions"].ainvoke(args)
+        assert json.loads(result) == json.loads(tools["assess_dimensions"].invoke(args))
+
 
 # ===========================================================================
 # B3 — SSE streaming endpoint
@@ -448,6 +576,50 @@ class TestB3SSEEndpoint:
             for event in events:
                 assert "session_id" in event
 
+    async def test_tool_call_events_report_cache_use(self, client: AsyncClient) -> None:
+        """A repeated tool call is served from the tool cache and says so."""
+        from langgraph.graph import END, StateGraph
+        from langgraph.prebuilt import ToolNode
+
+        from fta_agent.agents.state import AgentState
+        from fta_agent.tools.result_cache import ToolResultCache
+
+        cache = ToolResultCache()
+
+        def build(engine: DataEngine):
+            def coach(state: AgentState):
+                if isinstance(state["messages"][-1], HumanMessage):
+                    call = {"name": "detect_mje", "args": {}, "id": "call-1"}
+                    return {"messages": [AIMessage(content="", tool_calls=[call])]}
+                return {"messages": [AIMessage(content="Done.")]}
+
+            graph: StateGraph[AgentState] = StateGraph(AgentState)
+            graph.add_node("gl_coach", coach)
+            graph.add_node("tools", ToolNode(create_gl_tools(engine, cache)))
+            graph.set_entry_point("gl_coach")
+            graph.add_conditional_edges(
+                "gl_coach", lambda s: "tools" if s["messages"][-1].tool_calls else END
+            )
+            graph.add_edge("tools", "gl_coach")
+            return graph.compile()
+
+        statuses = []
+        with patch(
+            "fta_agent.api.routes.stream.get_gl_design_coach_graph", side_effect=build
+        ):
+            for _ in range(2):
+                response = await client.post("/api/v1/stream", json={"message": "mje"})
+                for line in response.text.strip().split("\n"):
+                    if not line.startswith("data: "):
+                        continue
+                    event = json.loads(line.removeprefix("data: "))
+                    if event["type"] != "tool_call":
+                        continue
+                    payload = event["payload"]
+                    if payload["status"] == "completed":
+                        statuses.append(payload["cache"])
+        assert statuses == ["miss", "hit"]
+
     async def test_stream_requires_message(self, client: AsyncClient) -> None:
         """Should reject empty message."""
         response = await client.post(
@@ -628,6 +800,22 @@ class TestB8ErrorHandling:
         assert len(result) == 1
         assert "lob" in result
 
+    def test_tool_timeout_returns_graceful_error(self) -> None:
+        """A query deadline turns into a JSON error message for the agent."""
+        eng = DataEngine()
+        load_fixture(eng, mode="view")
+        eng.query_timeout_s = 0.2
+        tools = {t.name: t for t in create_gl_tools(eng)}
+        result = json.loads(tools["profile_accounts"].invoke({
+            "account_filter": (
+                "p.gl_account IN (SELECT CAST(a.range * b.range AS VARCHAR) "
+                "FROM range(30000) a, range(30000) b)"
+            ),
+        }))
+        assert result["error"] == "query_timeout"
+        assert "profile_accounts" in result["message"]
+        eng.close()
+
     def test_engine_close_and_reuse(self) -> None:
         """Engine should not crash on close."""
         eng = DataEngine()
@@ -0,0 +1,113 @@
+"""Tests for the GL tool result cache."""
+
+import json
+
+import polars as pl
+import pytest
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.loader import load_fixture
+from fta_agent.tools.gl_analysis import create_gl_tools
+from fta_agent.tools.result_cache import ToolResultCache
+
+
+@pytest.fixture(scope="module")
+def engine():
+    eng = DataEngine()
+    load_fixture(eng)
+    yield eng
+    eng.close()
+
+
+def _call(tools, name, **args):
+    """Invoke a tool as ToolNode does; return (content, cache status)."""
+    call = {"type": "tool_call", "name": name, "args": args, "id": "1"}
+    msg = tools[name].invoke(call)
+    return msg.content, msg.artifact.get("cache")
+
+
+def _tools(engine, cache):
+    return {t.name: t for t in create_gl_tools(engine, cache)}
+
+
+class TestToolResultCache:
+    def test_repeat_call_hits_with_canonical_args(self, engine):
+        cache = ToolResultCache()
+        tools = _tools(engine, cache)
+        first, status = _call(tools, "detect_mje")
+        assert status == "miss"
+        # Explicit defaults are the same call.
+        again, status = _call(tools, "detect_mje", min_occurrences=3)
+        assert (again, status) == (first, "hit")
+        assert _call(tools, "detect_mje", min_occurrences=10)[1] == "miss"
+        assert cache.stats().to_dict() == {
+            "hits": 1, "misses": 2, "bypasses": 0, "entries": 2,
+        }
+
+    def test_write_to_a_table_read_invalidates(self):
+        eng = DataEngine()
+        load_fixture(eng)
+        tools = _tools(eng, ToolResultCache())
+        assert _call(tools, "compute_trial_balance")[1] == "miss"
+        assert _call(tools, "compute_trial_balance")[1] == "hit"
+        # postings is not read by the trial balance tool.
+        eng.execute("DELETE FROM postings WHERE fiscal_period = 12")
+        assert _call(tools, "compute_trial_balance")[1] == "hit"
+        eng.execute("DELETE FROM trial_balance WHERE fiscal_period = 12")
+        content, status = _call(tools, "compute_trial_balance")
+        assert status == "miss"
+        assert all(r["fiscal_period"] != 12 for r in json.loads(content)["rows"])
+        eng.close()
+
+    def test_stale_snapshot_bypasses(self):
+        eng = DataEngine()
+        eng.load_polars(
+            pl.DataFrame({"gl_account": ["1"], "fiscal_period": [1]}), "trial_balance"
+        )
+        eng.load_polars(pl.DataFrame({"gl_account": ["1"]}), "account_master")
+        cache = ToolResultCache()
+        with eng.snapshot():
+            eng.load_polars(pl.DataFrame({"gl_account": ["2"]}), "account_master")
+            assert eng.read_versions(["trial_balance", "account_master"]) is None
+            result, status = cache.call(
+                eng, "t", ["trial_balance", "account_master"], "{}", lambda: "old"
+            )
+        assert (result, status) == ("old", "bypass")
+        assert cache.stats().entries == 0
+        eng.close()
+
+    def test_persisted_results_survive_restart(self, engine, tmp_path):
+        tools = _tools(engine, ToolResultCache(directory=tmp_path))
+        first, status = _call(tools, "assess_dimensions", dimensions=["lob"])
+        assert status == "miss"
+        assert len(list((tmp_path / "assess_dimensions").glob("*.json"))) == 1
+
+        # A new process: fresh cache and engine, same data.
+        eng = DataEngine()
+        load_fixture(eng)
+        tools = _tools(eng, ToolResultCache(directory=tmp_path))
+        assert _call(tools, "assess_dimensions", dimensions=["lob"]) == (first, "hit")
+        # Different data, different stamp.
+        eng.execute("DELETE FROM postings WHERE lob = 'AUTO'")
+        assert _call(tools, "assess_dimensions", dimensions=["lob"])[1] == "miss"
+        eng.close()
+
+    def test_persisted_results_are_keyed_on_code(self, engine, tmp_path):
+        tables = ["trial_balance"]
+        cache = ToolResultCache(directory=tmp_path)
+        assert cache.call(engine, "t", tables, "{}", lambda: "v1", "a")[1] == "miss"
+        # A restart with the same code reads the entry back...
+        cache = ToolResultCache(directory=tmp_path)
+        assert cache.call(engine, "t", tables, "{}", lambda: "v1", "a") == ("v1", "hit")
+        # ...and one with changed code does not.
+        cache = ToolResultCache(directory=tmp_path)
+        result = cache.call(engine, "t", tables, "{}", lambda: "v2", "b")
+        assert result == ("v2", "miss")
+
+    def test_without_cache_tools_return_plain_content(self, engine):
+        tools = _tools(engine, None)
+        msg = tools["detect_mje"].invoke(
+            {"type": "tool_call", "name": "detect_mje", "args": {}, "id": "1"}
+        )
+        assert msg.artifact == {}
+        assert json.loads(tools["detect_mje"].invoke({}))
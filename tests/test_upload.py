@@ -0,0 +1,508 @@
+"""Tests for the streaming upload endpoint."""
+
+import hashlib
+import io
+import json
+
+import polars as pl
+import pytest
+
+from fta_agent.api.routes import upload
+from fta_agent.data.engine import DataEngine
+
+
+@pytest.fixture
+def engine(app):
+    app.state.engine = DataEngine()
+    yield app.state.engine
+    app.state.engine.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_reports_bytes_and_hash(engine, client):
+    body = b"gl_account,amount\n" + b"".join(
+        f"{100000 + i},{i}.5\n".encode() for i in range(50)
+    )
+    resp = await client.post(
+        "/api/data/upload",
+        params={"wait": True},
+        files={"file": ("gl.csv", io.BytesIO(body), "text/csv")},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["phase"] == "done"
+    assert data["rows_loaded"] == 50
+    assert data["bytes_received"] == len(body)
+    assert data["sha256"] == hashlib.sha256(body).hexdigest()
+    assert engine.query_polars("SELECT COUNT(*) FROM postings").item() == 50
+
+
+@pytest.mark.asyncio
+async def test_upload_over_limit_rejected(engine, client, monkeypatch):
+    monkeypatch.setenv("UPLOAD_MAX_MB", "1")
+    body = b"a\n" + b"1\n" * (600 * 1024)
+    resp = await client.post(
+        "/api/data/upload", files={"file": ("gl.csv", io.BytesIO(body), "text/csv")}
+    )
+    assert resp.status_code == 413
+    assert "postings" not in engine.tables()
+
+
+@pytest.mark.asyncio
+async def test_upload_returns_job_and_streams_progress(engine, client):
+    body = b"gl_account,amount\n100100,1.5\n100200,2.5\n"
+    resp = await client.post(
+        "/api/data/upload", files={"file": ("gl.csv", io.BytesIO(body), "text/csv")}
+    )
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["phase"] == "queued"
+    assert job["status_url"] == f"/api/data/jobs/{job['job_id']}"
+
+    resp = await client.get(job["events_url"])
+    events = [
+        json.loads(line[len("data: "):])
+        for line in resp.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[-1]["type"] == "job_complete"
+    assert events[-1]["payload"]["rows_loaded"] == 2
+
+    status = (await client.get(job["status_url"])).json()
+    assert status["phase"] == "done"
+    assert status["fraction"] == 1.0
+    assert (await client.get("/api/data/jobs/nope")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failed_job_reports_error(app, engine, client):
+    body = b"gl_account,fiscal_year\n100100,not-a-year\n"
+    resp = await client.post(
+        "/api/data/upload", files={"file": ("gl.csv", io.BytesIO(body), "text/csv")}
+    )
+    job_id = resp.json()["job_id"]
+    await app.state.jobs.wait(job_id)
+    status = (await client.get(f"/api/data/jobs/{job_id}")).json()
+    assert status["phase"] == "failed"
+    assert status["error"].startswith("Could not read")
+    [violation] = [
+        v for v in status["validation"]["violations"] if v["rule"] == "type"
+    ]
+    assert violation["samples"][0]["fiscal_year"] == "not-a-year"
+
+    resp = await client.post(
+        "/api/data/upload",
+        params={"wait": True},
+        files={"file": ("gl.csv", io.BytesIO(body), "text/csv")},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_multi_file_upload_reports_files(engine, client, tmp_path):
+    jan = _month_csv(tmp_path / "jan.csv", 1).read_bytes()
+    feb = _month_csv(tmp_path / "feb.csv", 2, rows=2).read_bytes()
+    resp = await client.post(
+        "/api/data/upload",
+        params={"wait": True},
+        files=[
+            ("file", ("jan.csv", io.BytesIO(jan), "text/csv")),
+            ("file", ("feb.csv", io.BytesIO(feb), "text/csv")),
+        ],
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["filename"] == "jan.csv (+1 more)"
+    assert [(f["name"], f["rows"]) for f in data["files"]] == [
+        ("jan.csv", 3), ("feb.csv", 2)
+    ]
+    assert engine.query_polars("SELECT COUNT(*) FROM postings").item() == 5
+
+
+def _multipart(*parts: tuple[str, str, bytes]) -> bytes:
+    body = b""
+    for name, filename, data in parts:
+        body += (
+            f'--xyz\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\n\r\n'
+        ).encode() + data + b"\r\n"
+    return body + b"--xyz--\r\n"
+
+
+async def _chunks(body: bytes, size: int = 7):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_parts_written_to_disk_as_they_arrive(tmp_path, monkeypatch):
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(upload.tempfile, "tempdir", str(tmp_path))
+    body = _multipart(("file", "a.csv", b"x,y\n1,2\n"), ("file", "b.csv", b"z\n"))
+    receiver = await upload._receive_uploads(_chunks(body), b"xyz", max_bytes=1024)
+    assert [name for name, _ in receiver.sources] == ["a.csv", "b.csv"]
+    assert [p.read_bytes() for _, p in receiver.sources] == [b"x,y\n1,2\n", b"z\n"]
+    assert receiver.hashes[1] == hashlib.sha256(b"z\n").hexdigest()
+    assert receiver.received == 10
+    receiver.discard()
+
+    big = _multipart(("file", "big.csv", b"x" * 4096))
+    with pytest.raises(HTTPException) as exc:
+        await upload._receive_uploads(_chunks(big), b"xyz", max_bytes=1024)
+    assert exc.value.status_code == 413
+    with pytest.raises(HTTPException) as exc:
+        await upload._receive_uploads(
+            _chunks(_multipart(("file", "gl.txt", b"x"))), b"xyz", max_bytes=0
+        )
+    assert exc.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+class TestValidatedIngest:
+    def test_sap_extract_is_mapped(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "acdoca.csv"
+        path.write_text(
+            "RBUKRS,GJAHR,BELNR,BUZEI,RACCT,HSL,SHKZG,BUDAT\n"
+            "1000,2024,4711,1,400100,1250.00-,H,20240131\n"
+            "1000,2024,4711,2,100100,1250.00,S,20240131\n"
+        )
+        engine = DataEngine()
+        result = ingest_upload(engine, path)
+        assert result.validation.renamed["HSL"] == "amount"
+        df = engine.query_polars(
+            "SELECT gl_account, amount, debit_credit, posting_date::VARCHAR AS d "
+            "FROM postings ORDER BY line_item"
+        )
+        assert df.row(0) == ("400100", 1250.0, "C", "2024-01-31")
+        engine.close()
+
+    def test_signed_sap_amounts_become_debit_credit(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "acdoca.csv"
+        path.write_text(
+            "RBUKRS,GJAHR,BELNR,DOCLN,RACCT,HSL,BUDAT\n"
+            "1000,2024,4711,1,400100,-1250.00,20240131\n"
+            "1000,2024,4711,2,100100,1250.00,20240131\n"
+        )
+        engine = DataEngine()
+        found = {v.column for v in ingest_upload(engine, path).validation.violations}
+        assert "debit_credit" not in found
+        df = engine.query_polars(
+            "SELECT amount, debit_credit FROM postings ORDER BY line_item"
+        )
+        assert df.rows() == [(1250.0, "C"), (1250.0, "D")]
+        engine.close()
+
+    def test_native_load_reports_domain_violations(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        path.write_text("gl_account,debit_credit\n100100,D\n100200,X\n")
+        engine = DataEngine()
+        report = ingest_upload(engine, path).validation
+        [domain] = [v for v in report.violations if v.rule == "domain"]
+        assert domain.count == 1
+        assert domain.samples[0]["debit_credit"] == "X"
+        engine.close()
+
+
+def _month_csv(path, month, rows=3):
+    lines = ["document_number,line_item,fiscal_period,gl_account,amount"]
+    lines += [f"{month}-{i},1,{month},400100,{i}.5" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+class TestMultiFileIngest:
+    def test_zip_and_glob_in_one_transaction(self, tmp_path):
+        import zipfile
+
+        from fta_agent.data.loader import ingest_files
+
+        for month in (1, 2):
+            _month_csv(tmp_path / f"m{month:02d}.csv", month)
+        archive = tmp_path / "cc1000.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.write(_month_csv(tmp_path / "m03.txt", 3, rows=4), "q1/m03.csv")
+            zf.writestr("../escape.csv", "document_number,line_item\nx,1\n")
+            zf.writestr("__MACOSX/q1/._m03.csv", "junk")
+
+        engine = DataEngine()
+        result = ingest_files(
+            engine, [str(tmp_path / "m0*.csv"), archive], workers=1
+        )
+        assert [(f.name, f.rows) for f in result.files] == [
+            ("m01.csv", 3), ("m02.csv", 3), ("q1/m03.csv", 4), ("../escape.csv", 1)
+        ]
+        assert result.rows == result.inserted == 11
+        assert not (tmp_path.parent / "escape.csv").exists()
+        df = engine.query_polars(
+            "SELECT fiscal_period, COUNT(*) AS n FROM postings "
+            "WHERE fiscal_period IS NOT NULL GROUP BY 1 ORDER BY 1"
+        )
+        assert df.rows() == [(1, 3), (2, 3), (3, 4)]
+        engine.close()
+
+    def test_worker_processes_and_type_errors(self, tmp_path):
+        from fta_agent.data.loader import ingest_files
+        from fta_agent.data.validation import ValidationError
+
+        good = _month_csv(tmp_path / "jan.csv", 1)
+        bad = tmp_path / "feb.csv"
+        bad.write_text("document_number,fiscal_period\nx,feb\n")
+        engine = DataEngine()
+        engine.load_polars(pl.DataFrame({"document_number": ["keep"]}), "postings")
+        with pytest.raises(ValidationError) as exc:
+            ingest_files(engine, [good, bad], workers=2)
+        [violation] = exc.value.report.violations[-1:]
+        assert violation.samples[0]["file"] == "feb.csv"
+        # Nothing was loaded: the failing batch never reached the table.
+        assert engine.query_polars("SELECT * FROM postings").item() == "keep"
+        engine.close()
+
+
+class TestNativeIngest:
+    def test_csv_uses_canonical_types(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        path.write_text(
+            "gl_account,fiscal_year,posting_date,amount,extra\n"
+            "000100,2024,2024-01-31,10.5,x\n"
+            "000200,2024,2024-02-29,-3,y\n"
+        )
+        engine = DataEngine()
+        assert ingest_upload(engine, path).rows == 2
+        df = engine.query_polars(
+            "SELECT typeof(gl_account) AS g, typeof(fiscal_year) AS y, "
+            "typeof(posting_date) AS d, gl_account FROM postings ORDER BY 4"
+        )
+        assert df.row(0) == ("VARCHAR", "INTEGER", "DATE", "000100")
+        engine.close()
+
+    def test_parquet_columns_cast(self, tmp_path):
+        import polars as pl
+
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.parquet"
+        pl.DataFrame({"gl_account": [100100], "fiscal_year": [2024]}).write_parquet(
+            path
+        )
+        engine = DataEngine()
+        assert ingest_upload(engine, path).rows == 1
+        row = engine.query_polars(
+            "SELECT typeof(gl_account), typeof(fiscal_year), gl_account FROM postings"
+        ).row(0)
+        assert row == ("VARCHAR", "INTEGER", "100100")
+        engine.close()
+
+    def test_bad_value_raises_value_error(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        path.write_text("gl_account,fiscal_year\n100100,not-a-year\n")
+        engine = DataEngine()
+        with pytest.raises(ValueError, match=r"Could not read gl\.csv"):
+            ingest_upload(engine, path)
+        engine.close()
+
+    def test_polars_path_still_available(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        path.write_text("gl_account,amount\n100100,1.5\n")
+        engine = DataEngine()
+        assert ingest_upload(engine, path, native=False).rows == 1
+        engine.close()
+
+
+class TestIngestProgress:
+    def test_estimate_rows(self, tmp_path):
+        import polars as pl
+
+        from fta_agent.data.loader import estimate_rows
+
+        csv = tmp_path / "gl.csv"
+        csv.write_text("a,b\n" + "".join(f"{i},x\n" for i in range(1000)))
+        assert 900 <= estimate_rows(csv) <= 1100
+        pq = tmp_path / "gl.parquet"
+        pl.DataFrame({"a": range(123)}).write_parquet(pq)
+        assert estimate_rows(pq) == 123
+
+    def test_native_ingest_reports_progress(self, tmp_path):
+        from fta_agent.data.jobs import JobRegistry
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        with path.open("w") as f:
+            f.write("gl_account,amount,text\n")
+            for i in range(400_000):
+                f.write(f"{100000 + i % 500},{i}.25,line item {i}\n")
+        jobs = JobRegistry()
+        job = jobs.create("demo", "gl.csv", "postings")
+        jobs.update(job.job_id, rows_estimated=400_000)
+        engine = DataEngine()
+        result = ingest_upload(
+            engine, path, report=lambda **f: jobs.update(job.job_id, **f)
+        )
+        snap = jobs.snapshot(job.job_id)
+        assert result.rows == snap["rows_loaded"] == 400_000
+        assert snap["phase"] == "finalizing"
+        assert snap["version"] >= 3
+        engine.close()
+
+
+def _postings_csv(path, rows):
+    header = "company_code,fiscal_year,document_number,line_item,gl_account,amount\n"
+    path.write_text(header + "".join(f"{','.join(map(str, r))}\n" for r in rows))
+    return path
+
+
+class TestIncrementalIngest:
+    def test_append_skips_existing_keys(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        engine = DataEngine()
+        jan = _postings_csv(
+            tmp_path / "jan.csv",
+            [
+                ("1000", 2024, "D1", 1, "100100", 10.0),
+                ("1000", 2024, "D1", 2, "200100", -10.0),
+            ],
+        )
+        assert ingest_upload(engine, jan, mode="append").inserted == 2
+
+        feb = _postings_csv(
+            tmp_path / "feb.csv",
+            [
+                ("1000", 2024, "D1", 1, "100100", 99.0),
+                ("1000", 2024, "D2", 1, "100100", 5.0),
+            ],
+        )
+        result = ingest_upload(engine, feb, mode="append")
+        assert (result.inserted, result.updated, result.skipped) == (1, 0, 1)
+        amounts = engine.query_polars(
+            "SELECT amount FROM postings ORDER BY document_number, line_item"
+        )["amount"].to_list()
+        assert amounts == [10.0, -10.0, 5.0]
+        engine.close()
+
+    def test_upsert_updates_changed_rows_only(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        engine = DataEngine()
+        base = [("1000", 2024, f"D{i}", 1, "100100", float(i)) for i in range(5)]
+        ingest_upload(engine, _postings_csv(tmp_path / "base.csv", base))
+
+        delta = [
+            ("1000", 2024, "D0", 1, "100100", 0.0),  # unchanged
+            ("1000", 2024, "D1", 1, "100100", 42.0),  # changed
+            ("1000", 2024, "D9", 1, "100100", 9.0),  # new
+            ("1000", 2024, "D9", 1, "100100", 9.0),  # duplicate in file
+        ]
+        result = ingest_upload(
+            engine, _postings_csv(tmp_path / "delta.csv", delta), mode="upsert"
+        )
+        assert (result.inserted, result.updated, result.skipped) == (1, 1, 2)
+        df = engine.query_polars(
+            "SELECT document_number, amount FROM postings ORDER BY document_number"
+        )
+        assert df.rows() == [
+            ("D0", 0.0), ("D1", 42.0), ("D2", 2.0), ("D3", 3.0), ("D4", 4.0),
+            ("D9", 9.0),
+        ]
+        assert not [t for t in engine.tables() if t.startswith("_fta_stage")]
+        engine.close()
+
+    def test_postings_stored_as_partitioned_dataset(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        path.write_text(
+            "company_code,fiscal_year,fiscal_period,document_number,line_item,"
+            "gl_account,amount\n"
+            "1000,2024,1,D1,1,100100,1.0\n"
+            "1000,2024,2,D2,1,100100,2.0\n"
+        )
+        datasets = tmp_path / "datasets"
+        engine = DataEngine()
+        ingest_upload(engine, path, dataset_dir=datasets)
+        dataset = datasets / "postings"
+        assert (
+            dataset / "fiscal_year=2024" / "fiscal_period=2" / "company_code=1000"
+        ).is_dir()
+        kind = engine.execute(
+            "SELECT table_type FROM information_schema.tables "
+            "WHERE table_name = 'postings'"
+        ).fetchone()
+        assert kind == ("VIEW",)
+
+        # An append adds files for its partitions and leaves the others alone.
+        untouched = {f: f.stat().st_mtime_ns for f in dataset.rglob("*.parquet")}
+        path.write_text(
+            "company_code,fiscal_year,fiscal_period,document_number,line_item,"
+            "gl_account,amount\n"
+            "1000,2024,3,D3,1,100100,3.0\n"
+        )
+        assert ingest_upload(
+            engine, path, mode="append", dataset_dir=datasets
+        ).inserted == 1
+        df = engine.query_polars(
+            "SELECT company_code, fiscal_period FROM postings ORDER BY fiscal_period"
+        )
+        assert df["fiscal_period"].to_list() == [1, 2, 3]
+        assert df.schema["company_code"] == pl.Utf8
+        assert (dataset / "fiscal_year=2024" / "fiscal_period=3").is_dir()
+        assert {f: f.stat().st_mtime_ns for f in untouched} == untouched
+
+        # An upsert moving D1 to period 3 rewrites only period 1's file.
+        path.write_text(
+            "company_code,fiscal_year,fiscal_period,document_number,line_item,"
+            "gl_account,amount\n"
+            "1000,2024,3,D1,1,100100,10.0\n"
+            "1000,2024,2,D2,1,100100,2.0\n"
+        )
+        result = ingest_upload(engine, path, mode="upsert", dataset_dir=datasets)
+        assert (result.inserted, result.updated, result.skipped) == (0, 1, 1)
+        period_2 = [f for f in untouched if "fiscal_period=2" in str(f)]
+        assert all(f.stat().st_mtime_ns == untouched[f] for f in period_2)
+        assert not list((dataset / "fiscal_year=2024" / "fiscal_period=1").rglob(
+            "*.parquet"
+        ))
+        df = engine.query_polars(
+            "SELECT document_number, fiscal_period, amount FROM postings "
+            "ORDER BY document_number"
+        )
+        assert df.rows() == [("D1", 3, 10.0), ("D2", 2, 2.0), ("D3", 3, 3.0)]
+        engine.close()
+
+    def test_missing_key_column_rejected(self, tmp_path):
+        from fta_agent.data.loader import ingest_upload
+
+        path = tmp_path / "gl.csv"
+        path.write_text("gl_account,amount\n100100,1.5\n")
+        engine = DataEngine()
+        with pytest.raises(ValueError, match="key column"):
+            ingest_upload(engine, path, mode="upsert")
+        assert not [t for t in engine.tables() if t.startswith("_fta_stage")]
+        engine.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_upsert_reports_counts(engine, client, tmp_path):
+    rows = [("1000", 2024, "D1", 1, "100100", 1.0)]
+    body = _postings_csv(tmp_path / "a.csv", rows).read_bytes()
+    for expected in ((1, 0, 0), (0, 0, 1)):
+        resp = await client.post(
+            "/api/data/upload",
+            params={"mode": "upsert", "wait": True},
+            files={"file": ("a.csv", io.BytesIO(body), "text/csv")},
+        )
+        data = resp.json()
+        assert data["mode"] == "upsert"
+        assert (data["inserted"], data["updated"], data["skipped"]) == expected
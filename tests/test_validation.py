@@ -0,0 +1,82 @@
+"""Tests for columnar upload validation."""
+
+import polars as pl
+
+from fta_agent.data.engine import DataEngine
+from fta_agent.data.schemas import DocumentCategory
+from fta_agent.data.validation import (
+    TABLE_RULES,
+    sap_renames,
+    validate_frame,
+    validate_table,
+)
+
+
+def _violations(report):
+    return {(v.column, v.rule): v for v in report.violations}
+
+
+class TestRules:
+    def test_rules_follow_pydantic_model(self):
+        rules = TABLE_RULES["postings"]
+        assert "gl_account" in rules.required
+        assert "cost_center" not in rules.required
+        assert set(rules.domains["document_category"]) == set(DocumentCategory)
+
+    def test_sap_renames(self):
+        renames = sap_renames(["racct", "HSL", "DMBTR", "BUDAT"], {
+            "RACCT": "gl_account",
+            "HSL": "amount",
+            "DMBTR": "amount",
+        })
+        assert renames == {"racct": "gl_account", "HSL": "amount"}
+        # A canonical column is never overwritten by an SAP one.
+        assert sap_renames(["amount", "HSL"], {"HSL": "amount"}) == {}
+
+
+class TestValidateFrame:
+    def test_coerces_and_reports_with_samples(self):
+        df = pl.DataFrame({
+            "BELNR": ["1", "2", "3"],
+            "GJAHR": ["2024", "2024", "20x4"],
+            "BUDAT": ["20240131", "2024-02-01", "31.01.2024"],
+            "HSL": ["10.00-", "5", "5"],
+            "SHKZG": ["S", "H", "Q"],
+            "document_category": ["MJE", "STD", "MJE"],
+        })
+        out, report = validate_frame(df)
+        assert out.schema["fiscal_year"] == pl.Int32
+        assert out.schema["posting_date"] == pl.Date
+        assert out["amount"].to_list() == [10.0, 5.0, 5.0]
+        assert out["debit_credit"].to_list() == ["D", "C", "Q"]
+
+        found = _violations(report)
+        assert found[("fiscal_year", "type")].samples == [
+            {"row": 2, "fiscal_year": "20x4", "document_number": "3"}
+        ]
+        assert found[("posting_date", "type")].count == 1
+        assert found[("debit_credit", "domain")].count == 1
+        assert found[("gl_account", "missing_column")].count == 3
+        assert ("document_category", "domain") not in found
+        assert not report.ok
+
+    def test_null_and_sample_limit(self):
+        df = pl.DataFrame({"gl_account": [None] * 10, "debit_credit": ["D"] * 10})
+        _, report = validate_frame(df, sample_size=2)
+        null = _violations(report)[("gl_account", "null")]
+        assert (null.count, len(null.samples)) == (10, 2)
+
+
+class TestValidateTable:
+    def test_matches_frame_checks(self):
+        df = pl.DataFrame({
+            "gl_account": ["1", None, "3"],
+            "document_category": ["MJE", "XYZ", "STD"],
+        })
+        engine = DataEngine()
+        engine.load_polars(df, "postings")
+        found = _violations(validate_table(engine, "postings"))
+        _, frame_report = validate_frame(df, coerce=False)
+        assert found.keys() == _violations(frame_report).keys()
+        assert found[("document_category", "domain")].samples[0]["row"] == 1
+        engine.close()